@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import uuid
+from typing import TYPE_CHECKING
+
+from .paging import EMPTY_PAGE, decode_cursor, page_size, to_page
+from .states import get_state_cache
+
+if TYPE_CHECKING:
+    from prisma import Prisma
+
+# Party ids are passed as one comma-separated string so the statement has a
+# fixed parameter list whatever the number of parties.
+_BY_PARTIES_SQL = (
+    'SELECT {cols} FROM "OPT_Address" a '
+    "WHERE a.\"Add_PartyID\" = ANY(string_to_array($1, ',')::uuid[]) "
+    'AND ($2::uuid IS NULL OR a."Add_ID" > $2::uuid) '
+    'ORDER BY a."Add_ID" LIMIT $3'
+)
+
+# Name search and address fetch in one round trip, for when the name index
+# isn't loaded. The party subquery is ordered so every page sees the same
+# 20 parties.
+_BY_NAME_SQL = (
+    'SELECT {cols} FROM "OPT_Address" a '
+    'WHERE a."Add_PartyID" IN ('
+    'SELECT p."PTY_ID" FROM "OPT_Party" p '
+    'WHERE p."PTY_FirstName" ILIKE $1 OR p."PTY_LastName" ILIKE $1 '
+    'ORDER BY p."PTY_ID" LIMIT 20) '
+    'AND ($2::uuid IS NULL OR a."Add_ID" > $2::uuid) '
+    'ORDER BY a."Add_ID" LIMIT $3'
+)
+
+# What the address grid shows; the state name/code come from StateCache.
+_GRID_COLS = 'a."Add_ID", a."Add_Line1", a."Add_City", a."Add_Zip", a."Add_State"'
+
+
+def _valid_ids(ids: list[str]) -> list[str]:
+    out = []
+    for i in ids:
+        try:
+            out.append(str(uuid.UUID(str(i))))
+        except ValueError:
+            continue
+    return out
+
+
+def _address_model(db: Prisma):
+    """Row type for full address rows.
+
+    The client's own `address_model` if it has one (the in-memory stand-in
+    does), else the generated Prisma model.
+    """
+
+    model = getattr(db, "address_model", None)
+    if model is None:
+        from prisma.models import OPT_Address as model
+    return model
+
+
+def like_pattern(name: str) -> str:
+    escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+async def _page(db: Prisma, sql: str, arg: str, *, cursor: str | None, limit: int, grid: bool = False) -> dict:
+    take = page_size(limit)
+    if grid:
+        rows = await db.query_raw(sql.format(cols=_GRID_COLS), arg, decode_cursor(cursor), take + 1)
+    else:
+        rows = await db.query_raw(sql.format(cols="a.*"), arg, decode_cursor(cursor), take + 1, model=_address_model(db))
+    await get_state_cache().attach(db, rows)
+    return to_page(rows, take, "Add_ID")
+
+
+async def _iter(db: Prisma, sql: str, arg: str, *, cursor: str | None, limit: int | None, chunk: int):
+    model = _address_model(db)
+    after = decode_cursor(cursor)
+    left = limit
+    while left is None or left > 0:
+        take = chunk if left is None else min(chunk, left)
+        rows = await db.query_raw(sql.format(cols="a.*"), arg, after, take, model=model)
+        await get_state_cache().attach(db, rows)
+        for r in rows:
+            yield r
+        if len(rows) < take:
+            return
+        after = rows[-1].Add_ID
+        if left is not None:
+            left -= len(rows)
+
+
+async def addresses_for_parties(
+    db: Prisma, ids: list[str], *, cursor: str | None = None, limit: int = 200, grid: bool = False
+) -> dict:
+    """Addresses of the given parties, in `Add_ID` pages, states attached.
+
+    With `grid`, rows are dicts of just the address grid's columns.
+    """
+
+    ids = _valid_ids(ids)
+    if not ids:
+        return EMPTY_PAGE
+    return await _page(db, _BY_PARTIES_SQL, ",".join(ids), cursor=cursor, limit=limit, grid=grid)
+
+
+async def addresses_for_name(
+    db: Prisma, name: str, *, cursor: str | None = None, limit: int = 200, grid: bool = False
+) -> dict:
+    """Addresses of up to 20 parties whose first or last name contains `name`."""
+
+    return await _page(db, _BY_NAME_SQL, like_pattern(name), cursor=cursor, limit=limit, grid=grid)
+
+
+async def iter_addresses_for_parties(
+    db: Prisma, ids: list[str], *, cursor: str | None = None, limit: int | None = None, chunk: int = 1000
+):
+    """Streaming form of `addresses_for_parties`: every address, `chunk` rows per query."""
+
+    ids = _valid_ids(ids)
+    if not ids:
+        return
+    async for r in _iter(db, _BY_PARTIES_SQL, ",".join(ids), cursor=cursor, limit=limit, chunk=chunk):
+        yield r
+
+
+async def iter_addresses_for_name(
+    db: Prisma, name: str, *, cursor: str | None = None, limit: int | None = None, chunk: int = 1000
+):
+    """Streaming form of `addresses_for_name`."""
+
+    async for r in _iter(db, _BY_NAME_SQL, like_pattern(name), cursor=cursor, limit=limit, chunk=chunk):
+        yield r
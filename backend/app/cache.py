@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Awaitable, Callable
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Size-bounded in-process LRU with an optional per-entry TTL.
+
+    Keeps hit/miss/eviction counters so callers can expose them on a debug
+    endpoint. Safe to share between the event loop and worker threads.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = max(int(maxsize), 1)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires, value = item
+            if expires is not None and expires <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SqliteStore:
+    """String key/value table in a local SQLite file.
+
+    Used as the second cache tier: it survives restarts and, because SQLite
+    handles locking between processes (WAL mode), every worker on the box
+    reads and warms the same file. Rows older than `ttl` are ignored and the
+    table is trimmed back to `maxrows`, oldest first.
+    """
+
+    _TRIM_EVERY = 256
+
+    def __init__(self, path: str | os.PathLike, *, table: str, maxrows: int = 100_000, ttl: float | None = None):
+        self.path = Path(path)
+        self.table = table
+        self.maxrows = max(int(maxrows), 1)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" (k TEXT PRIMARY KEY, v TEXT NOT NULL, created REAL NOT NULL)'
+        )
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_created" ON "{table}" (created)')
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(f'SELECT v, created FROM "{self.table}" WHERE k = ?', (key,)).fetchone()
+        if row is None or (self.ttl and row[1] + self.ttl <= time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO "{self.table}" (k, v, created) VALUES (?, ?, ?)',
+                (key, value, time.time()),
+            )
+            self._writes += 1
+            if self._writes % self._TRIM_EVERY == 0:
+                self._trim()
+
+    def _trim(self) -> None:
+        if self.ttl:
+            cur = self._conn.execute(f'DELETE FROM "{self.table}" WHERE created <= ?', (time.time() - self.ttl,))
+            self.evictions += max(cur.rowcount, 0)
+        (count,) = self._conn.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()
+        excess = count - self.maxrows
+        if excess > 0:
+            cur = self._conn.execute(
+                f'DELETE FROM "{self.table}" WHERE k IN (SELECT k FROM "{self.table}" ORDER BY created LIMIT ?)',
+                (excess,),
+            )
+            self.evictions += max(cur.rowcount, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            (count,) = self._conn.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()
+        return {
+            "path": str(self.path),
+            "size": count,
+            "maxrows": self.maxrows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls that share a key into one task.
+
+    The first caller for a key starts `fn()` as a task; callers arriving
+    while it runs await the same task. Its result or exception is delivered
+    to every waiter. A waiter that is cancelled only stops waiting; the task
+    itself is cancelled once nobody is waiting for it any more.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def in_flight(self, key) -> bool:
+        return key in self._calls
+
+    async def do(self, key, fn: Callable[[], Awaitable]):
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(partial(self._forget, key, call))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def claim(self, key, fn: Callable[[], Awaitable]) -> bool:
+        """Start `fn()` as the call for `key` without waiting on it, unless one is running.
+
+        For work that covers many keys at once (see `translate_many`): each
+        key claimed here is joined by later `do` callers instead of redone.
+        """
+
+        if key in self._calls:
+            return False
+        call = _Call(asyncio.ensure_future(fn()))
+        self._calls[key] = call
+        call.task.add_done_callback(partial(self._forget, key, call))
+        self.leaders += 1
+        return True
+
+    def _forget(self, key, call: _Call, task: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark a failure as retrieved even if every waiter already left.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "shared": self.shared}
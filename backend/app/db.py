@@ -1,15 +1,150 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import os
+import time
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from prisma import Prisma
+from .metrics import count, counts
+
+if TYPE_CHECKING:
+    from prisma import Prisma
 
 
 @lru_cache(maxsize=1)
-def get_db() -> Prisma:
+def _client() -> Prisma:
+    # Imported here: the generated client is a large import that a process
+    # without DATABASE_URL (or still starting) does not need.
+    from prisma import Prisma
+
     return Prisma()
 
 
+def get_db() -> Prisma:
+    """The shared Prisma client.
+
+    While a request is being profiled it comes wrapped so every query it
+    awaits is counted as one DB round trip.
+    """
+
+    db = _client()
+    return db if counts() is None else _Counted(db)
+
+
 def db_enabled() -> bool:
     return bool(os.getenv("DATABASE_URL"))
+
+
+def fast_start() -> bool:
+    return os.getenv("FAST_START_ENABLE", "false").lower() == "true"
+
+
+class Connection:
+    """Connection state of the shared client, for `/health` and early requests.
+
+    `status` is "disabled" (no DATABASE_URL), "idle", "connecting",
+    "connected" or "failed". Errors are reported by type only: their text
+    can carry the connection string.
+    """
+
+    def __init__(self):
+        self.status = "idle" if db_enabled() else "disabled"
+        self.error: str | None = None
+        self.attempts = 0
+        self.seconds: float | None = None
+        self._connected = asyncio.Event()
+
+    async def connect(self, *, retry: float = 0.0) -> None:
+        """Connect the shared client.
+
+        With `retry`, failures are retried after `retry` seconds, doubling
+        up to 30, until it works; without, the first failure is raised.
+        """
+
+        started = time.perf_counter()
+        delay = retry
+        while True:
+            self.status = "connecting"
+            self.attempts += 1
+            try:
+                await _client().connect()
+            except Exception as exc:
+                self.status, self.error = "failed", type(exc).__name__
+                if not retry:
+                    raise
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            self.status, self.error = "connected", None
+            self.seconds = round(time.perf_counter() - started, 3)
+            self._connected.set()
+            return
+
+    async def wait(self, timeout: float) -> bool:
+        """Whether the client is connected, waiting up to `timeout` seconds for it."""
+
+        if self._connected.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def stats(self) -> dict:
+        return {"status": self.status, "error": self.error, "attempts": self.attempts, "connect_seconds": self.seconds}
+
+
+@lru_cache(maxsize=1)
+def get_connection() -> Connection:
+    return Connection()
+
+
+class ConnectedMiddleware:
+    """Holds HTTP requests until the background connect is done (fast start).
+
+    Paths in `exempt` are answered at once; any other request waits up to
+    `timeout` seconds and then gets a 503 with Retry-After.
+    """
+
+    def __init__(self, app, *, timeout: float, exempt: tuple[str, ...] = ()):
+        self.app = app
+        self.timeout = timeout
+        self.exempt = frozenset(exempt)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in self.exempt:
+            if not await get_connection().wait(self.timeout):
+                from fastapi.responses import JSONResponse
+
+                response = JSONResponse({"detail": "database not ready"}, status_code=503, headers={"Retry-After": "1"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _Counted:
+    """Proxy over the client and its model actions (`db.opt_party`, ...)."""
+
+    __slots__ = ("_target",)
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if inspect.iscoroutinefunction(attr):
+            async def call(*args, **kwargs):
+                count("db_round_trips")
+                return await attr(*args, **kwargs)
+
+            return call
+        if name.startswith("_") or callable(attr) or isinstance(attr, (str, int, float, bool, type(None))):
+            return attr
+        return _Counted(attr)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import uuid
+from typing import TYPE_CHECKING
+
+from .addresses import like_pattern
+from .paging import decode_cursor, page_size, to_page
+
+if TYPE_CHECKING:
+    from prisma import Prisma
+
+# Columns each grid kind displays (plus the row key). Columnar payloads carry
+# only these, and the queries below select only these.
+GRID_COLUMNS: dict[str, tuple[str, ...]] = {
+    "clients": ("PTY_ID", "PTY_FirstName", "PTY_LastName", "PTY_Phone"),
+    "addresses": ("Add_ID", "Add_Line1", "Add_City", "Add_Zip", "Stt_Name", "Stt_Code"),
+}
+
+_CLIENT_COLS = ", ".join(f'"{c}"' for c in GRID_COLUMNS["clients"])
+
+_CLIENT_PAGE_SQL = (
+    f'SELECT {_CLIENT_COLS} FROM "OPT_Party" '
+    'WHERE $1::uuid IS NULL OR "PTY_ID" > $1::uuid ORDER BY "PTY_ID" LIMIT $2'
+)
+
+_CLIENTS_BY_IDS_SQL = (
+    f'SELECT {_CLIENT_COLS} FROM "OPT_Party" '
+    "WHERE \"PTY_ID\" = ANY(string_to_array($1, ',')::uuid[])"
+)
+
+_CLIENTS_BY_NAME_SQL = (
+    f'SELECT {_CLIENT_COLS} FROM "OPT_Party" '
+    'WHERE "PTY_FirstName" ILIKE $1 OR "PTY_LastName" ILIKE $1 LIMIT $2'
+)
+
+
+def _value(row, col: str):
+    if isinstance(row, dict):
+        return row.get(col)
+    if col.startswith("Stt_"):
+        state = getattr(row, "state", None)
+        return getattr(state, col, None) if state is not None else None
+    return getattr(row, col, None)
+
+
+def columnar(kind: str, rows: list, *, next_cursor: str | None = None) -> dict:
+    """Grid payload with the column names once and one value array per row.
+
+    `rows` may be Prisma models or the dicts the projected queries return.
+    """
+
+    cols = GRID_COLUMNS[kind]
+    return {
+        "kind": kind,
+        "format": "columnar",
+        "columns": list(cols),
+        "values": [[_value(r, c) for c in cols] for r in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+async def client_grid_page(db: Prisma, *, cursor: str | None = None, limit: int = 50) -> dict:
+    """`keyset_page` over `OPT_Party`, selecting only the grid columns."""
+
+    take = page_size(limit)
+    rows = await db.query_raw(_CLIENT_PAGE_SQL, decode_cursor(cursor), take + 1)
+    return to_page(rows, take, "PTY_ID")
+
+
+async def client_grid_by_ids(db: Prisma, ids: list[str]) -> list[dict]:
+    """Grid columns for the given parties, in the order of `ids`."""
+
+    ids = [str(uuid.UUID(i)) for i in ids]
+    if not ids:
+        return []
+    rows = await db.query_raw(_CLIENTS_BY_IDS_SQL, ",".join(ids))
+    by_id = {r["PTY_ID"]: r for r in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+async def client_grid_by_name(db: Prisma, name: str, *, limit: int = 50) -> list[dict]:
+    """Grid columns for parties whose first or last name contains `name`."""
+
+    return await db.query_raw(_CLIENTS_BY_NAME_SQL, like_pattern(name), limit)
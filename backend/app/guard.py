@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+
+from .metrics import count
+from .nlp import Intent, classify, within_budget
+
+
+def max_message_chars() -> int:
+    return int(os.getenv("CLASSIFY_MAX_CHARS", "1000"))
+
+
+def classify_budget() -> int:
+    # In `classify_cost` units. 1e11 is ~80x the costliest message generated
+    # from the rules (bench.corpus), and well under a millisecond of matching
+    # on the inputs bench.nlp builds to blow the patterns up.
+    return int(float(os.getenv("CLASSIFY_BUDGET", "1e11")))
+
+
+def classify_timeout() -> float:
+    return float(os.getenv("CLASSIFY_TIMEOUT_SECONDS", "2"))
+
+
+def _classify_counted(message: str) -> tuple[Intent, dict[str, int]]:
+    # Runs in a pool worker; the counters travel back with the intent.
+    stats: dict[str, int] = {}
+    return classify(message, stats=stats), stats
+
+
+class ClassifyPool:
+    """Worker processes for messages too expensive to match on the event loop.
+
+    `re` holds the GIL for a whole search, so a thread would not help. The
+    pool is started on first use; a search that runs past the timeout gets
+    the pool terminated and restarted, so a pathological message cannot pin
+    a worker for good.
+    """
+
+    def __init__(self, *, processes: int):
+        self.processes = max(processes, 1)
+        self._pool = None
+        self._lock = threading.Lock()
+        self.offloaded = 0
+        self.timeouts = 0
+
+    def _get(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: a forked copy of a running server (event loop, Prisma
+                # engine, sockets) is not something to run code in.
+                self._pool = multiprocessing.get_context("spawn").Pool(self.processes)
+            return self._pool
+
+    def _recycle(self, pool) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.terminate()
+
+    async def classify(self, message: str, *, timeout: float, stats: dict[str, int] | None = None) -> Intent:
+        """`classify` in a worker; with `stats`, its counters are added to them."""
+
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def settle(ok: bool, value) -> None:
+            if not done.done():
+                done.set_result(value) if ok else done.set_exception(value)
+
+        pool = self._get()
+        self.offloaded += 1
+        pool.apply_async(
+            classify if stats is None else _classify_counted,
+            (message,),
+            callback=lambda v: loop.call_soon_threadsafe(settle, True, v),
+            error_callback=lambda e: loop.call_soon_threadsafe(settle, False, e),
+        )
+        try:
+            out = await asyncio.wait_for(done, timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            await asyncio.to_thread(self._recycle, pool)
+            return Intent("unknown")
+        if stats is None:
+            return out
+        intent, counted = out
+        for key, n in counted.items():
+            stats[key] = stats.get(key, 0) + n
+        return intent
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+
+    def stats(self) -> dict:
+        return {"processes": self.processes, "offloaded": self.offloaded, "timeouts": self.timeouts}
+
+
+_pool: ClassifyPool | None = None
+
+
+def get_classify_pool() -> ClassifyPool:
+    global _pool
+    if _pool is None:
+        _pool = ClassifyPool(processes=int(os.getenv("CLASSIFY_WORKERS", "2")))
+    return _pool
+
+
+async def classify_guarded(message: str, *, stats: dict[str, int] | None = None) -> Intent:
+    """`classify`, off the event loop when the message blows the matching budget.
+
+    Within budget it runs inline, exactly as `classify(message, stats=...)`.
+    Otherwise it goes to `ClassifyPool`, and the worker's counters are added
+    to `stats`; a search that outlives CLASSIFY_TIMEOUT_SECONDS is abandoned
+    and the message is "unknown".
+    Messages are assumed to be within `max_message_chars()` already.
+    """
+
+    if within_budget(message, classify_budget()):
+        return classify(message, stats=stats)
+    count("classify_offloaded")
+    return await get_classify_pool().classify(message, timeout=classify_timeout(), stats=stats)
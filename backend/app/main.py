@@ -1,20 +1,58 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from functools import partial
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 
 _BACKEND_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(_BACKEND_ROOT / ".env", override=False)
 
-from .db import db_enabled, get_db
-from .models import ChatQueryIn, ChatQueryOut, TranslateIn, TranslateOut
-from .nlp import classify
+from .addresses import (
+    addresses_for_name,
+    addresses_for_parties,
+    iter_addresses_for_name,
+    iter_addresses_for_parties,
+)
+from .db import ConnectedMiddleware, db_enabled, fast_start, get_connection, get_db
+from .grids import client_grid_by_ids, client_grid_by_name, client_grid_page, columnar
+from .guard import classify_guarded, get_classify_pool, max_message_chars
+from .messages import reply_text
+from .metrics import counts, finish_request, stage, start_request
+from .metrics import render as render_metrics
+from .name_index import get_name_index, index_party, rebuild_name_index
+from .models import (
+    ChatQueryIn,
+    ChatQueryOut,
+    GridFormat,
+    TranslateBatchIn,
+    TranslateBatchOut,
+    TranslateIn,
+    TranslateOut,
+)
+from .nlp import Intent, detect_script, rule_engine, rules_ready
+from .paging import EMPTY_PAGE, iter_keyset, keyset_page, page_size
+from .profiling import profiling_enabled, sample_path, start_profile
+from .responses import CompressionMiddleware, compression_enabled, render_response, respond
+from .results import cached, get_result_cache
 from .seed import seed_sample_data
-from .translate import translation_enabled, translate_text
+from .sessions import ResultSet, conversation_id, get_session_cache, held_page
+from .shared import (
+    GenerationMiddleware,
+    get_generation,
+    load_shared_name_index,
+    multi_worker,
+    publish_data_change,
+)
+from .states import get_state_cache
+from .streaming import ndjson_response, wants_ndjson
+from .translate import get_translation_cache, translation_enabled, translate_many, translate_text
+from .translators import get_translator
 
 
 def _codepoints(s: str) -> list[str]:
@@ -22,40 +60,50 @@ def _codepoints(s: str) -> list[str]:
     return [f"U+{ord(ch):04X}" for ch in s]
 
 
-def _help_text(lang: str | None) -> str:
-    l = (lang or "en").lower()
-    if l.startswith("hi"):
-        return (
-            "इनमें से एक आज़माएँ: क्लाइंट सूची, क्लाइंट नाम: <नाम>, क्लाइंट आईडी: <आईडी>, "
-            "क्लाइंट आईडी के लिए पता: <आईडी>, क्लाइंट नाम के लिए पता: <नाम>."
-        )
-    if l.startswith("te"):
-        return (
-            "ఇవ్వాటిలో ఒకటి ప్రయత్నించండి: క్లయింట్ల జాబితా / క్లయింట్ల జాబితా ఇవ్వండి, క్లయింట్ పేరు: <పేరు>, క్లయింట్ ఐడి: <ఐడి>, "
-            "క్లయింట్ ఐడికి చిరునామా: <ఐడి>, క్లయింట్ పేరుకు చిరునామా: <పేరు>."
-        )
-    return (
-        "Try one of: List clients, Show client name: <name>, Show client id: <id>, "
-        "Get address for client id: <id>, Get address for client name: <name>."
-    )
+_NATIVE_SCRIPTS = {"devanagari", "telugu"}
 
 
-def _not_available_text(lang: str | None, value: str) -> str:
-    l = (lang or "en").lower()
-    if l.startswith("hi"):
-        return f"'{value}' हमारे डेटा में उपलब्ध नहीं है।"
-    if l.startswith("te"):
-        return f"'{value}' మా డేటాలో అందుబాటులో లేదు."
-    return f"'{value}' is not available in our data."
+async def _route_intent(msg: str, lang: str | None) -> tuple[Intent, str]:
+    """Classify `msg`, paying for machine translation only when it can help.
 
+    Returns the intent and the path taken:
+      - "direct": English UI, translation off, or Latin-script text (even
+        with lang=hi/te); classified as typed.
+      - "native": Devanagari/Telugu text that a native rule matched.
+      - "native+value": as "native", but the extracted non-Latin name was
+        translated so it can be looked up against Latin-script rows. Only
+        needed while the name index (which transliterates locally) is not
+        loaded.
+      - "translated": anything else; translated to English once and
+        classified.
+    """
+
+    script = detect_script(msg)
+    if not (translation_enabled() and lang and lang != "en") or script in {"latin", "none"}:
+        with stage("classify"):
+            return await classify_guarded(msg, stats=counts()), "direct"
+
+    if script in _NATIVE_SCRIPTS:
+        with stage("classify"):
+            intent = await classify_guarded(msg, stats=counts())
+        if intent.name != "unknown":
+            if (
+                intent.value
+                and intent.name.endswith("_name")
+                and get_name_index() is None
+                and detect_script(intent.value) in _NATIVE_SCRIPTS
+            ):
+                with stage("value_translate"):
+                    intent.value = await translate_text(text=intent.value, source=lang, target="en")
+                return intent, "native+value"
+            return intent, "native"
+
+    # A native-script miss is a retry; anything else is translated up front.
+    with stage("retry_translate" if script in _NATIVE_SCRIPTS else "pre_translate"):
+        msg_en = await translate_text(text=msg, source=lang, target="en")
+    with stage("classify"):
+        return await classify_guarded(msg_en, stats=counts()), "translated"
 
-def _no_addresses_text(lang: str | None, value: str) -> str:
-    l = (lang or "en").lower()
-    if l.startswith("hi"):
-        return f"'{value}' के लिए हमारे डेटा में कोई पता उपलब्ध नहीं है।"
-    if l.startswith("te"):
-        return f"'{value}' కోసం మా డేటాలో చిరునామాలు అందుబాటులో లేవు."
-    return f"No addresses available in our data for '{value}'."
 
 app = FastAPI(title="Aria API", version="0.1.0")
 
@@ -65,31 +113,239 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"] ,
     allow_headers=["*"],
+    # Readable by the dev frontend, which runs on another origin.
+    expose_headers=["Server-Timing", "X-Aria-Route"],
 )
 
+if compression_enabled():
+    app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024")))
+
+if db_enabled():
+    # Notice data written by other processes: sibling workers forked by
+    # serve.py, or seed_cli.py next to a single server.
+    app.add_middleware(GenerationMiddleware)
+
+if fast_start() and db_enabled():
+    # The database connects after startup; until it has, requests wait here.
+    app.add_middleware(
+        ConnectedMiddleware,
+        timeout=float(os.getenv("DB_CONNECT_WAIT_SECONDS", "10")),
+        exempt=("/health", "/metrics"),
+    )
+
+
+def name_index_enabled() -> bool:
+    return os.getenv("NAME_INDEX_ENABLE", "true").lower() != "false"
+
+
+_background: set[asyncio.Task] = set()
+
+
+def _in_background(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def _load_name_index() -> None:
+    # Name lookups fall back to ILIKE until the index is loaded. With several
+    # workers one of them builds it and the rest load its snapshot.
+    db = get_db()
+    _in_background(load_shared_name_index(db) if multi_worker() else rebuild_name_index(db))
+
+
+def _on_data_change(generation: int) -> None:
+    """Another process wrote parties or addresses: drop what was read before."""
+
+    get_state_cache().invalidate()
+    get_result_cache().invalidate()
+    get_session_cache().invalidate()
+    if db_enabled() and name_index_enabled():
+        _load_name_index()
+
+
+async def _connect(retry: float = 0.0) -> None:
+    await get_connection().connect(retry=retry)
+    if name_index_enabled():
+        _load_name_index()
+
 
 @app.on_event("startup")
 async def _startup() -> None:
     if db_enabled():
-        db = get_db()
-        await db.connect()
+        get_generation().on_change(_on_data_change)
+    if fast_start():
+        # Accept connections at once; /health reports when this is done.
+        _in_background(asyncio.to_thread(rule_engine))
+        if db_enabled():
+            _in_background(_connect(retry=1.0))
+        return
+    rule_engine()
+    if db_enabled():
+        await _connect()
 
 
 @app.on_event("shutdown")
 async def _shutdown() -> None:
-    if db_enabled():
-        db = get_db()
-        await db.disconnect()
+    for task in list(_background):
+        task.cancel()
+    if get_connection().connected:
+        await get_db().disconnect()
+    if translation_enabled():
+        await get_translator().aclose()
+    get_classify_pool().close()
 
 
-@app.get("/clients")
-async def clients(limit: int = 50, offset: int = 0):
+def _paged(page: dict, cursor: str | None):
+    # Callers that don't send `cursor` still get the bare list they used to.
+    return page if cursor is not None else page["rows"]
+
+
+def _grid_payload(kind: str, page: dict, grid: bool) -> dict:
+    if grid:
+        return columnar(kind, page["rows"], next_cursor=page.get("next_cursor"))
+    return {"kind": kind, **page}
+
+
+async def _client_page(*, cursor: str | None = None, limit: int = 50, grid: bool = False) -> dict:
+    """A page of clients; `grid` selects only the client grid's columns."""
+
     if not db_enabled():
-        return []
+        return EMPTY_PAGE
     db = get_db()
-    take = min(max(limit, 1), 200)
-    skip = max(offset, 0)
-    return await db.opt_party.find_many(take=take, skip=skip)
+    load = (
+        partial(client_grid_page, db, cursor=cursor, limit=limit)
+        if grid
+        else partial(keyset_page, db.opt_party, key="PTY_ID", cursor=cursor, limit=limit)
+    )
+    return await cached("list_clients", None, (cursor or "", page_size(limit), grid), load)
+
+
+async def _no_rows():
+    return
+    yield
+
+
+async def _iter_list(rows: list):
+    for r in rows:
+        yield r
+
+
+async def _peek(rows):
+    """`rows` with its first item already fetched, or None if it is empty."""
+
+    it = aiter(rows)
+    first = await anext(it, None)
+    if first is None:
+        return None
+
+    async def chained():
+        yield first
+        async for r in it:
+            yield r
+
+    return chained()
+
+
+@app.get("/clients")
+async def clients(
+    request: Request,
+    limit: int | None = None,
+    offset: int = 0,
+    cursor: str | None = None,
+    stream: bool = False,
+    format: GridFormat = "rows",
+):
+    """Clients in `PTY_ID` order.
+
+    Pass `cursor` (empty for the first page, then each response's
+    `next_cursor`) to get `{"rows", "next_cursor"}` pages that cost the same
+    at any depth; with `format=columnar` the page is a columnar clients grid
+    payload instead. `offset` is kept for older clients only.
+
+    With `Accept: application/x-ndjson` or `?stream=1` every client from
+    `cursor` on (at most `limit`, if given) is streamed one per line.
+    """
+
+    if wants_ndjson(request, stream):
+        if not db_enabled():
+            return ndjson_response(_no_rows())
+        return ndjson_response(iter_keyset(get_db().opt_party, key="PTY_ID", cursor=cursor, limit=limit))
+    limit = limit or 50
+    if cursor is None and offset > 0:
+        if not db_enabled():
+            return []
+        return await get_db().opt_party.find_many(take=page_size(limit), skip=offset, order={"PTY_ID": "asc"})
+    if cursor is not None:
+        grid = format == "columnar"
+        page = await _conversation_client_page(conversation_id(request), cursor=cursor, limit=limit, grid=grid)
+        if grid:
+            return respond(_grid_payload("clients", page, True))
+        return respond(page)
+    return respond(_paged(await _client_page(cursor=cursor, limit=limit), cursor))
+
+
+async def _conversation_client_page(conversation: str | None, *, cursor: str, limit: int, grid: bool) -> dict:
+    """`_client_page`, remembered as the conversation's client list.
+
+    A page the conversation already visited is served from the session, and
+    "addresses for these" afterwards means the clients on the page shown.
+    """
+
+    if conversation is None:
+        return await _client_page(cursor=cursor, limit=limit, grid=grid)
+    sessions = get_session_cache()
+    rs = sessions.get(conversation)
+    if rs is None or (rs.intent, rs.grid, rs.limit) != ("list_clients", grid, page_size(limit)):
+        rs = ResultSet("clients", "list_clients", None, grid, limit=page_size(limit))
+    held = held_page(rs, cursor, grid)
+    if held is not None:
+        rs.index = rs.find(cursor)
+        sessions.put(conversation, rs)
+        return {"rows": held.rows, "next_cursor": held.next_cursor}
+    page = await _client_page(cursor=cursor, limit=limit, grid=grid)
+    rs.show(cursor, page["rows"], page.get("next_cursor"))
+    sessions.put(conversation, rs)
+    return page
+
+
+@app.get("/metrics")
+async def metrics():
+    """Stage latency histograms and request/cache counters, Prometheus text format."""
+
+    caches = {"translation": get_translation_cache().memory.stats(), "results": get_result_cache().memory.stats()}
+    caches["sessions"] = get_session_cache().stats()
+    return PlainTextResponse(render_metrics(caches), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/profiles/{name}")
+async def debug_profile(name: str):
+    """A sampled request profile saved by `X-Aria-Profile: sample`."""
+
+    path = sample_path(name) if profiling_enabled() else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="no such profile")
+    return FileResponse(path, media_type="text/html")
+
+
+@app.get("/health")
+async def health():
+    """Readiness: 200 once the rules are built and the database (if any) is connected, else 503.
+
+    The name index is reported but not waited for; lookups fall back to
+    the database until it is loaded.
+    """
+
+    db = get_connection()
+    ready = rules_ready() and db.status in ("connected", "disabled")
+    body = {
+        "ready": ready,
+        "fast_start": fast_start(),
+        "rules": rules_ready(),
+        "db": db.stats(),
+        "name_index": get_name_index() is not None,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
 
 
 @app.get("/debug/db")
@@ -112,19 +368,76 @@ async def debug_db():
     }
 
 
+@app.get("/debug/cache")
+async def debug_cache():
+    """Hit/miss/eviction counters for the in-process and on-disk caches."""
+
+    idx = get_name_index()
+    return {
+        "translation": get_translation_cache().stats(),
+        "name_index": idx.stats() if idx is not None else None,
+        "states": get_state_cache().stats(),
+        "results": get_result_cache().stats(),
+        "sessions": get_session_cache().stats(),
+        "shared": get_generation().stats() if db_enabled() else None,
+    }
+
+
 @app.post("/seed")
 async def seed(clients: int = 12):
     if not db_enabled():
         raise HTTPException(status_code=400, detail="DATABASE_URL not configured")
     db = get_db()
-    return await seed_sample_data(db, clients=clients)
+    out = await seed_sample_data(db, clients=clients, on_party=index_party)
+    get_state_cache().invalidate()
+    get_result_cache().invalidate()
+    get_session_cache().invalidate()
+    if multi_worker():
+        await publish_data_change(get_name_index())
+    return out
+
+
+async def _parties_by_ids(db, ids: list[str]) -> list:
+    """Fetch parties by primary key, preserving the order of `ids`."""
+
+    if not ids:
+        return []
+    rows = await db.opt_party.find_many(where={"PTY_ID": {"in": ids}})
+    by_id = {r.PTY_ID: r for r in rows}
+    return [by_id[i] for i in ids if i in by_id]
 
 
 @app.get("/client/name/{name}")
 async def client_by_name(name: str):
+    return respond(await _client_rows(name))
+
+
+async def _client_rows(name: str) -> list:
+    """Clients matching `name` as models; what chat answers and streams use."""
+
+    if not db_enabled():
+        return []
+    return await cached("client_by_name", name, False, lambda: _search_clients(name))
+
+
+async def _client_grid_by_name(name: str) -> list[dict]:
     if not db_enabled():
         return []
+
+    async def load() -> list[dict]:
+        idx = get_name_index()
+        if idx is not None:
+            return await client_grid_by_ids(get_db(), idx.search(name, limit=50))
+        return await client_grid_by_name(get_db(), name, limit=50)
+
+    return await cached("client_by_name", name, True, load)
+
+
+async def _search_clients(name: str) -> list:
     db = get_db()
+    idx = get_name_index()
+    if idx is not None:
+        return await _parties_by_ids(db, idx.search(name, limit=50))
     return await db.opt_party.find_many(
         where={
             "OR": [
@@ -136,121 +449,371 @@ async def client_by_name(name: str):
     )
 
 
-@app.get("/client/{id}/address")
-async def address_by_client_id(id: str):
+@app.get("/client/{id}")
+async def client_by_id(id: str):
+    """One client with every column, e.g. for a row picked from a columnar grid."""
+
     if not db_enabled():
-        return []
+        raise HTTPException(status_code=404, detail="client not found")
     db = get_db()
-    return await db.opt_address.find_many(where={"Add_PartyID": id}, include={"state": True})
+    c = await cached("client_by_id", id, None, lambda: db.opt_party.find_unique(where={"PTY_ID": id}))
+    if c is None:
+        raise HTTPException(status_code=404, detail="client not found")
+    return respond(c)
 
 
-@app.get("/client/address/name/{name}")
-async def address_by_client_name(name: str):
+@app.get("/client/{id}/address")
+async def address_by_client_id(
+    id: str, request: Request, limit: int | None = None, cursor: str | None = None, stream: bool = False
+):
+    if wants_ndjson(request, stream):
+        if not db_enabled():
+            return ndjson_response(_no_rows())
+        return ndjson_response(iter_addresses_for_parties(get_db(), [id], cursor=cursor, limit=limit))
+    limit = limit or 200
+    return respond(_paged(await _address_page_by_id(id, cursor=cursor, limit=limit), cursor))
+
+
+async def _address_page_by_id(id: str, *, cursor: str | None = None, limit: int = 200, grid: bool = False) -> dict:
     if not db_enabled():
-        return []
-    db = get_db()
-    clients = await db.opt_party.find_many(
-        where={
-            "OR": [
-                {"PTY_FirstName": {"contains": name, "mode": "insensitive"}},
-                {"PTY_LastName": {"contains": name, "mode": "insensitive"}},
-            ]
-        },
-        take=20,
+        return EMPTY_PAGE
+    return await cached(
+        "address_by_client_id",
+        id,
+        (cursor or "", page_size(limit), grid),
+        lambda: addresses_for_parties(get_db(), [id], cursor=cursor, limit=limit, grid=grid),
     )
-    if not clients:
-        return []
-    ids = [c.PTY_ID for c in clients]
-    return await db.opt_address.find_many(where={"Add_PartyID": {"in": ids}}, include={"state": True})
 
 
-@app.post("/chat/query", response_model=ChatQueryOut)
-async def chat_query(body: ChatQueryIn):
+async def _address_page_by_parties(
+    ids: list[str], *, cursor: str | None = None, limit: int = 200, grid: bool = False
+) -> dict:
+    """Addresses of every party in `ids`, in one statement whatever their number."""
+
+    if not db_enabled() or not ids:
+        return EMPTY_PAGE
+    return await cached(
+        "addresses_for_parties",
+        ",".join(ids),
+        (cursor or "", page_size(limit), grid),
+        lambda: addresses_for_parties(get_db(), ids, cursor=cursor, limit=limit, grid=grid),
+    )
+
+
+async def _address_page_by_name(name: str, *, cursor: str | None = None, limit: int = 200, grid: bool = False) -> dict:
+    """Addresses for a client name in a single SQL statement.
+
+    With the name index loaded the party ids are already known; otherwise the
+    name search runs as a subquery of the address fetch.
+    """
+
+    page, _ = await _address_match_by_name(name, cursor=cursor, limit=limit, grid=grid)
+    return page
+
+
+async def _address_match_by_name(
+    name: str, *, cursor: str | None = None, limit: int = 200, grid: bool = False
+) -> tuple[dict, list[str]]:
+    """`_address_page_by_name` and the party ids it matched (empty without the name index)."""
+
+    if not db_enabled():
+        return EMPTY_PAGE, []
+
+    async def load() -> dict:
+        db = get_db()
+        idx = get_name_index()
+        if idx is not None:
+            ids = idx.search(name, limit=20)
+            page = await addresses_for_parties(db, ids, cursor=cursor, limit=limit, grid=grid)
+            return {**page, "party_ids": ids}
+        return {**await addresses_for_name(db, name, cursor=cursor, limit=limit, grid=grid), "party_ids": []}
+
+    out = await cached("address_by_client_name", name, (cursor or "", page_size(limit), grid), load)
+    return {"rows": out["rows"], "next_cursor": out.get("next_cursor")}, out["party_ids"]
+
+
+def _iter_addresses_by_name(name: str, *, cursor: str | None = None, limit: int | None = None):
+    if not db_enabled():
+        return _no_rows()
+    db = get_db()
+    idx = get_name_index()
+    if idx is not None:
+        return iter_addresses_for_parties(db, idx.search(name, limit=20), cursor=cursor, limit=limit)
+    return iter_addresses_for_name(db, name, cursor=cursor, limit=limit)
+
+
+@app.get("/client/address/name/{name}")
+async def address_by_client_name(
+    name: str, request: Request, limit: int | None = None, cursor: str | None = None, stream: bool = False
+):
+    if wants_ndjson(request, stream):
+        return ndjson_response(_iter_addresses_by_name(name, cursor=cursor, limit=limit))
+    limit = limit or 200
+    return respond(_paged(await _address_page_by_name(name, cursor=cursor, limit=limit), cursor))
+
+
+def _chat_message(body: ChatQueryIn) -> str:
     msg = (body.message or "").strip()
     if not msg:
         raise HTTPException(status_code=400, detail="empty message")
+    if len(msg) > max_message_chars():
+        raise HTTPException(status_code=413, detail=f"message longer than {max_message_chars()} characters")
+    return msg
 
-    # If the user is chatting in a non-English language, translate the query to English
-    # first for intent classification. This makes intent matching resilient even when
-    # users phrase things in many ways.
-    msg_for_intent = msg
-    if translation_enabled() and body.lang and body.lang != "en":
-        try:
-            msg_for_intent = await translate_text(text=msg, source=body.lang, target="en")
-        except Exception:
-            msg_for_intent = msg
 
-    intent = classify(msg_for_intent)
+@app.post("/chat/query", response_model=ChatQueryOut)
+async def chat_query(body: ChatQueryIn, request: Request, stream: bool = False):
+    """Answer a chat message.
 
-    # Extra safety net: if we still can't classify and the user is not in English,
-    # translate to English and retry. This helps when non-Latin text arrives in a
-    # degraded form that regex rules can't match.
-    if intent.name == "unknown" and translation_enabled() and body.lang and body.lang != "en":
-        try:
-            retry_en = await translate_text(text=msg, source=body.lang, target="en")
-            intent = classify(retry_en)
-        except Exception:
-            pass
+    With `Accept: application/x-ndjson` or `?stream=1` the reply envelope
+    (payload without `rows`) is the first line and every grid row follows on
+    its own line; grids stream the full result rather than the first page.
 
-    if intent.name == "list_clients":
-        # Deterministic localized reply (avoid MT flakiness for short phrases)
-        if (body.lang or "").lower().startswith("te"):
-            reply = "ఇవి తాజా క్లయింట్లు."
-        elif (body.lang or "").lower().startswith("hi"):
-            reply = "ये नवीनतम क्लाइंट हैं।"
+    Stage timings (translate, classify, db, reply_translate, serialize) are
+    recorded per intent and language for `/metrics`.
+
+    With an `X-Aria-Conversation` id the grid shown is kept per conversation
+    (see `app.sessions`), and "addresses for these", "next page" and
+    "previous page" are answered from it.
+
+    `X-Aria-Profile: 1` adds a `Server-Timing` header and a `profile` key
+    with the stage breakdown and work counters (serialization, which runs
+    after it is taken, is only in the header). `X-Aria-Profile: sample` also
+    saves a sampled profile when REQUEST_PROFILE_SAMPLING is on; fetch it
+    from `/debug/profiles/{name}`.
+    """
+
+    msg = _chat_message(body)
+    conversation = conversation_id(request)
+    profile = start_profile(request)
+    timer = profile.timer if profile is not None else start_request()
+    intent_name = "none"
+    failed = True
+    try:
+        intent, route = await _route_intent(msg, body.lang)
+        intent_name = intent.name
+        if timer is not None:
+            timer.route = route
+        headers = {"X-Aria-Route": route}
+        if wants_ndjson(request, stream):
+            head, rows = await _chat_stream(intent, body.lang, conversation)
+            if profile is not None:
+                # Covers the work before the first row only.
+                head = {**dict(head), "profile": profile.report(label=intent_name)}
+                headers["Server-Timing"] = profile.server_timing()
+            failed = False
+            return ndjson_response(rows, head=head, headers=headers)
+        out = await _chat_answer(intent, body.lang, grid=body.grid_format == "columnar", conversation=conversation)
+        if profile is not None:
+            out = {**dict(out), "profile": profile.report(label=intent_name)}
+        with stage("serialize"):
+            resp = render_response(out, headers=headers)
+        if profile is not None:
+            resp.headers["Server-Timing"] = profile.server_timing()
+        failed = False
+        return resp
+    finally:
+        if profile is not None:
+            profile.close()
+        finish_request(timer, endpoint="chat_query", intent=intent_name, lang=body.lang, failed=failed)
+
+
+async def _chat_stream(intent: Intent, lang: str | None, conversation: str | None = None):
+    """(envelope, row iterator) for a streamed chat reply.
+
+    Streamed grids are not kept for follow-ups; the conversation's earlier
+    result set is dropped, as it is no longer what the user sees.
+    """
+
+    rows = None
+    if db_enabled():
+        if intent.name == "list_clients":
+            rows = await _peek(iter_keyset(get_db().opt_party, key="PTY_ID"))
+        elif intent.name == "client_by_name" and intent.value:
+            rows = await _peek(_iter_list(await _client_rows(intent.value)))
+        elif intent.name == "address_by_client_id" and intent.value:
+            rows = await _peek(iter_addresses_for_parties(get_db(), [intent.value]))
+        elif intent.name == "address_by_client_name" and intent.value:
+            rows = await _peek(_iter_addresses_by_name(intent.value))
+
+    if rows is None:
+        # Nothing to stream: the regular answer (empty/form/help) as a single line.
+        return await _chat_answer(intent, lang, conversation=conversation), _no_rows()
+    get_session_cache().drop(conversation)
+
+    if intent.name in ("list_clients", "client_by_name"):
+        key = "list_clients" if intent.name == "list_clients" else "results_for"
+        head = ChatQueryOut(
+            reply=await reply_text(key, lang, value=intent.value), type="grid", title="Clients", payload={"kind": "clients"}
+        )
+    else:
+        key = "addresses_for_client" if intent.name == "address_by_client_id" else "addresses_for"
+        head = ChatQueryOut(
+            reply=await reply_text(key, lang, value=intent.value),
+            type="grid",
+            title="Addresses",
+            payload={"kind": "addresses"},
+        )
+    return head, rows
+
+
+def _remember(conversation: str | None, rs: ResultSet, page: dict) -> None:
+    """Make the first page of `rs` what the conversation's follow-ups refer to."""
+
+    if conversation is None:
+        return
+    if not page["rows"]:
+        get_session_cache().drop(conversation)
+        return
+    rs.show("", page["rows"], page.get("next_cursor"))
+    get_session_cache().put(conversation, rs)
+
+
+async def _result_page(rs: ResultSet, cursor: str) -> dict:
+    """Page `cursor` of the query behind `rs`, in the `rs.grid` row shape.
+
+    Client searches are one page, fetched again by the ids it held.
+    """
+
+    if rs.intent in ("client_by_name", "client_by_id"):
+        i = rs.find(cursor)
+        ids = rs.pages[i].keys if i is not None else []
+        if not (ids and db_enabled()):
+            return EMPTY_PAGE
+        db = get_db()
+        rows = await (client_grid_by_ids(db, ids) if rs.grid else _parties_by_ids(db, ids))
+        return {"rows": rows, "next_cursor": None}
+    if rs.intent == "list_clients":
+        return await _client_page(cursor=cursor, limit=rs.limit, grid=rs.grid)
+    if rs.intent == "address_by_client_id":
+        return await _address_page_by_id(rs.value, cursor=cursor, limit=rs.limit, grid=rs.grid)
+    if rs.intent == "address_by_client_name":
+        return await _address_page_by_name(rs.value, cursor=cursor, limit=rs.limit, grid=rs.grid)
+    if rs.kind == "addresses":
+        return await _address_page_by_parties(rs.party_ids, cursor=cursor, limit=rs.limit, grid=rs.grid)
+    return EMPTY_PAGE
+
+
+_FOLLOW_UPS = {"addresses_for_results", "next_page", "previous_page"}
+
+
+async def _follow_up(intent: Intent, lang: str | None, *, grid: bool, conversation: str | None) -> ChatQueryOut:
+    """A follow-up on the conversation's last grid, from the session cache.
+
+    "addresses for these" after a client grid fetches the addresses of the
+    clients on screen in one statement; after an address grid it shows that
+    grid again. Pages already visited are served from memory, new ones with
+    the cursor the last page ended on.
+    """
+
+    sessions = get_session_cache()
+    rs = sessions.get(conversation)
+    if rs is None or not rs.pages:
+        return ChatQueryOut(reply=await reply_text("nothing_to_follow", lang), type="empty")
+    if rs.grid != grid:
+        # Full rows project to grid columns as they are; grid rows lack the
+        # other columns, so those pages are fetched again by cursor or key.
+        if not grid:
+            for p in rs.pages:
+                p.rows = None
+        rs.grid = grid
+
+    key, target, shown = "page", rs.index, None
+    if intent.name == "addresses_for_results":
+        key = "addresses_for_these"
+        if rs.kind == "clients":
+            rs = ResultSet("addresses", "addresses_for_results", None, grid, limit=200, party_ids=rs.clients())
+            page = await _address_page_by_parties(rs.party_ids, grid=grid)
+            if not page["rows"]:
+                return ChatQueryOut(reply=await reply_text("no_addresses_these", lang), type="empty")
+            shown = rs.show("", page["rows"], page.get("next_cursor"))
+    elif intent.name == "previous_page":
+        if rs.index == 0:
+            key = "first_page"
+        target = max(rs.index - 1, 0)
+    elif rs.index + 1 < len(rs.pages) or rs.current.next_cursor:
+        target = rs.index + 1
+    else:
+        key = "no_more_pages"
+
+    if shown is None:
+        cursor = rs.pages[target].cursor if target < len(rs.pages) else rs.current.next_cursor
+        shown = held_page(rs, cursor, grid)
+        if shown is None:
+            page = await _result_page(rs, cursor)
+            shown = rs.show(cursor, page["rows"], page.get("next_cursor"))
         else:
-            reply = "Here are the latest clients."
-        rows = await clients(limit=50)
-        return ChatQueryOut(reply=reply, type="grid", title="Clients", payload={"kind": "clients", "rows": rows})
+            rs.index = target
+    sessions.put(conversation, rs)
+
+    reply = await reply_text(key, lang, value=rs.index + 1)
+    payload = _grid_payload(rs.kind, {"rows": shown.rows, "next_cursor": shown.next_cursor}, grid)
+    return ChatQueryOut(reply=reply, type="grid", title=rs.kind.title(), payload=payload)
+
+
+async def _chat_answer(
+    intent: Intent, lang: str | None, *, grid: bool = False, conversation: str | None = None
+) -> ChatQueryOut:
+    if intent.name in _FOLLOW_UPS:
+        return await _follow_up(intent, lang, grid=grid, conversation=conversation)
+
+    if intent.name == "list_clients":
+        page = await _client_page(limit=50, grid=grid)
+        _remember(conversation, ResultSet("clients", "list_clients", None, grid), page)
+        reply = await reply_text("list_clients", lang)
+        return ChatQueryOut(reply=reply, type="grid", title="Clients", payload=_grid_payload("clients", page, grid))
 
     if intent.name == "client_by_name":
         if not intent.value:
-            return ChatQueryOut(reply="Type the client name after ':'", type="empty")
-        rows = await client_by_name(intent.value)
+            return ChatQueryOut(reply=await reply_text("need_name", lang), type="empty")
+        rows = await (_client_grid_by_name(intent.value) if grid else _client_rows(intent.value))
+        _remember(conversation, ResultSet("clients", "client_by_name", intent.value, grid), {"rows": rows})
         if not rows:
-            return ChatQueryOut(reply=_not_available_text(body.lang, intent.value), type="empty")
+            return ChatQueryOut(reply=await reply_text("not_available", lang, value=intent.value), type="empty")
 
-        reply = f"Results for '{intent.value}'."
-        if translation_enabled() and body.lang and body.lang != "en":
-            reply = await translate_text(text=reply, source="en", target=body.lang)
-        return ChatQueryOut(reply=reply, type="grid", title="Clients", payload={"kind": "clients", "rows": rows})
+        reply = await reply_text("results_for", lang, value=intent.value)
+        payload = _grid_payload("clients", {"rows": rows}, grid)
+        return ChatQueryOut(reply=reply, type="grid", title="Clients", payload=payload)
 
     if intent.name == "client_by_id":
         if not intent.value:
-            return ChatQueryOut(reply="Type a client id (UUID) after ':'.", type="empty")
+            return ChatQueryOut(reply=await reply_text("need_id", lang), type="empty")
         if not db_enabled():
-            return ChatQueryOut(reply="Database not configured.", type="empty")
+            return ChatQueryOut(reply=await reply_text("db_not_configured", lang), type="empty")
         db = get_db()
-        c = await db.opt_party.find_unique(where={"PTY_ID": intent.value})
+        c = await cached(
+            "client_by_id", intent.value, None, lambda: db.opt_party.find_unique(where={"PTY_ID": intent.value})
+        )
+        rs = ResultSet("clients", "client_by_id", intent.value, False)
+        _remember(conversation, rs, {"rows": [c] if c else []})
         if not c:
-            return ChatQueryOut(reply="Client not found.", type="empty")
-        reply = "Client details."
-        if translation_enabled() and body.lang and body.lang != "en":
-            reply = await translate_text(text=reply, source="en", target=body.lang)
+            return ChatQueryOut(reply=await reply_text("client_not_found", lang), type="empty")
+        reply = await reply_text("client_details", lang)
         return ChatQueryOut(reply=reply, type="form", title="Client", payload={"client": c})
 
     if intent.name == "address_by_client_id":
         if not intent.value:
-            return ChatQueryOut(reply="Type a client id (UUID) after ':'.", type="empty")
-        rows = await address_by_client_id(intent.value)
-        reply = "Addresses for client."
-        if translation_enabled() and body.lang and body.lang != "en":
-            reply = await translate_text(text=reply, source="en", target=body.lang)
-        return ChatQueryOut(reply=reply, type="grid", title="Addresses", payload={"kind": "addresses", "rows": rows})
+            return ChatQueryOut(reply=await reply_text("need_id", lang), type="empty")
+        page = await _address_page_by_id(intent.value, grid=grid)
+        rs = ResultSet("addresses", intent.name, intent.value, grid, limit=200, party_ids=[intent.value])
+        _remember(conversation, rs, page)
+        reply = await reply_text("addresses_for_client", lang)
+        payload = _grid_payload("addresses", page, grid)
+        return ChatQueryOut(reply=reply, type="grid", title="Addresses", payload=payload)
 
     if intent.name == "address_by_client_name":
         if not intent.value:
-            return ChatQueryOut(reply="Type the client name after ':'", type="empty")
-        rows = await address_by_client_name(intent.value)
-        if not rows:
-            return ChatQueryOut(reply=_no_addresses_text(body.lang, intent.value), type="empty")
+            return ChatQueryOut(reply=await reply_text("need_name", lang), type="empty")
+        page, ids = await _address_match_by_name(intent.value, grid=grid)
+        _remember(conversation, ResultSet("addresses", intent.name, intent.value, grid, limit=200, party_ids=ids), page)
+        if not page["rows"]:
+            return ChatQueryOut(reply=await reply_text("no_addresses", lang, value=intent.value), type="empty")
 
-        reply = f"Addresses for '{intent.value}'."
-        if translation_enabled() and body.lang and body.lang != "en":
-            reply = await translate_text(text=reply, source="en", target=body.lang)
-        return ChatQueryOut(reply=reply, type="grid", title="Addresses", payload={"kind": "addresses", "rows": rows})
+        reply = await reply_text("addresses_for", lang, value=intent.value)
+        payload = _grid_payload("addresses", page, grid)
+        return ChatQueryOut(reply=reply, type="grid", title="Addresses", payload=payload)
 
-    return ChatQueryOut(reply=_help_text(body.lang), type="empty")
+    return ChatQueryOut(reply=await reply_text("help", lang), type="empty")
 
 
 @app.post("/debug/echo")
@@ -262,6 +825,8 @@ async def debug_echo(body: ChatQueryIn):
     """
 
     msg = (body.message or "").strip()
+    if len(msg) > max_message_chars():
+        raise HTTPException(status_code=413, detail=f"message longer than {max_message_chars()} characters")
     msg_for_intent = msg
     if translation_enabled() and body.lang and body.lang != "en" and msg:
         try:
@@ -269,12 +834,16 @@ async def debug_echo(body: ChatQueryIn):
         except Exception:
             msg_for_intent = msg
 
-    intent_direct = classify(msg).name if msg else "empty"
-    intent_via_translation = classify(msg_for_intent).name if msg_for_intent else "empty"
+    intent_direct = (await classify_guarded(msg)).name if msg else "empty"
+    intent_via_translation = (await classify_guarded(msg_for_intent)).name if msg_for_intent else "empty"
+    routed, route = await _route_intent(msg, body.lang) if msg else (Intent("empty"), "none")
 
     return {
         "lang": body.lang,
         "message": msg,
+        "script": detect_script(msg),
+        "route": route,
+        "intent_routed": routed.name,
         "message_codepoints": _codepoints(msg),
         "message_for_intent": msg_for_intent,
         "message_for_intent_codepoints": _codepoints(msg_for_intent),
@@ -290,3 +859,15 @@ async def translate_endpoint(body: TranslateIn):
         raise HTTPException(status_code=400, detail="empty text")
     out = await translate_text(text=text, source=body.from_, target=body.to)
     return TranslateOut(text=out)
+
+
+# Upper bound on texts per batch request; a long chat history fits comfortably.
+_MAX_BATCH_TEXTS = 500
+
+
+@app.post("/translate/batch", response_model=TranslateBatchOut)
+async def translate_batch_endpoint(body: TranslateBatchIn):
+    if len(body.texts) > _MAX_BATCH_TEXTS:
+        raise HTTPException(status_code=413, detail=f"at most {_MAX_BATCH_TEXTS} texts per batch")
+    out = await translate_many(texts=body.texts, source=body.from_, target=body.to)
+    return TranslateBatchOut(texts=out)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from .metrics import stage
+from .translate import translation_enabled, translate_text
+
+# Reply templates per language. Placeholders use str.format syntax; `value`
+# is the client name or id the user asked about.
+CATALOG: dict[str, dict[str, str]] = {
+    "en": {
+        "help": (
+            "Try one of: List clients, Show client name: <name>, Show client id: <id>, "
+            "Get address for client id: <id>, Get address for client name: <name>."
+        ),
+        "list_clients": "Here are the latest clients.",
+        "results_for": "Results for '{value}'.",
+        "not_available": "'{value}' is not available in our data.",
+        "client_details": "Client details.",
+        "client_not_found": "Client not found.",
+        "addresses_for_client": "Addresses for client.",
+        "addresses_for": "Addresses for '{value}'.",
+        "no_addresses": "No addresses available in our data for '{value}'.",
+        "need_name": "Type the client name after ':'",
+        "need_id": "Type a client id (UUID) after ':'.",
+        "db_not_configured": "Database not configured.",
+        "addresses_for_these": "Addresses for these clients.",
+        "no_addresses_these": "No addresses available in our data for these clients.",
+        "nothing_to_follow": "Ask for clients first, then for 'addresses for these' or the 'next page'.",
+        "page": "Page {value}.",
+        "first_page": "This is the first page.",
+        "no_more_pages": "There are no more results.",
+    },
+    "hi": {
+        "help": (
+            "इनमें से एक आज़माएँ: क्लाइंट सूची, क्लाइंट नाम: <नाम>, क्लाइंट आईडी: <आईडी>, "
+            "क्लाइंट आईडी के लिए पता: <आईडी>, क्लाइंट नाम के लिए पता: <नाम>."
+        ),
+        "list_clients": "ये नवीनतम क्लाइंट हैं।",
+        "results_for": "'{value}' के परिणाम।",
+        "not_available": "'{value}' हमारे डेटा में उपलब्ध नहीं है।",
+        "client_details": "क्लाइंट विवरण।",
+        "client_not_found": "क्लाइंट नहीं मिला।",
+        "addresses_for_client": "क्लाइंट के पते।",
+        "addresses_for": "'{value}' के पते।",
+        "no_addresses": "'{value}' के लिए हमारे डेटा में कोई पता उपलब्ध नहीं है।",
+        "need_name": "':' के बाद क्लाइंट का नाम लिखें।",
+        "need_id": "':' के बाद क्लाइंट आईडी (UUID) लिखें।",
+        "db_not_configured": "डेटाबेस कॉन्फ़िगर नहीं है।",
+        "addresses_for_these": "इन क्लाइंट्स के पते।",
+        "no_addresses_these": "इन क्लाइंट्स के लिए हमारे डेटा में कोई पता उपलब्ध नहीं है।",
+        "nothing_to_follow": "पहले क्लाइंट खोजें, फिर 'इनके पते' या 'अगला पेज' लिखें।",
+        "page": "पेज {value}।",
+        "first_page": "यह पहला पेज है।",
+        "no_more_pages": "और परिणाम नहीं हैं।",
+    },
+    "te": {
+        "help": (
+            "ఇవ్వాటిలో ఒకటి ప్రయత్నించండి: క్లయింట్ల జాబితా / క్లయింట్ల జాబితా ఇవ్వండి, క్లయింట్ పేరు: <పేరు>, క్లయింట్ ఐడి: <ఐడి>, "
+            "క్లయింట్ ఐడికి చిరునామా: <ఐడి>, క్లయింట్ పేరుకు చిరునామా: <పేరు>."
+        ),
+        "list_clients": "ఇవి తాజా క్లయింట్లు.",
+        "results_for": "'{value}' కోసం ఫలితాలు.",
+        "not_available": "'{value}' మా డేటాలో అందుబాటులో లేదు.",
+        "client_details": "క్లయింట్ వివరాలు.",
+        "client_not_found": "క్లయింట్ కనుగొనబడలేదు.",
+        "addresses_for_client": "క్లయింట్ చిరునామాలు.",
+        "addresses_for": "'{value}' చిరునామాలు.",
+        "no_addresses": "'{value}' కోసం మా డేటాలో చిరునామాలు అందుబాటులో లేవు.",
+        "need_name": "':' తర్వాత క్లయింట్ పేరు టైప్ చేయండి.",
+        "need_id": "':' తర్వాత క్లయింట్ ఐడి (UUID) టైప్ చేయండి.",
+        "db_not_configured": "డేటాబేస్ కాన్ఫిగర్ చేయబడలేదు.",
+        "addresses_for_these": "ఈ క్లయింట్ల చిరునామాలు.",
+        "no_addresses_these": "ఈ క్లయింట్ల కోసం మా డేటాలో చిరునామాలు అందుబాటులో లేవు.",
+        "nothing_to_follow": "ముందు క్లయింట్లను అడగండి, తర్వాత 'వీరి చిరునామాలు' లేదా 'తర్వాతి పేజీ' అని టైప్ చేయండి.",
+        "page": "పేజీ {value}.",
+        "first_page": "ఇది మొదటి పేజీ.",
+        "no_more_pages": "ఇంకా ఫలితాలు లేవు.",
+    },
+}
+
+
+def catalog_lang(lang: str | None) -> str | None:
+    """Catalog language for a UI language code ("hi-IN" -> "hi"), or None."""
+
+    base = (lang or "en").strip().lower().replace("_", "-").split("-", 1)[0] or "en"
+    return base if base in CATALOG else None
+
+
+def render(key: str, lang: str | None, **params) -> str | None:
+    """Reply `key` in `lang` from the catalog, or None if `lang` isn't covered."""
+
+    cl = catalog_lang(lang)
+    if cl is None:
+        return None
+    return CATALOG[cl][key].format(**params)
+
+
+async def reply_text(key: str, lang: str | None, **params) -> str:
+    """Localized reply text; machine-translates English only for uncovered languages."""
+
+    out = render(key, lang, **params)
+    if out is not None:
+        return out
+    en = CATALOG["en"][key].format(**params)
+    if not translation_enabled():
+        return en
+    with stage("reply_translate"):
+        return await translate_text(text=en, source="en", target=lang)
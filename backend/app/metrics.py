@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; fine at the low end where classify/cache hits live.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def metrics_enabled() -> bool:
+    return os.getenv("METRICS_ENABLE", "true").lower() != "false"
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def expose(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in sorted(self._values.items()):
+            out.append(f"{self.name}{_labels(self.labelnames, labels)} {v:g}")
+        return out
+
+
+class Histogram:
+    """Prometheus histogram; per label set it keeps bucket counts, sum and count."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...], buckets: tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        s = self._series.get(labels)
+        if s is None:
+            # One slot per bucket plus +Inf, then sum.
+            s = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        s[bisect_left(self.buckets, value)] += 1
+        s[-1] += value
+
+    def expose(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, s in sorted(self._series.items()):
+            acc = 0.0
+            for le, n in zip((*(f"{b:g}" for b in self.buckets), "+Inf"), s):
+                acc += n
+                bucket = _labels(self.labelnames, labels, 'le="%s"' % le)
+                out.append(f"{self.name}_bucket{bucket} {acc:g}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {s[-1]:.6f}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, labels)} {acc:g}")
+        return out
+
+
+STAGE_SECONDS = Histogram(
+    "aria_stage_seconds", "Time spent per request stage.", ("endpoint", "stage", "intent", "lang")
+)
+REQUEST_SECONDS = Histogram("aria_request_seconds", "Handler time per request.", ("endpoint", "intent", "lang"))
+REQUESTS = Counter("aria_requests_total", "Requests handled.", ("endpoint", "intent", "lang", "route"))
+ERRORS = Counter("aria_request_errors_total", "Requests that raised.", ("endpoint",))
+
+_REGISTRY = (REQUESTS, ERRORS, REQUEST_SECONDS, STAGE_SECONDS)
+
+
+class RequestTimer:
+    """Stage durations for one request; filled in by `stage()` as it runs.
+
+    `counts` is only allocated for profiled requests (see `profiling`), so
+    `count()` is a no-op everywhere else. `record` is False when the timer
+    exists only for a profile and the metrics themselves are turned off.
+    """
+
+    __slots__ = ("started", "stages", "route", "counts", "record")
+
+    def __init__(self, *, profile: bool = False, record: bool = True):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.route = "none"
+        self.counts: dict[str, int] | None = {} if profile else None
+        self.record = record
+
+
+_current: ContextVar[RequestTimer | None] = ContextVar("aria_request_timer", default=None)
+
+
+def current_timer() -> RequestTimer | None:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as `name` for the current request, if any.
+
+    Outside an instrumented request this costs one context-variable lookup.
+    Repeated stages within a request add up.
+    """
+
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.stages[name] = timer.stages.get(name, 0.0) + time.perf_counter() - t0
+
+
+def counts() -> dict[str, int] | None:
+    """The current request's profile counters, or None when it is not profiled."""
+
+    timer = _current.get()
+    return None if timer is None else timer.counts
+
+
+def count(name: str, n: int = 1) -> None:
+    timer = _current.get()
+    if timer is not None and timer.counts is not None:
+        timer.counts[name] = timer.counts.get(name, 0) + n
+
+
+def start_request(*, profile: bool = False) -> RequestTimer | None:
+    record = metrics_enabled()
+    if not (record or profile):
+        return None
+    timer = RequestTimer(profile=profile, record=record)
+    _current.set(timer)
+    return timer
+
+
+_LANG = re.compile(r"[a-z]{2,3}")
+
+
+def lang_label(lang: str | None) -> str:
+    # Base language only, and only well-formed codes, to bound label cardinality.
+    base = (lang or "en").strip().lower().replace("_", "-").split("-", 1)[0]
+    return base if _LANG.fullmatch(base) else "other"
+
+
+def finish_request(timer: RequestTimer | None, *, endpoint: str, intent: str, lang: str | None, failed: bool = False) -> None:
+    if timer is None:
+        return
+    _current.set(None)
+    if not timer.record:
+        return
+    lang = lang_label(lang)
+    for name, seconds in timer.stages.items():
+        STAGE_SECONDS.observe((endpoint, name, intent, lang), seconds)
+    REQUEST_SECONDS.observe((endpoint, intent, lang), time.perf_counter() - timer.started)
+    REQUESTS.inc((endpoint, intent, lang, timer.route))
+    if failed:
+        ERRORS.inc((endpoint,))
+
+
+_CACHE_SERIES = (
+    ("aria_cache_hits_total", "counter", "Cache hits.", "hits"),
+    ("aria_cache_misses_total", "counter", "Cache misses.", "misses"),
+    ("aria_cache_evictions_total", "counter", "Cache evictions.", "evictions"),
+    ("aria_cache_entries", "gauge", "Entries currently cached.", "size"),
+)
+
+
+def render(caches: dict[str, dict] | None = None) -> str:
+    """All metrics in Prometheus text format (0.0.4).
+
+    `caches` maps a cache name to its `stats()` dict; the counters those
+    objects already keep are exported as-is rather than tracked twice.
+    """
+
+    lines: list[str] = []
+    for m in _REGISTRY:
+        lines += m.expose()
+    for name, kind, help, key in _CACHE_SERIES:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for cache, stats in sorted((caches or {}).items()):
+            if key in stats:
+                lines.append(f'{name}{{cache="{_escape(cache)}"}} {stats[key]:g}')
+    return "\n".join(lines) + "\n"
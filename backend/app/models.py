@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+GridFormat = Literal["rows", "columnar"]
 
 
 class ChatQueryIn(BaseModel):
     message: str
     lang: str | None = "en"
+    # "columnar": grid payloads as {columns, values} with only displayed columns.
+    grid_format: GridFormat = "rows"
 
 
 class ChatQueryOut(BaseModel):
@@ -26,3 +32,16 @@ class TranslateIn(BaseModel):
 
 class TranslateOut(BaseModel):
     text: str
+
+
+class TranslateBatchIn(BaseModel):
+    texts: list[str]
+    from_: str = Field(default="en", alias="from")
+    to: str
+
+    class Config:
+        populate_by_name = True
+
+
+class TranslateBatchOut(BaseModel):
+    texts: list[str]
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import uuid
+from array import array
+from typing import TYPE_CHECKING
+
+from .translit import edit_distance, skeleton
+
+if TYPE_CHECKING:
+    from prisma import Prisma
+
+_GRAM = 3
+
+_LOAD_SQL = (
+    'SELECT "PTY_ID"::text AS id, "PTY_FirstName" AS first, "PTY_LastName" AS last '
+    'FROM "OPT_Party" WHERE $1::uuid IS NULL OR "PTY_ID" > $1::uuid '
+    'ORDER BY "PTY_ID" LIMIT $2'
+)
+
+
+def _fold(s: str | None) -> str:
+    return (s or "").lower()
+
+
+def _grams(s: str, n: int = _GRAM) -> set[str]:
+    return {s[i : i + n] for i in range(len(s) - n + 1)}
+
+
+def _all_grams(s: str) -> set[str]:
+    # Trigrams plus every 1- and 2-character substring, so a query of up to
+    # _GRAM characters is a single posting list.
+    return _grams(s, 1) | _grams(s, 2) | _grams(s)
+
+
+def _deletes(s: str, depth: int = 1) -> set[str]:
+    """`s` with any 1 .. `depth` characters removed."""
+
+    out = {s[:i] + s[i + 1 :] for i in range(len(s))}
+    if depth > 1:
+        for d in list(out):
+            out |= _deletes(d, depth - 1)
+    return out
+
+
+class NameIndex:
+    """In-memory substring index over `OPT_Party` first and last names.
+
+    Answers the same question as `ILIKE '%name%'` on either column without
+    scanning the table: each row gets a compact integer id, names are
+    case-folded, and every substring of up to three characters maps to the
+    sorted row ids containing it. A query of up to three characters is its
+    own posting list; a longer one is checked only against rows in its
+    rarest trigram's list. Party ids are packed as 16-byte UUIDs so a
+    million rows fit in a few hundred MB (the 1- and 2-character postings
+    take about 2.5 times as much as the trigram ones).
+
+    When nothing contains the query, it is resolved as a misspelled or
+    native-script name instead: every distinct first/last name is keyed by
+    its phonetic skeleton (see `translit.skeleton`), which doubles as the
+    Latin -> Hindi/Telugu transliteration map, and skeletons sit in a
+    symmetric-delete index (every skeleton with up to two characters
+    removed) for edit-distance lookups up to 2. Both are per distinct name,
+    not per row.
+    """
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._first: list[str] = []
+        self._last: list[str] = []
+        self._postings: dict[str, array] = {}
+        self._dead: set[int] = set()
+        self._terms: dict[str, array] = {}
+        self._skeletons: dict[str, list[str]] = {}
+        self._deletes: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._first) - len(self._dead)
+
+    def add(self, pty_id: str, first: str | None, last: str | None) -> None:
+        row = len(self._first)
+        self._ids += uuid.UUID(str(pty_id)).bytes
+        f, l = _fold(first), _fold(last)
+        self._first.append(f)
+        self._last.append(l)
+        for g in _all_grams(f) | _all_grams(l):
+            ix = self._postings.get(g)
+            if ix is None:
+                ix = self._postings[g] = array("I")
+            ix.append(row)
+        for term in {f, l} - {""}:
+            rows = self._terms.get(term)
+            if rows is None:
+                rows = self._terms[term] = array("I")
+                self._add_term(term)
+            rows.append(row)
+
+    def _add_term(self, term: str) -> None:
+        skel = skeleton(term)
+        if not skel:
+            return
+        terms = self._skeletons.get(skel)
+        if terms is None:
+            terms = self._skeletons[skel] = []
+            for d in _deletes(skel, 2):
+                self._deletes.setdefault(d, []).append(skel)
+        terms.append(term)
+
+    def discard(self, pty_id: str) -> None:
+        key = uuid.UUID(str(pty_id)).bytes
+        pos = self._ids.find(key)
+        while pos != -1:
+            if pos % 16 == 0 and pos // 16 not in self._dead:
+                self._dead.add(pos // 16)
+                return
+            pos = self._ids.find(key, pos + 1)
+
+    def upsert(self, pty_id: str, first: str | None, last: str | None) -> None:
+        self.discard(pty_id)
+        self.add(pty_id, first, last)
+
+    def upsert_many(self, rows: list[tuple[str, str | None, str | None]]) -> None:
+        """`upsert` for many (id, first, last) rows, with one pass over the ids."""
+
+        latest = {uuid.UUID(str(r[0])).bytes: r for r in rows}
+        ids = self._ids
+        for row in range(len(self._first)):
+            if bytes(ids[row * 16 : row * 16 + 16]) in latest:
+                self._dead.add(row)
+        for r in latest.values():
+            self.add(*r)
+
+    def _pty_id(self, row: int) -> str:
+        return str(uuid.UUID(bytes=bytes(self._ids[row * 16 : row * 16 + 16])))
+
+    def resolve(self, word: str) -> list[str]:
+        """Indexed names that sound like `word`, in any script.
+
+        An exact skeleton hit is the transliteration lookup; otherwise the
+        closest skeletons within edit distance 1 (2 for longer names) win.
+        """
+
+        skel = skeleton(word)
+        if not skel:
+            return []
+        exact = self._skeletons.get(skel)
+        if exact:
+            return list(exact)
+
+        # Symmetric delete: two skeletons within `limit` edits share a
+        # string each reaches by removing at most `limit` characters.
+        limit = 1 if len(skel) <= 4 else 2
+        near: set[str] = set(self._deletes.get(skel, ()))
+        for d in _deletes(skel, limit):
+            if d in self._skeletons:
+                near.add(d)
+            near.update(self._deletes.get(d, ()))
+        scored = [(edit_distance(skel, c, limit), c) for c in near]
+        scored = [sc for sc in scored if sc[0] <= limit]
+        if not scored:
+            return []
+        best = min(d for d, _ in scored)
+        return [t for d, c in sorted(scored) if d == best for t in self._skeletons[c]]
+
+    def search_fuzzy(self, name: str, *, limit: int = 50) -> list[str]:
+        """Party ids whose first or last name matches every word of `name`
+        by sound or within a small edit distance, in row order."""
+
+        word_terms = [set(self.resolve(w)) for w in name.split()]
+        if not word_terms or not all(word_terms):
+            return []
+        # Walk the rarest word's rows (already sorted) and check the others.
+        lead = min(word_terms, key=lambda ts: sum(len(self._terms[t]) for t in ts))
+        out: list[str] = []
+        prev = -1
+        for row in heapq.merge(*(self._terms[t] for t in lead)):
+            if row == prev or row in self._dead:
+                continue
+            prev = row
+            f, l = self._first[row], self._last[row]
+            if all(f in ts or l in ts for ts in word_terms):
+                out.append(self._pty_id(row))
+                if len(out) >= limit:
+                    break
+        return out
+
+    def search(self, name: str, *, limit: int = 50) -> list[str]:
+        """Party ids whose first or last name contains `name`, in row order.
+
+        Falls back to `search_fuzzy` when there is no substring match.
+        """
+
+        hits = self._search_contains(name, limit=limit)
+        return hits or self.search_fuzzy(name, limit=limit)
+
+    def _search_contains(self, name: str, *, limit: int) -> list[str]:
+        q = _fold(name.strip())
+        if not q:
+            rows = range(len(self._first))
+        elif len(q) <= _GRAM:
+            rows = self._postings.get(q, ())
+        else:
+            lists = [self._postings.get(g) for g in _grams(q)]
+            if not all(lists):
+                return []
+            rows = min(lists, key=len)
+
+        out: list[str] = []
+        for row in rows:
+            if row in self._dead:
+                continue
+            if q in self._first[row] or q in self._last[row]:
+                out.append(self._pty_id(row))
+                if len(out) >= limit:
+                    break
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self),
+            "tombstones": len(self._dead),
+            "grams": len(self._postings),
+            "postings": sum(len(ix) for ix in self._postings.values()),
+            "names": len(self._terms),
+            "skeletons": len(self._skeletons),
+            "deletes": len(self._deletes),
+        }
+
+
+_index: NameIndex | None = None
+
+# Parties written while a rebuild reads the table, one list per rebuild in
+# progress; each is replayed onto its new index before the swap.
+_journals: list[list[tuple[str, str | None, str | None]]] = []
+
+
+def get_name_index() -> NameIndex | None:
+    """The loaded index, or None while it is (re)building or disabled."""
+
+    return _index
+
+
+def set_name_index(idx: NameIndex | None) -> None:
+    """Swap in an index built elsewhere (e.g. loaded from a snapshot)."""
+
+    global _index
+    _index = idx
+
+
+def index_party(pty_id: str, first: str | None, last: str | None) -> None:
+    """Add a party just written to the loaded index and to any being rebuilt.
+
+    Writers call this rather than `NameIndex.add`: a rebuild may have read
+    past the new row's key already, and would otherwise swap in an index
+    without it.
+    """
+
+    if _index is not None:
+        _index.add(pty_id, first, last)
+    for journal in _journals:
+        journal.append((pty_id, first, last))
+
+
+async def rebuild_name_index(db: Prisma, *, chunk: int = 20_000) -> NameIndex:
+    """Load every party into a fresh index, then swap it in.
+
+    Rows are read in primary-key order in chunks so memory on the database
+    side stays flat; searches keep using the previous index until the swap.
+    Parties reported through `index_party` meanwhile are upserted into the
+    new index before it goes live, whether or not the scan saw them.
+    """
+
+    global _index
+    idx = NameIndex()
+    journal: list[tuple[str, str | None, str | None]] = []
+    _journals.append(journal)
+    try:
+        last: str | None = None
+        while True:
+            rows = await db.query_raw(_LOAD_SQL, last, chunk)
+            for r in rows:
+                idx.add(r["id"], r["first"], r["last"])
+            if len(rows) < chunk:
+                break
+            last = rows[-1]["id"]
+            await asyncio.sleep(0)
+        # No await from here to the swap, so nothing is written in between.
+        if journal:
+            idx.upsert_many(journal)
+        _index = idx
+    finally:
+        _journals.remove(journal)
+    return idx
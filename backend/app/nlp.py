@@ -1,7 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import multiprocessing
+import os
+import pickle
 import re
+import threading
+from collections import deque
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:  # Python 3.11+
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
 
 
 @dataclass
@@ -48,6 +61,32 @@ def _extract_id(m: str) -> str | None:
     return None
 
 
+# Unicode blocks for the scripts the rules are written in.
+_SCRIPT_CHARS = {
+    "devanagari": re.compile(r"[\u0900-\u097F\uA8E0-\uA8FF]"),
+    "telugu": re.compile(r"[\u0C00-\u0C7F]"),
+    "latin": re.compile(r"[A-Za-z\u00C0-\u024F]"),
+}
+
+
+def detect_script(text: str) -> str:
+    """Dominant script of `text`: devanagari, telugu, latin, other or none.
+
+    Counts letters per Unicode block; digits, punctuation and spaces don't
+    vote. "other" means letters exist but none from the known blocks.
+    """
+
+    s = text or ""
+    best, best_n = "none", 0
+    for name, rx in _SCRIPT_CHARS.items():
+        n = len(rx.findall(s))
+        if n > best_n:
+            best, best_n = name, n
+    if best_n == 0 and any(ch.isalpha() for ch in s):
+        return "other"
+    return best
+
+
 def _norm(s: str) -> str:
     # Preserve original script/case; regex rules are compiled with IGNORECASE
     # for Latin text, but lowercasing can interfere with some non-Latin inputs.
@@ -316,22 +355,459 @@ _INTENT_RULES: list[IntentRule] = [
         ),
         extractor=None,
     ),
+
+    # Follow-ups on the conversation's last result set (see app.sessions).
+    # Last, so they only answer what no explicit id/name/list rule does, and
+    # never take a message carrying a ':' value.
+    IntentRule(
+        name="addresses_for_results",
+        patterns=_rx(
+            # English
+            r"^(?!.*[:：]).*\b(address|addresses|location)\b.*\b(these|those|them|this|that|above|same|selected)\b",
+            r"^(?!.*[:：]).*\b(their|its|his|her)\b.*\b(address|addresses)\b",
+            r"^(?!.*[:：]).*\bwhere\b.*\b(do|does)\b.*\b(they|he|she)\b.*\blive\b",
+            # Hindi (no \b: a trailing vowel sign is not a word character)
+            r"^(?!.*[:：]).*(इनके|इनका|उनके|उनका|इन\s*(क्लाइंट|ग्राहक)\S*\s*के)\s*(पते|पता|एड्रेस)",
+            # Telugu
+            r"^(?!.*[:：]).*(వీరి|వారి|వీళ్ళ|వాళ్ళ|ఈ\s*క్లయింట్ల)\s*(చిరునామాలు|చిరునామా|అడ్రెస్)",
+        ),
+        extractor=None,
+    ),
+    IntentRule(
+        name="next_page",
+        patterns=_rx(
+            # English
+            r"^\s*(next|more)\s*[.!]?\s*$",
+            r"\b(next|following)\s+(page|results|clients|addresses|rows)\b",
+            r"\b(show|load|see|give)\s+(me\s+)?more\b",
+            # Hindi
+            r"(अगला|अगले)\s*(पेज|पृष्ठ|page)",
+            r"^\s*और\s*(दिखाओ|दिखाइए|दिखा\s*दो)",
+            # Telugu
+            r"(తర్వాతి|తరువాతి|తదుపరి)\s*(పేజీ|page)",
+            r"^\s*(మరిన్ని|ఇంకా)\s*(చూపించు|చూపండి)",
+        ),
+        extractor=None,
+    ),
+    IntentRule(
+        name="previous_page",
+        patterns=_rx(
+            # English
+            r"^\s*(back|go\s+back|previous|prev)\s*[.!]?\s*$",
+            r"\b(previous|prev)\s+(page|results|clients|addresses|rows)\b",
+            # Hindi
+            r"(पिछला|पिछले)\s*(पेज|पृष्ठ|page)",
+            # Telugu
+            r"(మునుపటి|వెనుకటి)\s*(పేజీ|page)",
+        ),
+        extractor=None,
+    ),
 ]
 
 
-def classify(message: str) -> Intent:
+# Characters that re.IGNORECASE treats as an ASCII letter but str.lower() leaves
+# alone (or expands to two codepoints).
+_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+def _fold(s: str) -> str:
+    return s.translate(_FOLD).lower()
+
+
+_RE_WORD = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class _Literal:
+    text: str  # case-folded
+    left: bool  # preceded by \b in the pattern
+    right: bool  # followed by \b in the pattern
+
+
+def _is_boundary(item) -> bool:
+    """True for `\b` and for `\s+`, both of which end a word."""
+    op, av = item
+    if op is _sre_parse.AT:
+        return av is _sre_parse.AT_BOUNDARY
+    if op is _sre_parse.MAX_REPEAT and av[0] >= 1 and len(av[2]) == 1:
+        sub_op, sub_av = av[2][0]
+        return sub_op is _sre_parse.IN and sub_av == [(_sre_parse.CATEGORY, _sre_parse.CATEGORY_SPACE)]
+    return False
+
+
+def _required_literals(seq, left: bool = False, right: bool = False) -> list[tuple[_Literal, ...]]:
+    """Literal alternatives that must occur in any string matched by `seq`.
+
+    `seq` is a parsed regex (see `re._parser`). Each returned tuple means "at
+    least one of these literals is present". Only mandatory parts are
+    inspected: lookarounds, optional groups and character classes are
+    ignored, so the result is always a necessary condition. `left`/`right`
+    say whether `seq` itself sits between word boundaries.
+    """
+
+    items = list(seq)
+    out: list[tuple[_Literal, ...]] = []
+    run: list[str] = []
+    run_left = False
+
+    for i, (op, av) in enumerate(items):
+        before = _is_boundary(items[i - 1]) if i else left
+        after = _is_boundary(items[i + 1]) if i + 1 < len(items) else right
+        if op is _sre_parse.LITERAL:
+            if not run:
+                run_left = before
+            run.append(chr(av))
+            continue
+        if run:
+            out.append((_Literal(_fold("".join(run)), run_left, _is_boundary((op, av))),))
+            run.clear()
+        if op is _sre_parse.SUBPATTERN:
+            out.extend(_required_literals(av[-1], before, after))
+        elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT) and av[0] >= 1:
+            out.extend(_required_literals(av[2]))
+        elif op is _sre_parse.BRANCH:
+            alts: list[_Literal] = []
+            for alt in av[1]:
+                single = [g[0] for g in _required_literals(alt, before, after) if len(g) == 1]
+                if not single:
+                    alts = []
+                    break
+                alts.append(max(single, key=lambda lit: len(lit.text)))
+            if alts:
+                out.append(tuple(alts))
+    if run:
+        out.append((_Literal(_fold("".join(run)), run_left, right),))
+    return out
+
+
+@dataclass(frozen=True)
+class _Guard:
+    """One mandatory alternation of a pattern.
+
+    Passes when all words of one `tokens` alternative are words of the
+    message, or one of `substrings` occurs in it. Literals that the pattern
+    pins between word boundaries become tokens; the rest (e.g. text glued to
+    a `\s*`) can only be checked as substrings.
+    """
+
+    tokens: tuple[frozenset[str], ...]
+    substrings: tuple[str, ...]
+
+    @classmethod
+    def from_literals(cls, lits: tuple[_Literal, ...]) -> _Guard:
+        tokens: list[frozenset[str]] = []
+        substrings: list[str] = []
+        for lit in lits:
+            words = _RE_WORD.findall(lit.text)
+            exact_left = lit.left or not _RE_WORD.match(lit.text)
+            exact_right = lit.right or not _RE_WORD.match(lit.text[-1])
+            if words and exact_left and exact_right:
+                tokens.append(frozenset(words))
+            else:
+                substrings.append(lit.text)
+        return cls(tuple(tokens), tuple(substrings))
+
+    def passes(self, words: set[str], folded: str) -> bool:
+        for t in self.tokens:
+            if t <= words:
+                return True
+        for sub in self.substrings:
+            if sub in folded:
+                return True
+        return False
+
+
+def _wildcards(seq) -> int:
+    """Unbounded `.` repeats (`.*`, `.+`) in a parsed regex, nested ones included."""
+
+    n = 0
+    for op, av in seq:
+        if op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT):
+            body = list(av[2])
+            if av[1] == _sre_parse.MAXREPEAT and len(body) == 1 and body[0][0] is _sre_parse.ANY:
+                n += 1
+            else:
+                n += _wildcards(body)
+        elif op is _sre_parse.SUBPATTERN:
+            n += _wildcards(av[-1])
+        elif op is _sre_parse.BRANCH:
+            n += max(_wildcards(alt) for alt in av[1])
+    return n
+
+
+@dataclass(frozen=True)
+class _CompiledPattern:
+    rule: IntentRule
+    pattern: re.Pattern
+    guards: tuple[_Guard, ...]
+    # Worst-case search work grows roughly as len(message) ** (wildcards + 1):
+    # each `.*` can end anywhere, and the search can start anywhere.
+    wildcards: int
+
+
+def _analyze(p: re.Pattern) -> tuple[tuple[_Guard, ...], int]:
+    # The slow part of building the engine: one more parse per pattern.
+    parsed = _sre_parse.parse(p.pattern, p.flags)
+    return tuple(map(_Guard.from_literals, _required_literals(parsed))), _wildcards(parsed)
+
+
+class _RuleEngine:
+    """`_INTENT_RULES` compiled once into a flat, priority-ordered program.
+
+    Every pattern carries guards derived from its regex, and patterns are
+    indexed by the anchor words (client/क्लाइंट/క్లయింట్, id/नाम/పేరు, ...)
+    they cannot match without. A message is case-folded and split into words
+    once; the inverted index yields the few candidate patterns, which are
+    searched in the original rule order, so the first hit is exactly what the
+    rule-by-rule loop would return.
+    """
+
+    def __init__(self, rules: list[IntentRule], *, analysis: list | None = None):
+        pairs = [(rule, p) for rule in rules for p in rule.patterns]
+        if analysis is None or len(analysis) != len(pairs):
+            analysis = [_analyze(p) for _, p in pairs]
+        self.analysis = analysis
+        program = [_CompiledPattern(rule, p, guards, wildcards) for (rule, p), (guards, wildcards) in zip(pairs, analysis)]
+        self.program: tuple[_CompiledPattern, ...] = tuple(program)
+        self.max_wildcards = max((cp.wildcards for cp in program), default=0)
+
+        postings: dict[str, set[int]] = {}
+        unindexed: list[int] = []
+        for i, cp in enumerate(program):
+            anchor = next((g for g in cp.guards if g.tokens and not g.substrings), None)
+            if anchor is None:
+                unindexed.append(i)
+                continue
+            for alt in anchor.tokens:
+                postings.setdefault(max(alt, key=len), set()).add(i)
+        self.postings: dict[str, frozenset[int]] = {t: frozenset(ix) for t, ix in postings.items()}
+        self.unindexed: frozenset[int] = frozenset(unindexed)
+
+    def candidates(self, words: set[str]) -> list[int]:
+        found = set(self.unindexed)
+        for w in words:
+            ix = self.postings.get(w)
+            if ix:
+                found |= ix
+        return sorted(found)
+
+    def match(self, m: str) -> IntentRule | None:
+        folded = _fold(m)
+        words = set(_RE_WORD.findall(folded))
+        for i in self.candidates(words):
+            cp = self.program[i]
+            for g in cp.guards:
+                if not g.passes(words, folded):
+                    break
+            else:
+                if cp.pattern.search(m):
+                    return cp.rule
+        return None
+
+    def cost(self, m: str) -> int:
+        """Upper-bound estimate of the regex work `match(m)` can do.
+
+        Sums len(m) ** (wildcards + 1) over the patterns whose guards pass, i.e.
+        the ones that would actually be searched. It ignores early exits, so
+        it only overestimates.
+        """
+
+        folded = _fold(m)
+        words = set(_RE_WORD.findall(folded))
+        n = len(m)
+        total = 0
+        for i in self.candidates(words):
+            cp = self.program[i]
+            if all(g.passes(words, folded) for g in cp.guards):
+                total += n ** (cp.wildcards + 1)
+        return total
+
+    def within(self, m: str, budget: int) -> bool:
+        """Whether `cost(m) <= budget`, skipping the guard pass when length alone settles it."""
+
+        n = len(m)
+        if n ** (self.max_wildcards + 1) * len(self.program) <= budget:
+            return True
+        folded = _fold(m)
+        words = set(_RE_WORD.findall(folded))
+        candidates = self.candidates(words)
+        # Still without guards: every candidate searched.
+        if sum(n ** (self.program[i].wildcards + 1) for i in candidates) <= budget:
+            return True
+        total = 0
+        for i in candidates:
+            cp = self.program[i]
+            for g in cp.guards:
+                if not g.passes(words, folded):
+                    break
+            else:
+                total += n ** (cp.wildcards + 1)
+                if total > budget:
+                    return False
+        return True
+
+    def match_counted(self, m: str, stats: dict[str, int]) -> IntentRule | None:
+        """`match`, adding how much work it took to `stats`.
+
+        Kept separate so the unprofiled path carries no bookkeeping.
+        """
+
+        folded = _fold(m)
+        words = set(_RE_WORD.findall(folded))
+        candidates = self.candidates(words)
+        searched = 0
+        found = None
+        for i in candidates:
+            cp = self.program[i]
+            for g in cp.guards:
+                if not g.passes(words, folded):
+                    break
+            else:
+                searched += 1
+                if cp.pattern.search(m):
+                    found = cp.rule
+                    break
+        for key, n in (("classify_calls", 1), ("classify_candidates", len(candidates)), ("classify_regex", searched)):
+            stats[key] = stats.get(key, 0) + n
+        return found
+
+
+def _rules_cache_path() -> Path | None:
+    path = os.getenv("RULES_CACHE_PATH", str(Path(__file__).resolve().parent.parent / ".cache" / "rules.pickle"))
+    return Path(path) if path else None
+
+
+def _load_analysis(path: Path, digest: str) -> list | None:
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return saved.get("analysis") if isinstance(saved, dict) and saved.get("digest") == digest else None
+
+
+def _save_analysis(path: Path, digest: str, analysis: list) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"digest": digest, "analysis": analysis}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only image: build it again next time
+
+
+def _build_engine() -> _RuleEngine:
+    path = _rules_cache_path()
+    if path is None:
+        return _RuleEngine(_INTENT_RULES)
+    # Keyed on this file, so any change to the rules or to how they are
+    # analysed starts over.
+    digest = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+    analysis = _load_analysis(path, digest)
+    engine = _RuleEngine(_INTENT_RULES, analysis=analysis)
+    if analysis is None:
+        _save_analysis(path, digest, engine.analysis)
+    return engine
+
+
+_engine: _RuleEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def rule_engine() -> _RuleEngine:
+    """`_INTENT_RULES` as a `_RuleEngine`, built on first use.
+
+    The per-pattern analysis is kept in RULES_CACHE_PATH (empty: never), so
+    restarts, classifier workers and containers from an image that built it
+    once only relink it to the compiled patterns.
+    """
+
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _build_engine()
+    return _engine
+
+
+def rules_ready() -> bool:
+    return _engine is not None
+
+
+def classify_cost(message: str) -> int:
+    """`_RuleEngine.cost` for `message` as `classify` would see it."""
+
+    return rule_engine().cost(_norm(message or ""))
+
+
+def within_budget(message: str, budget: int) -> bool:
+    return rule_engine().within(_norm(message or ""), budget)
+
+
+def classify(message: str, *, stats: dict[str, int] | None = None) -> Intent:
+    """Intent for `message`.
+
+    With `stats`, also counts the candidate patterns considered and the
+    regexes actually searched (patterns whose guards passed).
+    """
+
     raw = message or ""
     m = _norm(raw)
 
-    for rule in _INTENT_RULES:
-        for p in rule.patterns:
-            if p.search(m):
-                value = None
-                if rule.extractor is not None:
-                    try:
-                        value = rule.extractor(raw)
-                    except Exception:
-                        value = None
-                return Intent(rule.name, value)
-
-    return Intent("unknown")
+    engine = rule_engine()
+    rule = engine.match(m) if stats is None else engine.match_counted(m, stats)
+    if rule is None:
+        return Intent("unknown")
+
+    value = None
+    if rule.extractor is not None:
+        try:
+            value = rule.extractor(raw)
+        except Exception:
+            value = None
+    return Intent(rule.name, value)
+
+
+def _classify_batch(messages: list[str]) -> list[tuple[str, str | None]]:
+    # Tuples pickle smaller than Intents on the way back from a worker.
+    return [(i.name, i.value) for i in map(classify, messages)]
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    batch: list[str] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def classify_many(
+    messages: Iterable[str], *, processes: int | None = 1, batch_size: int = 1000
+) -> Iterator[Intent]:
+    """`classify` every message, yielding intents in input order.
+
+    `messages` is consumed lazily, `batch_size` at a time. With `processes`
+    above 1 (None: one per CPU) batches are spread over a process pool,
+    with at most a few batches per worker in flight so memory stays flat on
+    inputs of any length. No translation or database is involved.
+    """
+
+    batches = _batched(messages, max(batch_size, 1))
+    if processes == 1:
+        for batch in batches:
+            yield from map(classify, batch)
+        return
+
+    with multiprocessing.Pool(processes) as pool:
+        window = 4 * (processes or os.cpu_count() or 1)
+        pending: deque = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(_classify_batch, (batch,)))
+            if len(pending) >= window:
+                yield from (Intent(n, v) for n, v in pending.popleft().get())
+        while pending:
+            yield from (Intent(n, v) for n, v in pending.popleft().get())
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import base64
+import uuid
+
+from fastapi import HTTPException
+
+# Largest page any list endpoint hands out.
+MAX_PAGE = 200
+
+EMPTY_PAGE = {"rows": [], "next_cursor": None}
+
+
+def page_size(limit: int) -> int:
+    return min(max(limit, 1), MAX_PAGE)
+
+
+def encode_cursor(key: str) -> str:
+    """Opaque cursor for "rows after primary key `key`"."""
+
+    return base64.urlsafe_b64encode(uuid.UUID(str(key)).bytes).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> str | None:
+    """Primary key a cursor points past; None for the first page.
+
+    Raises a 400 for anything `encode_cursor` could not have produced.
+    """
+
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return str(uuid.UUID(bytes=raw))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor") from None
+
+
+async def keyset_page(model, *, key: str, where: dict | None = None, cursor: str | None = None, limit: int = 50, **kwargs) -> dict:
+    """One page of `model` rows in `key` order, starting after `cursor`.
+
+    Seeks on the primary key (`WHERE key > last ORDER BY key LIMIT n+1`)
+    instead of skipping rows, so every page costs the same no matter how deep
+    it is. Returns {"rows": [...], "next_cursor": str | None}.
+    """
+
+    take = page_size(limit)
+    rows = await model.find_many(
+        where=_after(key, where, decode_cursor(cursor)), order={key: "asc"}, take=take + 1, **kwargs
+    )
+    return to_page(rows, take, key)
+
+
+def _after(key: str, where: dict | None, after: str | None) -> dict | None:
+    clauses = [c for c in (where, {key: {"gt": after}} if after else None) if c]
+    return {"AND": clauses} if len(clauses) > 1 else (clauses[0] if clauses else None)
+
+
+async def iter_keyset(model, *, key: str, where: dict | None = None, cursor: str | None = None, limit: int | None = None, chunk: int = 1000):
+    """Yield `model` rows in `key` order, fetched `chunk` rows at a time.
+
+    For streaming exports: only one chunk is held in memory, and each chunk
+    is the same keyset seek `keyset_page` uses. Stops after `limit` rows if
+    given.
+    """
+
+    after = decode_cursor(cursor)
+    left = limit
+    while left is None or left > 0:
+        take = chunk if left is None else min(chunk, left)
+        rows = await model.find_many(where=_after(key, where, after), order={key: "asc"}, take=take)
+        for r in rows:
+            yield r
+        if len(rows) < take:
+            return
+        after = getattr(rows[-1], key)
+        if left is not None:
+            left -= len(rows)
+
+
+def to_page(rows: list, take: int, key: str) -> dict:
+    """Page dict from up to `take + 1` rows (models or dicts) fetched in `key` order."""
+
+    more = len(rows) > take
+    rows = rows[:take]
+    if not more:
+        return {"rows": rows, "next_cursor": None}
+    last = rows[-1]
+    return {"rows": rows, "next_cursor": encode_cursor(last[key] if isinstance(last, dict) else getattr(last, key))}
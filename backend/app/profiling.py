@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from fastapi import Request
+
+from .metrics import RequestTimer, start_request
+
+PROFILE_HEADER = "X-Aria-Profile"
+
+_BACKEND_ROOT = Path(__file__).resolve().parent.parent
+_SAMPLE_NAME = re.compile(r"[\w.-]+\.html")
+_UNSAFE = re.compile(r"[^\w-]")
+
+
+def profiling_enabled() -> bool:
+    # Off unless asked for: any client could read stage timings and counters.
+    return os.getenv("REQUEST_PROFILE_ENABLE", "false").lower() == "true"
+
+
+def sampling_enabled() -> bool:
+    # Writes a file per request, so it stays off unless asked for.
+    return os.getenv("REQUEST_PROFILE_SAMPLING", "false").lower() == "true" and _pyinstrument() is not None
+
+
+def profile_dir() -> Path:
+    return Path(os.getenv("REQUEST_PROFILE_DIR", str(_BACKEND_ROOT / ".cache" / "profiles")))
+
+
+def sample_path(name: str) -> Path | None:
+    """Path of a saved sample, or None for names that are not one of ours."""
+
+    if not _SAMPLE_NAME.fullmatch(name):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+@lru_cache(maxsize=1)
+def _pyinstrument():
+    try:
+        import pyinstrument
+    except ImportError:
+        return None
+    return pyinstrument
+
+
+class RequestProfile:
+    """Stage timings and work counters for one request that asked for them.
+
+    `report()` is the JSON breakdown: stage durations in run order, plus the
+    counters the code paths add while it is active (classify candidates and
+    regexes searched, translator calls and cache hits, DB round trips). With
+    sampling, a pyinstrument profile of the request's own task is saved as
+    HTML and the report names the file.
+    """
+
+    def __init__(self, *, sample: bool):
+        self.timer: RequestTimer = start_request(profile=True)
+        self._sampler = None
+        if sample:
+            self._sampler = _pyinstrument().Profiler(interval=0.0005, async_mode="enabled")
+            self._sampler.start()
+
+    def close(self) -> None:
+        if self._sampler is not None and self._sampler.is_running:
+            self._sampler.stop()
+
+    def _save_sample(self, label: str) -> str | None:
+        if self._sampler is None:
+            return None
+        self.close()
+        label = _UNSAFE.sub("_", label)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{uuid.uuid4().hex[:8]}.html"
+        try:
+            profile_dir().mkdir(parents=True, exist_ok=True)
+            (profile_dir() / name).write_text(self._sampler.output_html(), encoding="utf-8")
+        except OSError:
+            return None
+        return name
+
+    def report(self, *, label: str) -> dict:
+        t = self.timer
+        return {
+            "route": t.route,
+            "elapsed_ms": round((time.perf_counter() - t.started) * 1000, 3),
+            "stages_ms": {name: round(s * 1000, 3) for name, s in t.stages.items()},
+            "counts": dict(t.counts or {}),
+            "sample": self._save_sample(label),
+        }
+
+    def server_timing(self) -> str:
+        t = self.timer
+        parts = [f"{name};dur={s * 1000:.3f}" for name, s in t.stages.items()]
+        parts.append(f"total;dur={(time.perf_counter() - t.started) * 1000:.3f}")
+        return ", ".join(parts)
+
+
+def start_profile(request: Request) -> RequestProfile | None:
+    """A profile for requests sending `X-Aria-Profile: 1` (or `sample`), else None.
+
+    Unprofiled requests pay for this header lookup and nothing else.
+    """
+
+    value = request.headers.get(PROFILE_HEADER)
+    if not value or not profiling_enabled():
+        return None
+    value = value.strip().lower()
+    if value not in {"1", "true", "on", "sample"}:
+        return None
+    return RequestProfile(sample=value == "sample" and sampling_enabled())
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import gzip
+import os
+from functools import lru_cache
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def fast_json_enabled() -> bool:
+    return os.getenv("FAST_JSON_ENABLE", "false").lower() == "true" and _orjson() is not None
+
+
+def compression_enabled() -> bool:
+    return os.getenv("RESPONSE_COMPRESSION_ENABLE", "false").lower() == "true"
+
+
+@lru_cache(maxsize=1)
+def _orjson():
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+@lru_cache(maxsize=1)
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return jsonable_encoder(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, straight from Prisma/Pydantic models.
+
+    Endpoints return it themselves (see `respond`) so FastAPI skips its
+    `jsonable_encoder` pass; models are dumped by pydantic-core and the rest
+    is serialized in C. Output matches `JSONResponse` (UTF-8, compact).
+    """
+
+    def render(self, content) -> bytes:
+        orjson = _orjson()
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def respond(content, **kwargs):
+    """`content` as a `FastJSONResponse` when FAST_JSON_ENABLE is on, else unchanged."""
+
+    if not fast_json_enabled():
+        return content
+    return FastJSONResponse(content, **kwargs)
+
+
+def render_response(content, **kwargs) -> JSONResponse:
+    """Serialize `content` now, on whichever path is enabled.
+
+    For handlers that time serialization themselves; the default path does
+    what FastAPI would have done after the handler returned.
+    """
+
+    if fast_json_enabled():
+        return FastJSONResponse(content, **kwargs)
+    return JSONResponse(jsonable_encoder(content), **kwargs)
+
+
+_COMPRESSIBLE = ("application/json", "text/")
+
+
+def _accepts(header: str) -> dict[str, float]:
+    out: dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            out[name.strip().lower()] = q
+    return out
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """"br" or "gzip" per the client's Accept-Encoding, brotli first when installed."""
+
+    accepted = _accepts(accept_encoding or "")
+    if _brotli() is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        # Quality 4 is close to gzip's ratio at a fraction of brotli's max-level CPU.
+        return _brotli().compress(body, quality=4)
+    return gzip.compress(body, compresslevel=5)
+
+
+class CompressionMiddleware:
+    """Negotiated brotli/gzip for buffered JSON and text responses.
+
+    Only bodies of at least `minimum_size` bytes are compressed. Streaming
+    responses (NDJSON exports) pass through untouched so rows still reach
+    the client as they are written.
+    """
+
+    def __init__(self, app, *, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def wrapped(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if start is not None:
+                body = message.get("body", b"")
+                resp_headers = [(k.lower(), v) for k, v in start.get("headers", [])]
+                ctype = dict(resp_headers).get(b"content-type", b"").decode("latin-1")
+                if (
+                    message.get("more_body", False)
+                    or len(body) < self.minimum_size
+                    or b"content-encoding" in dict(resp_headers)
+                    or not ctype.startswith(_COMPRESSIBLE)
+                ):
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                body = compress(body, encoding)
+                resp_headers = [(k, v) for k, v in resp_headers if k != b"content-length"]
+                resp_headers += [
+                    (b"content-encoding", encoding.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"vary", b"Accept-Encoding"),
+                ]
+                await send({**start, "headers": resp_headers})
+                start = None
+                await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, wrapped)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+from .cache import LRUCache, SingleFlight
+from .metrics import count, stage
+
+_MISSING = object()
+
+
+def result_cache_enabled() -> bool:
+    return os.getenv("RESULT_CACHE_ENABLE", "true").lower() != "false"
+
+
+class ResultCache:
+    """Read-through cache for lookup results, keyed on (intent, value, page).
+
+    Values are normalized (whitespace collapsed, case-folded) so "Sharma"
+    and " sharma " share an entry. Entries expire after `ttl` and the least
+    recently used are evicted past `maxsize`. Concurrent misses for one key
+    share a single load. Anything that writes parties or addresses must call
+    `invalidate()`; a load that started before an invalidation is returned
+    to its caller but not stored.
+
+    Every hit credits the time its original load took to `saved_seconds`.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float):
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.inflight = SingleFlight()
+        self.generation = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def key(intent: str, value: str | None, page=None) -> tuple:
+        return (intent, " ".join((value or "").split()).casefold(), page)
+
+    async def get_or_load(self, intent: str, value: str | None, page, load: Callable[[], Awaitable]):
+        key = self.key(intent, value, page)
+        hit = self.memory.get(key, _MISSING)
+        if hit is not _MISSING:
+            result, cost = hit
+            self.saved_seconds += cost
+            count("result_cache_hits")
+            return result
+        return await self.inflight.do((self.generation, key), lambda: self._load(key, load))
+
+    async def _load(self, key: tuple, load: Callable[[], Awaitable]):
+        generation = self.generation
+        t0 = time.perf_counter()
+        result = await load()
+        if generation == self.generation:
+            self.memory.set(key, (result, time.perf_counter() - t0))
+        return result
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self.invalidations += 1
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.memory.stats(),
+            "saved_ms": round(self.saved_seconds * 1000, 1),
+            "invalidations": self.invalidations,
+            "coalesced": self.inflight.stats()["shared"],
+        }
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCache:
+    return ResultCache(
+        maxsize=int(os.getenv("RESULT_CACHE_SIZE", "2048")),
+        ttl=float(os.getenv("RESULT_CACHE_TTL", "60")),
+    )
+
+
+async def cached(intent: str, value: str | None, page, load: Callable[[], Awaitable]):
+    """`load()` through the result cache, or directly when it is disabled."""
+
+    with stage("db"):
+        if not result_cache_enabled():
+            return await load()
+        return await get_result_cache().get_or_load(intent, value, page, load)
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import random
+import time
 import uuid
+from typing import TYPE_CHECKING, Callable
 
-from prisma import Prisma
-
-
-def _pick(seq):
-    return random.choice(seq)
+if TYPE_CHECKING:
+    from prisma import Prisma
 
 
 FIRST_NAMES = [
@@ -69,57 +69,144 @@ CITIES = [
     "Lucknow",
 ]
 
+STREETS = ["MG Road", "Ring Road", "Main Road", "Station Road", "Lake View"]
+
+LANDMARKS = ["Near Metro", "Opp. Park", "Behind Mall", "Near Hospital", None]
+
+
+def _state_id(code: str) -> str:
+    # Stable across runs so reseeding reuses the same state rows.
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"aria:SYS_State:{code}"))
+
+
 STATE_ROWS = [
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "Maharashtra", "Stt_Code": "MH"},
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "Karnataka", "Stt_Code": "KA"},
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "Tamil Nadu", "Stt_Code": "TN"},
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "Uttar Pradesh", "Stt_Code": "UP"},
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "Delhi", "Stt_Code": "DL"},
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "West Bengal", "Stt_Code": "WB"},
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "Gujarat", "Stt_Code": "GJ"},
-    {"Stt_ID": str(uuid.uuid4()), "Stt_Name": "Rajasthan", "Stt_Code": "RJ"},
+    {"Stt_ID": _state_id(code), "Stt_Name": name, "Stt_Code": code}
+    for name, code in [
+        ("Maharashtra", "MH"),
+        ("Karnataka", "KA"),
+        ("Tamil Nadu", "TN"),
+        ("Uttar Pradesh", "UP"),
+        ("Delhi", "DL"),
+        ("West Bengal", "WB"),
+        ("Gujarat", "GJ"),
+        ("Rajasthan", "RJ"),
+    ]
 ]
 
 
-async def seed_sample_data(db: Prisma, *, clients: int = 12) -> dict:
-    existing = await db.opt_party.count()
-    if existing and existing > 0:
-        return {"seeded": 0, "skipped": True}
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
 
-    for s in STATE_ROWS:
-        await db.sys_state.upsert(where={"Stt_ID": s["Stt_ID"]}, data={"create": s, "update": s})
 
-    created = 0
-    for _ in range(clients):
-        first = _pick(FIRST_NAMES)
-        last = _pick(LAST_NAMES)
-        phone = f"+91{random.randint(6000000000, 9999999999)}"
-        ssn = f"{random.randint(100, 999)}-{random.randint(10, 99)}-{random.randint(1000, 9999)}"
+def _make_batch(rng: random.Random, n: int, state_ids: list[str] | None = None) -> tuple[list[dict], list[dict]]:
+    """`n` parties and their 1-2 addresses each, drawn from `rng`."""
 
-        party_id = str(uuid.uuid4())
-        c = await db.opt_party.create(
-            data={
+    state_ids = state_ids or [r["Stt_ID"] for r in STATE_ROWS]
+    parties: list[dict] = []
+    addresses: list[dict] = []
+    for _ in range(n):
+        party_id = _uuid(rng)
+        parties.append(
+            {
                 "PTY_ID": party_id,
-                "PTY_FirstName": first,
-                "PTY_LastName": last,
-                "PTY_Phone": phone,
-                "PTY_SSN": ssn,
+                "PTY_FirstName": rng.choice(FIRST_NAMES),
+                "PTY_LastName": rng.choice(LAST_NAMES),
+                "PTY_Phone": f"+91{rng.randint(6000000000, 9999999999)}",
+                "PTY_SSN": f"{rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}",
             }
         )
-
-        for _ in range(random.randint(1, 2)):
-            await db.opt_address.create(
-                data={
-                    "Add_ID": str(uuid.uuid4()),
-                    "Add_PartyID": c.PTY_ID,
-                    "Add_Line1": f"{random.randint(10, 220)} {_pick(['MG Road', 'Ring Road', 'Main Road', 'Station Road', 'Lake View'])}",
-                    "Add_Line2": _pick(["Near Metro", "Opp. Park", "Behind Mall", "Near Hospital", None]),
-                    "Add_City": _pick(CITIES),
-                    "Add_State": _pick([r["Stt_ID"] for r in STATE_ROWS]),
-                    "Add_Zip": str(random.randint(100000, 999999)),
+        for _ in range(rng.randint(1, 2)):
+            addresses.append(
+                {
+                    "Add_ID": _uuid(rng),
+                    "Add_PartyID": party_id,
+                    "Add_Line1": f"{rng.randint(10, 220)} {rng.choice(STREETS)}",
+                    "Add_Line2": rng.choice(LANDMARKS),
+                    "Add_City": rng.choice(CITIES),
+                    "Add_State": rng.choice(state_ids),
+                    "Add_Zip": str(rng.randint(100000, 999999)),
                 }
             )
+    return parties, addresses
+
+
+async def _seed_states(db: Prisma) -> list[str]:
+    """Create the sample states missing by name; the ids of all of them, in `STATE_ROWS` order.
+
+    Matched on `Stt_Name` rather than the id: databases seeded before the ids
+    were stable hold the same states under random ids, and addresses must
+    point at those rather than at duplicates.
+    """
+
+    names = [r["Stt_Name"] for r in STATE_ROWS]
+    found = await db.sys_state.find_many(where={"Stt_Name": {"in": names}})
+    ids = {r.Stt_Name: r.Stt_ID for r in found}
+    missing = [r for r in STATE_ROWS if r["Stt_Name"] not in ids]
+    if missing:
+        await db.sys_state.create_many(data=missing, skip_duplicates=True)
+        ids.update((r["Stt_Name"], r["Stt_ID"]) for r in missing)
+    return [ids[n] for n in names]
+
+
+async def seed_sample_data(
+    db: Prisma,
+    *,
+    clients: int = 12,
+    batch_size: int = 1000,
+    concurrency: int = 4,
+    seed: int | None = None,
+    on_party: Callable[[str, str | None, str | None], None] | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> dict:
+    """Insert sample parties/addresses into an empty database.
+
+    Rows are generated `batch_size` parties at a time and written with one
+    `create_many` per table per batch, with at most `concurrency` batches in
+    flight. The same `seed` always produces the same dataset, whatever the
+    batch size or concurrency.
+
+    `on_party(id, first, last)` is called for each created party so
+    in-memory indexes can be updated without a reload; `on_progress(parties,
+    addresses)` after each batch lands.
+    """
 
-        created += 1
+    existing = await db.opt_party.count()
+    if existing and existing > 0:
+        return {"seeded": 0, "skipped": True}
 
-    return {"seeded": created, "skipped": False}
+    state_ids = await _seed_states(db)
+
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(max(concurrency, 1))
+    done = {"parties": 0, "addresses": 0}
+    started = time.perf_counter()
+
+    async def insert(parties: list[dict], addresses: list[dict]) -> None:
+        try:
+            await db.opt_party.create_many(data=parties)
+            await db.opt_address.create_many(data=addresses)
+        finally:
+            slots.release()
+        done["parties"] += len(parties)
+        done["addresses"] += len(addresses)
+        if on_party is not None:
+            for p in parties:
+                on_party(p["PTY_ID"], p["PTY_FirstName"], p["PTY_LastName"])
+        if on_progress is not None:
+            on_progress(done["parties"], done["addresses"])
+
+    batch_size = max(batch_size, 1)
+    async with asyncio.TaskGroup() as tg:
+        for start in range(0, clients, batch_size):
+            # Generate before waiting for a slot so the RNG stream, and with
+            # it the dataset, doesn't depend on insert timing.
+            batch = _make_batch(rng, min(batch_size, clients - start), state_ids)
+            await slots.acquire()
+            tg.create_task(insert(*batch))
+
+    return {
+        "seeded": done["parties"],
+        "addresses": done["addresses"],
+        "seconds": round(time.perf_counter() - started, 3),
+        "skipped": False,
+    }
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from fastapi import Request
+
+from .metrics import count
+
+CONVERSATION_HEADER = "X-Aria-Conversation"
+
+_CONVERSATION_ID = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+
+def sessions_enabled() -> bool:
+    return os.getenv("SESSION_CACHE_ENABLE", "true").lower() != "false"
+
+
+def conversation_id(request: Request) -> str | None:
+    """The conversation a request belongs to, or None (no session cache)."""
+
+    if not sessions_enabled():
+        return None
+    cid = (request.headers.get(CONVERSATION_HEADER) or "").strip()
+    return cid if _CONVERSATION_ID.fullmatch(cid) else None
+
+
+@dataclass
+class Page:
+    cursor: str  # "" for the first page
+    rows: list | None  # None once dropped to fit the memory cap
+    next_cursor: str | None
+    # PTY_IDs of a client page; they outlive `rows`, so "these" and a
+    # refetch in the other row shape still work once the rows are gone.
+    keys: list[str] = field(default_factory=list)
+
+
+def _pty_id(r) -> str:
+    return r["PTY_ID"] if isinstance(r, dict) else r.PTY_ID
+
+
+@dataclass
+class ResultSet:
+    """The grid a conversation was last shown, and how to page it.
+
+    `intent` and `value` are the query that produced it. For an address
+    grid `party_ids` are the clients whose addresses these are (empty when
+    not known: a name search without the name index); a client grid's
+    clients are the `keys` of the page on screen. Visited pages are kept in order and `index` is
+    the one on screen. `grid` is the row shape (columnar projection or full
+    models) and `limit` the page size the pages were fetched with.
+    """
+
+    kind: str  # "clients" | "addresses"
+    intent: str
+    value: str | None
+    grid: bool
+    limit: int = 50
+    party_ids: list[str] = field(default_factory=list)
+    pages: list[Page] = field(default_factory=list)
+    index: int = 0
+    nbytes: int = 0
+
+    @property
+    def current(self) -> Page:
+        return self.pages[self.index]
+
+    def find(self, cursor: str) -> int | None:
+        for i, p in enumerate(self.pages):
+            if p.cursor == cursor:
+                return i
+        return None
+
+    def show(self, cursor: str, rows: list, next_cursor: str | None) -> Page:
+        """Record page `cursor` as the one on screen; a first page starts over."""
+
+        keys = [_pty_id(r) for r in rows] if self.kind == "clients" else []
+        i = self.find(cursor)
+        if i is None:
+            if cursor == "":
+                self.pages.clear()
+            self.pages.append(Page(cursor, rows, next_cursor, keys))
+            i = len(self.pages) - 1
+        else:
+            self.pages[i] = Page(cursor, rows, next_cursor, keys)
+        self.index = i
+        return self.pages[i]
+
+    def clients(self) -> list[str]:
+        """The parties "these" refers to: the owners, or the clients on screen."""
+
+        if self.kind == "addresses":
+            return self.party_ids
+        return list(self.current.keys)
+
+
+def _approx_bytes(rows) -> int:
+    # Rough Python object size: per-row and per-field overhead plus text.
+    n = 0
+    for r in rows or ():
+        values = r.values() if isinstance(r, dict) else vars(r).values()
+        n += 200 + sum(64 + len(str(v)) for v in values)
+    return n
+
+
+def _size(rs: ResultSet) -> int:
+    return 300 + 80 * len(rs.party_ids) + sum(200 + 80 * len(p.keys) + _approx_bytes(p.rows) for p in rs.pages)
+
+
+class SessionCache:
+    """Last result set per conversation, so follow-ups skip the search.
+
+    LRU over conversations: at most `maxsize` of them, idle ones expire
+    after `ttl`, and the least recently used go first once the rows held
+    pass `max_bytes`. A single conversation may hold a quarter of that;
+    past it, rows of pages other than the one on screen are dropped (their
+    cursors stay, so they can be fetched again).
+
+    Result sets are handed out by reference; callers change them and `put`
+    them back to have the size re-counted.
+    """
+
+    def __init__(self, *, maxsize: int, max_bytes: int, ttl: float):
+        self.maxsize = max(int(maxsize), 1)
+        self.max_bytes = max(int(max_bytes), 1)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._data: OrderedDict[str, tuple[float, ResultSet]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.trimmed = 0
+
+    def get(self, conversation: str | None) -> ResultSet | None:
+        if conversation is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(conversation)
+            if item is not None and self.ttl and item[0] + self.ttl <= now:
+                self._remove(conversation)
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data[conversation] = (now, item[1])
+            self._data.move_to_end(conversation)
+            self.hits += 1
+            return item[1]
+
+    def put(self, conversation: str | None, rs: ResultSet) -> None:
+        if conversation is None:
+            return
+        size = _size(rs)
+        if size > self.max_bytes // 4:
+            for i, p in enumerate(rs.pages):
+                if i != rs.index and p.rows is not None:
+                    p.rows = None
+                    self.trimmed += 1
+            size = _size(rs)
+        with self._lock:
+            self._remove(conversation)
+            rs.nbytes = size
+            self._data[conversation] = (time.monotonic(), rs)
+            self.nbytes += size
+            while len(self._data) > 1 and (len(self._data) > self.maxsize or self.nbytes > self.max_bytes):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def drop(self, conversation: str | None) -> None:
+        if conversation is None:
+            return
+        with self._lock:
+            self._remove(conversation)
+
+    def _remove(self, conversation: str) -> None:
+        item = self._data.pop(conversation, None)
+        if item is not None:
+            self.nbytes -= item[1].nbytes
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "trimmed_pages": self.trimmed,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_session_cache() -> SessionCache:
+    return SessionCache(
+        maxsize=int(os.getenv("SESSION_CACHE_SIZE", "1000")),
+        max_bytes=int(os.getenv("SESSION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl=float(os.getenv("SESSION_CACHE_TTL", "1800")),
+    )
+
+
+def held_page(rs: ResultSet | None, cursor: str, grid: bool) -> Page | None:
+    """Page `cursor` of `rs` if its rows are still held in the `grid` shape."""
+
+    if rs is None or rs.grid != grid:
+        return None
+    i = rs.find(cursor)
+    if i is None or rs.pages[i].rows is None:
+        return None
+    count("session_page_hits")
+    return rs.pages[i]
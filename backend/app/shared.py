@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import os
+import pickle
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable
+
+from .name_index import NameIndex, rebuild_name_index, set_name_index
+
+_BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+
+def worker_count() -> int:
+    # Set by serve.py for the processes it forks; a plain uvicorn run is one.
+    return max(int(os.getenv("ARIA_WORKERS", "1")), 1)
+
+
+def multi_worker() -> bool:
+    return worker_count() > 1
+
+
+def shared_dir() -> Path:
+    return Path(os.getenv("SHARED_STATE_DIR", str(_BACKEND_ROOT / ".cache")))
+
+
+def _open_lock(path: Path) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+
+@asynccontextmanager
+async def file_lock(path: Path):
+    """Exclusive `flock` on `path`, held across the awaits of the block.
+
+    Waiting happens in a thread, so the event loop keeps serving meanwhile.
+    """
+
+    fd = _open_lock(path)
+    wait = asyncio.ensure_future(asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX))
+    try:
+        await asyncio.shield(wait)
+    except BaseException:
+        # Cancelled while the thread is still blocked on `fd`: closing it now
+        # would let the number be reused under that thread, so it is closed
+        # (and any lock the thread gets released) once the wait is over.
+        wait.add_done_callback(partial(_close_after, fd))
+        raise
+    try:
+        yield
+    finally:
+        os.close(fd)
+
+
+def _close_after(fd: int, wait: asyncio.Future) -> None:
+    if not wait.cancelled():
+        wait.exception()  # retrieved, so it isn't logged as unhandled
+    os.close(fd)
+
+
+@contextmanager
+def blocking_file_lock(path: Path):
+    """`file_lock` for code without an event loop (serve.py, seed_cli.py)."""
+
+    fd = _open_lock(path)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+class Generation:
+    """Version of the party/address data, shared by the servers of a box.
+
+    Whatever writes the data (`/seed` in one worker, `seed_cli.py`) bumps
+    it; each worker compares it with the last one it saw at most every
+    `interval` seconds and runs its listeners when it moved, so caches
+    filled from the old data are dropped everywhere, not only in the
+    process that did the write.
+    """
+
+    def __init__(self, path: Path, *, interval: float):
+        self.path = path
+        self.interval = interval
+        self.seen = self.current()
+        self.changes = 0
+        self._checked = time.monotonic()
+        self._listeners: list[Callable[[int], None]] = []
+
+    def current(self) -> int:
+        try:
+            return int(self.path.read_text() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        """Next generation; this process counts as having seen it."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        n = self.current() + 1
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(str(n))
+        os.replace(tmp, self.path)
+        self.seen = n
+        return n
+
+    def on_change(self, fn: Callable[[int], None]) -> None:
+        self._listeners.append(fn)
+
+    def check(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked < self.interval:
+            return False
+        self._checked = now
+        n = self.current()
+        if n == self.seen:
+            return False
+        self.seen = n
+        self.changes += 1
+        for fn in self._listeners:
+            fn(n)
+        return True
+
+    def stats(self) -> dict:
+        return {"worker": os.getenv("ARIA_WORKER_ID"), "generation": self.seen, "changes": self.changes}
+
+
+@lru_cache(maxsize=1)
+def get_generation() -> Generation:
+    return Generation(
+        shared_dir() / "data.generation",
+        interval=float(os.getenv("SHARED_STATE_CHECK_SECONDS", "1")),
+    )
+
+
+class GenerationMiddleware:
+    """Runs `Generation.check` ahead of each HTTP request (a clock read, mostly)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            get_generation().check()
+        await self.app(scope, receive, send)
+
+
+def _snapshot(generation: int) -> Path:
+    return shared_dir() / f"name_index.{generation}.pickle"
+
+
+def _lock() -> Path:
+    return shared_dir() / "name_index.lock"
+
+
+def _save(idx: NameIndex, generation: int) -> None:
+    path = _snapshot(generation)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(idx, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    for old in shared_dir().glob("name_index.*.pickle"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def _load(generation: int) -> NameIndex | None:
+    try:
+        with open(_snapshot(generation), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+async def load_shared_name_index(db) -> NameIndex:
+    """The name index for the current generation, built by one worker only.
+
+    The first worker to take the lock scans the parties and leaves a
+    snapshot; the others wait for it and unpickle the snapshot, which takes
+    a fraction of the scan.
+    """
+
+    async with file_lock(_lock()):
+        generation = get_generation().current()
+        idx = await asyncio.to_thread(_load, generation)
+        if idx is not None:
+            set_name_index(idx)
+            return idx
+        idx = await rebuild_name_index(db)
+        await asyncio.to_thread(_save, idx, generation)
+        return idx
+
+
+async def publish_data_change(idx: NameIndex | None) -> int:
+    """Bump the generation after a write, handing this worker's index on.
+
+    `idx` must already include the write (as `/seed` keeps it); the other
+    workers load it instead of rescanning the table.
+    """
+
+    async with file_lock(_lock()):
+        generation = get_generation().bump()
+        if idx is not None:
+            await asyncio.to_thread(_save, idx, generation)
+    return generation
+
+
+def bump_generation() -> int:
+    """`Generation.bump` under the same lock as `publish_data_change`, outside the server."""
+
+    with blocking_file_lock(_lock()):
+        return get_generation().bump()
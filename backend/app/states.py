@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from prisma import Prisma
+
+# Cheap change detector: one row, whatever the table size.
+_FINGERPRINT_SQL = (
+    'SELECT COUNT(*)::int AS n, COALESCE(md5(string_agg('
+    '"Stt_ID"::text || \'|\' || COALESCE("Stt_Name", \'\') || \'|\' || COALESCE("Stt_Code", \'\'), '
+    '\',\' ORDER BY "Stt_ID")), \'\') AS h FROM "SYS_State"'
+)
+
+
+class StateCache:
+    """`SYS_State` rows kept in memory, keyed by `Stt_ID`.
+
+    The table is tiny and almost never changes, so addresses are joined to
+    their state here instead of in the database. At most every
+    `check_every` seconds a one-row fingerprint query checks whether the
+    table changed; only then is it reloaded. Writers call `invalidate()` to
+    force the check on the next read.
+    """
+
+    def __init__(self, *, check_every: float = 60.0):
+        self.check_every = max(check_every, 0.0)
+        self._states: dict = {}
+        self._fingerprint = None
+        self._checked = float("-inf")
+        self._lock = asyncio.Lock()
+        self.checks = 0
+        self.reloads = 0
+
+    def invalidate(self) -> None:
+        self._fingerprint = None
+        self._checked = float("-inf")
+
+    async def states(self, db: Prisma) -> dict:
+        if time.monotonic() - self._checked >= self.check_every:
+            async with self._lock:
+                if time.monotonic() - self._checked >= self.check_every:
+                    await self._refresh(db)
+        return self._states
+
+    async def _refresh(self, db: Prisma) -> None:
+        self.checks += 1
+        (row,) = await db.query_raw(_FINGERPRINT_SQL)
+        fingerprint = (row["n"], row["h"])
+        if fingerprint != self._fingerprint:
+            self._states = {s.Stt_ID: s for s in await db.sys_state.find_many()}
+            self._fingerprint = fingerprint
+            self.reloads += 1
+        self._checked = time.monotonic()
+
+    async def attach(self, db: Prisma, addresses: list) -> list:
+        """Fill in `.state` on each address, as `include={"state": True}` would.
+
+        Plain dict rows (projected queries) get `Stt_Name`/`Stt_Code` keys.
+        """
+
+        states = await self.states(db)
+        for a in addresses:
+            if isinstance(a, dict):
+                st = states.get(a.get("Add_State"))
+                a["Stt_Name"] = st.Stt_Name if st is not None else None
+                a["Stt_Code"] = st.Stt_Code if st is not None else None
+            else:
+                a.state = states.get(a.Add_State)
+        return addresses
+
+    def stats(self) -> dict:
+        return {"states": len(self._states), "checks": self.checks, "reloads": self.reloads}
+
+
+@lru_cache(maxsize=1)
+def get_state_cache() -> StateCache:
+    return StateCache(check_every=float(os.getenv("STATE_CACHE_CHECK_SECONDS", "60")))
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+NDJSON = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request, stream: bool = False) -> bool:
+    """True for `?stream=1` or an `Accept` header naming NDJSON."""
+
+    return stream or NDJSON in request.headers.get("accept", "")
+
+
+def ndjson_line(obj) -> bytes:
+    return (json.dumps(jsonable_encoder(obj), ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def _lines(rows: AsyncIterator, head: dict | None) -> AsyncIterator[bytes]:
+    if head is not None:
+        yield ndjson_line(head)
+    async for row in rows:
+        yield ndjson_line(row)
+
+
+def ndjson_response(rows: AsyncIterator, *, head: dict | None = None, headers: dict | None = None) -> StreamingResponse:
+    """Stream `rows` one JSON document per line as they are produced.
+
+    `head`, if given, goes out first; chat responses use it for the reply
+    envelope so the grid can be set up before any rows arrive.
+    """
+
+    # Tell nginx not to buffer, so each row is forwarded as it is written.
+    headers = {"X-Accel-Buffering": "no", **(headers or {})}
+    return StreamingResponse(_lines(rows, head), media_type=NDJSON, headers=headers)
@@ -2,8 +2,14 @@ from __future__ import annotations
 
 import os
 import asyncio
+from functools import lru_cache, partial
+from pathlib import Path
 
-from deep_translator import GoogleTranslator
+from .cache import LRUCache, SingleFlight, SqliteStore
+from .metrics import count
+from .translators import TranslatorBackend, get_translator
+
+_BACKEND_ROOT = Path(__file__).resolve().parent.parent
 
 
 def translation_enabled() -> bool:
@@ -23,8 +29,156 @@ def _norm_lang(code: str | None) -> str:
     return c
 
 
+class TranslationCache:
+    """Two-tier translation cache keyed on (normalized source, target, text).
+
+    Tier 1 is an in-process LRU with TTL; tier 2 is a SQLite file that keeps
+    translations warm across restarts and is shared by worker processes. Disk
+    hits are promoted into memory. Misses for the same key that overlap in
+    time share one upstream call through `inflight`.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float, path: str | None, disk_rows: int):
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.inflight = SingleFlight()
+        self.disk: SqliteStore | None = None
+        if path:
+            try:
+                self.disk = SqliteStore(path, table="translations", maxrows=disk_rows, ttl=ttl)
+            except Exception:
+                # Read-only or missing volume: keep the in-process tier only.
+                self.disk = None
+
+    @staticmethod
+    def key(src: str, dest: str, text: str) -> str:
+        return f"{src}\x1f{dest}\x1f{text}"
+
+    def get(self, src: str, dest: str, text: str) -> str | None:
+        k = self.key(src, dest, text)
+        out = self.memory.get(k)
+        if out is not None or self.disk is None:
+            return out
+        try:
+            out = self.disk.get(k)
+        except Exception:
+            return None
+        if out is not None:
+            self.memory.set(k, out)
+        return out
+
+    def set(self, src: str, dest: str, text: str, value: str) -> None:
+        k = self.key(src, dest, text)
+        self.memory.set(k, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(k, value)
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+            "inflight": self.inflight.stats(),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_translation_cache() -> TranslationCache:
+    return TranslationCache(
+        maxsize=int(os.getenv("TRANSLATION_CACHE_SIZE", "4096")),
+        ttl=float(os.getenv("TRANSLATION_CACHE_TTL", str(7 * 24 * 3600))),
+        path=os.getenv("TRANSLATION_CACHE_PATH", str(_BACKEND_ROOT / ".cache" / "translations.sqlite3")),
+        disk_rows=int(os.getenv("TRANSLATION_CACHE_DISK_ROWS", "200000")),
+    )
+
+
+def _clean(s: str) -> str:
+    v = (s or "").strip()
+    # Some translators return surrounding quotes sometimes.
+    if len(v) >= 2 and ((v[0] == v[-1] == '"') or (v[0] == v[-1] == "'")):
+        v = v[1:-1].strip()
+    return v
+
+
+async def _translate_once(backend: TranslatorBackend, payload: str, src: str, dest: str) -> str | None:
+    count("translator_calls")
+    try:
+        out = _clean(str(await backend.translate(payload, source=src, target=dest) or ""))
+        return out or None
+    except Exception:
+        return None
+
+
+async def _translate_one(backend: TranslatorBackend, q: str, src: str, dest: str) -> str:
+    # Backends accept source="auto" for auto-detection.
+    out = await _translate_once(backend, q, src, dest)
+    if out and out != q:
+        return out
+
+    # Heuristic: short UI-like fragments sometimes come back unchanged.
+    # Wrap them in a full sentence to encourage translation, then strip it back.
+    wrapper_prefix = "Please respond in the requested language: "
+    wrapped = wrapper_prefix + q
+    out2 = await _translate_once(backend, wrapped, src, dest)
+    if out2 and out2 != wrapped:
+        # remove translated prefix if it survived translation; otherwise just return full output.
+        if out2.lower().endswith(_clean(q).lower()):
+            return out2
+        # Best-effort: drop everything before the first ':'
+        if ':' in out2:
+            tail = out2.split(':', 1)[1].strip()
+            return tail or out2
+        return out2
+
+    return q
+
+
+# Google rejects texts above 5000 characters; leave headroom for the joins.
+# Counted in characters, not bytes: the backend posts them as a form body.
+_BATCH_CHARS = 4500
+
+
+async def _translate_grouped(backend: TranslatorBackend, texts: list[str], src: str, dest: str) -> dict[str, str]:
+    """Translate many texts with as few upstream calls as possible.
+
+    Single-line texts are packed into newline-joined groups under the
+    provider's size limit and split back apart. A group whose line count does
+    not survive translation, and any multi-line text, falls back to one call
+    per text. Groups are sent concurrently; the backend bounds how many are
+    in flight.
+    """
+
+    singles: list[str] = []
+    groups: list[list[str]] = []
+    size = _BATCH_CHARS
+    for q in texts:
+        if "\n" in q or len(q) >= _BATCH_CHARS:
+            singles.append(q)
+            continue
+        if size + len(q) + 1 > _BATCH_CHARS:
+            groups.append([])
+            size = 0
+        groups[-1].append(q)
+        size += len(q) + 1
+
+    async def _group(group: list[str]) -> dict[str, str]:
+        if len(group) > 1:
+            joined = await _translate_once(backend, "\n".join(group), src, dest)
+            lines = [_clean(line) for line in (joined or "").split("\n")]
+            if len(lines) == len(group) and all(lines):
+                return dict(zip(group, lines))
+        outs = await asyncio.gather(*(_translate_one(backend, q, src, dest) for q in group))
+        return dict(zip(group, outs))
+
+    out: dict[str, str] = {}
+    for part in await asyncio.gather(*map(_group, groups + [[q] for q in singles])):
+        out.update(part)
+    return out
+
+
 async def translate_text(*, text: str, source: str = "en", target: str) -> str:
-    """Translate text using deep-translator (GoogleTranslator) if enabled, otherwise return original."""
+    """Translate text through the configured backend if enabled, otherwise return original."""
 
     q = (text or "").strip()
     if not q or not target or target == source:
@@ -36,45 +190,98 @@ async def translate_text(*, text: str, source: str = "en", target: str) -> str:
     src = _norm_lang(source)
     dest = _norm_lang(target)
 
-    def _clean(s: str) -> str:
-        v = (s or "").strip()
-        # Some translators return surrounding quotes sometimes.
-        if len(v) >= 2 and ((v[0] == v[-1] == '"') or (v[0] == v[-1] == "'")):
-            v = v[1:-1].strip()
-        return v
+    cache = get_translation_cache()
+    cached = cache.get(src, dest, q)
+    if cached is not None:
+        count("translate_cache_hits")
+        return cached
+    count("translate_cache_misses")
 
-    def _do_translate_once(payload: str) -> str | None:
-        try:
-            out = GoogleTranslator(source=src or "auto", target=dest).translate(payload)
-            out = _clean(str(out or ""))
-            return out or None
-        except Exception:
-            return None
+    try:
+        return await cache.inflight.do(cache.key(src, dest, q), partial(_fetch, cache, q, src, dest))
+    except Exception:
+        return q
 
-    def _do_translate() -> str:
-        # deep-translator supports source="auto" for auto-detection.
-        out = _do_translate_once(q)
-        if out and out != q:
-            return out
 
-        # Heuristic: short UI-like fragments sometimes come back unchanged.
-        # Wrap them in a full sentence to encourage translation, then strip it back.
-        wrapper_prefix = "Please respond in the requested language: "
-        wrapped = wrapper_prefix + q
-        out2 = _do_translate_once(wrapped)
-        if out2 and out2 != wrapped:
-            # remove translated prefix if it survived translation; otherwise just return full output.
-            if out2.lower().endswith(_clean(q).lower()):
-                return out2
-            # Best-effort: drop everything before the first ':'
-            if ':' in out2:
-                tail = out2.split(':', 1)[1].strip()
-                return tail or out2
-            return out2
+async def _fetch(cache: TranslationCache, q: str, src: str, dest: str) -> str:
+    out = await _translate_one(get_translator(), q, src, dest)
+    # An unchanged result is also what a failed call falls back to; don't pin it.
+    if out and out != q:
+        cache.set(src, dest, q, out)
+    return out
 
-        return q
 
+async def _fetch_grouped(cache: TranslationCache, texts: list[str], src: str, dest: str) -> dict[str, str]:
     try:
-        return await asyncio.to_thread(_do_translate)
+        grouped = await _translate_grouped(get_translator(), texts, src, dest)
     except Exception:
-        return q
+        grouped = {}
+    out = {}
+    for q in texts:
+        out[q] = grouped.get(q) or q
+        if out[q] != q:
+            cache.set(src, dest, q, out[q])
+    return out
+
+
+async def _from_group(group: asyncio.Future, q: str) -> str:
+    return (await asyncio.shield(group))[q]
+
+
+async def translate_many(*, texts: list[str], source: str = "en", target: str) -> list[str]:
+    """Translate `texts` in order, sharing the cache and upstream calls.
+
+    Duplicates are translated once, cached entries are served directly and
+    the rest go out in grouped calls.
+    """
+
+    qs = [(t or "").strip() for t in texts]
+    if not target or target == source or not translation_enabled():
+        return qs
+
+    src = _norm_lang(source)
+    dest = _norm_lang(target)
+    cache = get_translation_cache()
+
+    done: dict[str, str] = {}
+    pending: list[str] = []
+    for q in dict.fromkeys(qs):
+        hit = cache.get(src, dest, q) if q else q
+        if hit is None:
+            pending.append(q)
+        else:
+            done[q] = hit
+    count("translate_cache_hits", len(done))
+    count("translate_cache_misses", len(pending))
+
+    # Texts another request is already translating are awaited, not re-sent.
+    shared = [q for q in pending if cache.inflight.in_flight(cache.key(src, dest, q))]
+    fresh = [q for q in pending if q not in shared] if shared else pending
+
+    async def _shared(q: str) -> str:
+        hit = cache.get(src, dest, q)
+        if hit is not None:
+            return hit
+        try:
+            return await cache.inflight.do(cache.key(src, dest, q), partial(_fetch, cache, q, src, dest))
+        except Exception:
+            return q
+
+    # Joined before anything is awaited, while the other flights are still registered.
+    waits = asyncio.gather(*map(_shared, shared))
+    if fresh:
+        # One grouped call, with each of its texts registered as in flight
+        # until it lands: a translate_text or batch asking for one meanwhile
+        # waits for it. Shielded, so a caller going away does not cancel
+        # what the others wait for.
+        group = asyncio.ensure_future(_fetch_grouped(cache, fresh, src, dest))
+        for q in fresh:
+            cache.inflight.claim(cache.key(src, dest, q), partial(_from_group, group, q))
+        try:
+            done.update(await asyncio.shield(group))
+        except BaseException:
+            waits.cancel()
+            raise
+    done.update(zip(shared, await waits))
+
+    return [done[q] for q in qs]
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+
+class TranslatorBackend(ABC):
+    """Interface every machine-translation backend implements.
+
+    `translate` returns the translated text, or None when the call failed or
+    timed out; callers decide how to fall back. Implementations bound their
+    own concurrency so a burst of requests can't exhaust shared resources.
+    A backend without `translate` can't be instantiated.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def translate(self, text: str, *, source: str, target: str) -> str | None: ...
+
+    async def aclose(self) -> None:
+        return None
+
+
+class GoogleHttpBackend(TranslatorBackend):
+    """Asyncio-native client for the public Google Translate endpoint.
+
+    One keep-alive `httpx.AsyncClient` is shared by all requests, a semaphore
+    caps in-flight calls and every call has its own timeout. Nothing runs on
+    the default thread pool.
+    """
+
+    name = "google"
+    URL = "https://translate.googleapis.com/translate_a/single"
+
+    def __init__(self, *, timeout: float = 5.0, max_concurrency: int = 16, max_connections: int = 32):
+        import httpx
+
+        self.timeout = timeout
+        self._sem = asyncio.Semaphore(max(max_concurrency, 1))
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def translate(self, text: str, *, source: str, target: str) -> str | None:
+        params = {"client": "gtx", "sl": source or "auto", "tl": target, "dt": "t"}
+        try:
+            # The text goes in a form body: percent-encoded into the URL, a
+            # grouped call in Hindi or Telugu is several times over the
+            # length servers and proxies accept for a request line.
+            async with self._sem:
+                call = self._client.post(self.URL, params=params, data={"q": text})
+                res = await asyncio.wait_for(call, self.timeout)
+            res.raise_for_status()
+            data = res.json()
+            # [[["translated", "source", ...], ...], ...] -- one entry per sentence.
+            out = "".join(seg[0] for seg in (data[0] or []) if seg and seg[0])
+            return out or None
+        except Exception:
+            return None
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class DeepTranslatorBackend(TranslatorBackend):
+    """deep-translator's GoogleTranslator on a dedicated, bounded thread pool.
+
+    Kept for environments where the HTTP endpoint above is blocked. Blocking
+    calls never touch the default executor used by `asyncio.to_thread`.
+    """
+
+    name = "deep"
+
+    def __init__(self, *, timeout: float = 5.0, max_concurrency: int = 8):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max(max_concurrency, 1), thread_name_prefix="translate")
+
+    @staticmethod
+    def _call(text: str, source: str, target: str) -> str | None:
+        from deep_translator import GoogleTranslator
+
+        return GoogleTranslator(source=source or "auto", target=target).translate(text)
+
+    async def translate(self, text: str, *, source: str, target: str) -> str | None:
+        loop = asyncio.get_running_loop()
+        try:
+            out = await asyncio.wait_for(loop.run_in_executor(self._pool, self._call, text, source, target), self.timeout)
+            return str(out) if out else None
+        except Exception:
+            return None
+
+    async def aclose(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class FakeBackend(TranslatorBackend):
+    """Offline stand-in for benchmarks and local runs.
+
+    Tags every line with the target language after `latency` seconds, so
+    grouping, caching and concurrency behave as they would upstream.
+    """
+
+    name = "fake"
+
+    def __init__(self, *, latency: float = 0.0, max_concurrency: int = 16):
+        self.latency = max(latency, 0.0)
+        self._sem = asyncio.Semaphore(max(max_concurrency, 1))
+        self.calls = 0
+
+    async def translate(self, text: str, *, source: str, target: str) -> str | None:
+        async with self._sem:
+            self.calls += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        return "\n".join(f"[{target}] {line}" for line in text.split("\n"))
+
+
+def make_backend(kind: str | None = None) -> TranslatorBackend:
+    kind = (kind or os.getenv("TRANSLATION_BACKEND", "google")).strip().lower()
+    timeout = float(os.getenv("TRANSLATION_TIMEOUT", "5"))
+    concurrency = int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "16"))
+    if kind == "fake":
+        return FakeBackend(latency=float(os.getenv("TRANSLATION_FAKE_LATENCY_MS", "0")) / 1000, max_concurrency=concurrency)
+    if kind == "deep":
+        return DeepTranslatorBackend(timeout=timeout, max_concurrency=concurrency)
+    return GoogleHttpBackend(timeout=timeout, max_concurrency=concurrency, max_connections=2 * concurrency)
+
+
+@lru_cache(maxsize=1)
+def get_translator() -> TranslatorBackend:
+    return make_backend()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import re
+
+# Devanagari (U+0900) and Telugu (U+0C00) share the ISCII-derived layout, so
+# one table keyed by offset-within-block romanizes both.
+_BLOCKS = (0x0900, 0x0C00)
+
+_VOWELS = {
+    0x05: "a", 0x06: "aa", 0x07: "i", 0x08: "ii", 0x09: "u", 0x0A: "uu", 0x0B: "ri",
+    0x0D: "e", 0x0E: "e", 0x0F: "e", 0x10: "ai", 0x11: "o", 0x12: "o", 0x13: "o", 0x14: "au",
+}
+_MATRAS = {
+    0x3E: "aa", 0x3F: "i", 0x40: "ii", 0x41: "u", 0x42: "uu", 0x43: "ri", 0x44: "ri",
+    0x45: "e", 0x46: "e", 0x47: "e", 0x48: "ai", 0x49: "o", 0x4A: "o", 0x4B: "o", 0x4C: "au",
+}
+_CONSONANTS = {
+    0x15: "k", 0x16: "kh", 0x17: "g", 0x18: "gh", 0x19: "n",
+    0x1A: "ch", 0x1B: "chh", 0x1C: "j", 0x1D: "jh", 0x1E: "n",
+    0x1F: "t", 0x20: "th", 0x21: "d", 0x22: "dh", 0x23: "n",
+    0x24: "t", 0x25: "th", 0x26: "d", 0x27: "dh", 0x28: "n", 0x29: "n",
+    0x2A: "p", 0x2B: "ph", 0x2C: "b", 0x2D: "bh", 0x2E: "m",
+    0x2F: "y", 0x30: "r", 0x31: "r", 0x32: "l", 0x33: "l", 0x34: "l", 0x35: "v",
+    0x36: "sh", 0x37: "sh", 0x38: "s", 0x39: "h",
+    # Devanagari nukta forms (क़ ख़ ग़ ज़ ड़ ढ़ फ़ य़)
+    0x58: "q", 0x59: "kh", 0x5A: "g", 0x5B: "z", 0x5C: "r", 0x5D: "rh", 0x5E: "f", 0x5F: "y",
+}
+_SIGNS = {0x01: "n", 0x02: "n", 0x03: "h"}
+_VIRAMA = 0x4D
+
+
+def _offset(ch: str) -> int | None:
+    cp = ord(ch)
+    for base in _BLOCKS:
+        if base <= cp < base + 0x80:
+            return cp - base
+    return None
+
+
+def romanize(text: str) -> str:
+    """Romanize Devanagari/Telugu text; other characters pass through.
+
+    Follows the usual Indian-name spelling (श -> sh, ा -> aa) with the
+    inherent vowel written out, so "शर्मा" -> "sharmaa", "రెడ్డి" -> "reddi".
+    """
+
+    out: list[str] = []
+    pending = False  # consonant waiting for its inherent "a"
+    for ch in text:
+        off = _offset(ch)
+        if off is None:
+            if pending:
+                out.append("a")
+                pending = False
+            out.append(ch)
+            continue
+        if off in _MATRAS:
+            out.append(_MATRAS[off])
+            pending = False
+        elif off == _VIRAMA:
+            pending = False
+        elif off in _CONSONANTS:
+            if pending:
+                out.append("a")
+            out.append(_CONSONANTS[off])
+            pending = True
+        elif off in _VOWELS:
+            if pending:
+                out.append("a")
+            out.append(_VOWELS[off])
+            pending = False
+        elif off in _SIGNS:
+            if pending:
+                out.append("a")
+                pending = False
+            out.append(_SIGNS[off])
+        # nukta, length marks and other signs carry no sound of their own here
+    if pending:
+        out.append("a")
+    return "".join(out)
+
+
+_SKELETON_RULES = [
+    (re.compile(r"[^a-z]"), ""),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"z"), "j"),
+    (re.compile(r"q|ck|c(?!h)"), "k"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"ee|ii|y$"), "i"),
+    (re.compile(r"oo|uu"), "u"),
+    (re.compile(r"aa"), "a"),
+    (re.compile(r"(.)\1+"), r"\1"),
+    # Hindi drops the inherent vowel in VC(a)CV ("mehata" is said "mehta").
+    (re.compile(r"(?<=[aeiou][b-df-hj-np-tv-z])a(?=[b-df-hj-np-tv-z][aeiou])"), ""),
+    (re.compile(r"(?<=.)a$"), ""),
+]
+
+
+def skeleton(name: str) -> str:
+    """Script-independent phonetic key for a name.
+
+    Native script is romanized first, then spelling variants that Latin
+    transliterations disagree on (vowel length, doubled letters, w/v, ph/f,
+    final y/i, dropped schwas) are collapsed. "Sharma", "शर्मा" and "శర్మ"
+    all map to "sharm".
+    """
+
+    s = romanize(name or "").lower()
+    for rx, repl in _SKELETON_RULES:
+        s = rx.sub(repl, s)
+    return s
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up early once it exceeds `limit`."""
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
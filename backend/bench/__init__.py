@@ -0,0 +1 @@
+"""Offline benchmarks. Run from backend/, e.g. `python -m bench.responses`."""
@@ -0,0 +1,325 @@
+"""Throughput and latency of /chat/query under concurrent load.
+
+Drives `app.main:app` in process (ASGI transport) or over a local socket
+(uvicorn on 127.0.0.1, same process), with the fake translator at a set
+latency and either the in-memory DB stand-in or the Postgres in
+DATABASE_URL. Queries come from `bench.corpus`: every intent in en/hi/te,
+unknown messages and long adversarial inputs.
+
+With `--workers N` the app runs as N forked servers (serve.py), each with
+a copy of the seeded in-memory DB, and connections are spread over them;
+compare requests per second against `--workers 1` for the scaling.
+
+Reports requests per second and p50/p95/p99 per intent/language pair and
+writes them as JSON. The run exits non-zero if any request failed (latency
+over the ones that worked would hide the failure), and `--compare` checks
+p95s against an earlier run and exits non-zero on a regression.
+
+    python -m bench.chat_load [--requests 2000] [--concurrency 16]
+        [--translator-latency-ms 30] [--db memory|postgres] [--transport asgi|tcp]
+        [--workers N] [--out bench-chat.json] [--compare baseline.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from .corpus import Query, build_corpus
+from .memdb import MemoryDB
+
+
+def _configure(args) -> None:
+    # Read by the app at import or first use, so set before importing it.
+    if args.translator_latency_ms is None:
+        os.environ["TRANSLATION_API_ENABLE"] = "false"
+    else:
+        os.environ["TRANSLATION_API_ENABLE"] = "true"
+        os.environ["TRANSLATION_BACKEND"] = "fake"
+        os.environ["TRANSLATION_FAKE_LATENCY_MS"] = str(args.translator_latency_ms)
+        # A benchmark must not reuse translations from an earlier run.
+        os.environ["TRANSLATION_CACHE_PATH"] = ""
+    if args.db == "memory":
+        os.environ.setdefault("DATABASE_URL", "memory://bench")
+    if args.workers:
+        os.environ["ARIA_WORKERS"] = str(args.workers)
+        # Name index snapshot and data generation of this run only.
+        os.environ["SHARED_STATE_DIR"] = tempfile.mkdtemp(prefix="aria-bench-")
+
+
+async def _prepare_db(args):
+    import app.db
+
+    if args.db == "memory":
+        from app.seed import seed_sample_data
+
+        db = MemoryDB(latency=args.db_latency_ms / 1000)
+        app.db._client = lambda: db
+        await seed_sample_data(db, clients=args.clients, seed=args.seed)
+        db.round_trips = 0
+    else:
+        db = app.db.get_db()
+        await db.connect()
+    parties = await db.opt_party.find_many(take=200)
+    if args.db == "postgres":
+        # The app connects on startup.
+        await db.disconnect()
+    if not parties:
+        sys.exit("no parties in the database; seed it first (python seed_cli.py)")
+    names = sorted({p.PTY_LastName for p in parties if p.PTY_LastName})
+    return db, names, [p.PTY_ID for p in parties]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_for_name_index(timeout: float = 30.0) -> None:
+    from app.main import name_index_enabled
+    from app.name_index import get_name_index
+
+    deadline = time.monotonic() + timeout
+    while name_index_enabled() and get_name_index() is None and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+
+def _percentile(sorted_ms: list[float], p: float) -> float:
+    # Nearest rank.
+    if not sorted_ms:
+        return 0.0
+    k = max(math.ceil(p / 100 * len(sorted_ms)) - 1, 0)
+    return round(sorted_ms[k], 3)
+
+
+def _summary(latencies: list[float], seconds: float | None = None) -> dict:
+    ms = sorted(latencies)
+    out = {
+        "requests": len(ms),
+        "p50_ms": _percentile(ms, 50),
+        "p95_ms": _percentile(ms, 95),
+        "p99_ms": _percentile(ms, 99),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+    }
+    if seconds:
+        out["rps"] = round(len(ms) / seconds, 1)
+    return out
+
+
+async def _drive(clients: list, queries: list[Query], concurrency: int) -> tuple[list[tuple], float]:
+    """Send `queries` over `concurrency` connections, spread over `clients`."""
+
+    results: list[tuple] = []
+    it = iter(queries)
+
+    async def worker(client) -> None:
+        for q in it:
+            t0 = time.perf_counter()
+            try:
+                r = await client.post("/chat/query", json={"message": q.message, "lang": q.lang})
+                status, route = r.status_code, r.headers.get("x-aria-route", "none")
+            except Exception as e:  # a dropped request is a result too
+                status, route = type(e).__name__, "none"
+            results.append((q, (time.perf_counter() - t0) * 1000, status, route))
+
+    t0 = time.perf_counter()
+    async with asyncio.TaskGroup() as tg:
+        for k in range(max(concurrency, 1)):
+            tg.create_task(worker(clients[k % len(clients)]))
+    return results, time.perf_counter() - t0
+
+
+async def run(args) -> dict:
+    _configure(args)
+    import httpx
+
+    from app.main import app
+    from app.translators import get_translator
+
+    db, names, ids = await _prepare_db(args)
+    corpus = build_corpus(names=names, ids=ids, seed=args.seed, long_chars=args.long_chars)
+    rng = random.Random(args.seed)
+    warmup = rng.choices(corpus, k=args.warmup)
+    queries = rng.choices(corpus, k=args.requests)
+
+    server = None
+    if args.transport == "tcp":
+        import uvicorn
+
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60)
+    else:
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+    await _wait_for_name_index()
+
+    try:
+        async with client:
+            await _drive([client], warmup, args.concurrency)
+            trips_before = getattr(db, "round_trips", 0)
+            results, seconds = await _drive([client], queries, args.concurrency)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await serving
+        else:
+            await app.router.shutdown()
+
+    out = _report(args, corpus, results, seconds)
+    if isinstance(db, MemoryDB):
+        out["overall"]["db_round_trips_per_request"] = round((db.round_trips - trips_before) / max(len(results), 1), 2)
+    if args.translator_latency_ms is not None:
+        out["overall"]["translator_calls"] = getattr(get_translator(), "calls", None)
+    return out
+
+
+async def _drive_ports(args, ports: list[int], warmup: list[Query], queries: list[Query]):
+    import httpx
+
+    clients = [httpx.AsyncClient(base_url=f"http://127.0.0.1:{p}", timeout=60) for p in ports]
+    try:
+        deadline = time.monotonic() + 60
+        for c in clients:
+            # Up, and done loading the name index.
+            while time.monotonic() < deadline:
+                try:
+                    r = await c.get("/debug/cache")
+                    if r.status_code == 200 and (r.json()["name_index"] or os.getenv("NAME_INDEX_ENABLE") == "false"):
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+        await _drive(clients, warmup, args.concurrency)
+        return await _drive(clients, queries, args.concurrency)
+    finally:
+        for c in clients:
+            await c.aclose()
+
+
+def run_workers(args) -> dict:
+    """`run` against `args.workers` servers forked by serve.py, driven from this process."""
+
+    _configure(args)
+    from app.main import app
+    from serve import start_workers
+
+    db, names, ids = asyncio.run(_prepare_db(args))
+    corpus = build_corpus(names=names, ids=ids, seed=args.seed, long_chars=args.long_chars)
+    rng = random.Random(args.seed)
+    warmup = rng.choices(corpus, k=args.warmup)
+    queries = rng.choices(corpus, k=args.requests)
+
+    workers = start_workers(app, workers=args.workers, host="127.0.0.1", port=0, log_level="warning")
+    try:
+        results, seconds = asyncio.run(_drive_ports(args, workers.ports, warmup, queries))
+    finally:
+        workers.stop()
+    return _report(args, corpus, results, seconds)
+
+
+def _report(args, corpus: list[Query], results: list[tuple], seconds: float) -> dict:
+    ok = [r for r in results if r[2] == 200]
+    groups: dict[str, list[float]] = {}
+    routes: dict[str, int] = {}
+    for q, ms, _, route in ok:
+        groups.setdefault(f"{q.intent}/{q.lang}", []).append(ms)
+        routes[route] = routes.get(route, 0) + 1
+    errors: dict[str, int] = {}
+    for _, _, status, _ in results:
+        if status != 200:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+
+    return {
+        "meta": {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": _git_head(),
+            "python": platform.python_version(),
+            "args": vars(args),
+            "corpus": len(corpus),
+        },
+        "overall": {**_summary([ms for _, ms, _, _ in ok], seconds), "errors": errors, "seconds": round(seconds, 3)},
+        "by_intent_lang": {k: _summary(v) for k, v in sorted(groups.items())},
+        "routes": routes,
+    }
+
+
+def _git_head() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict, *, tolerance: float) -> list[str]:
+    """p95 regressions beyond `tolerance` (0.2 = 20%), overall and per group."""
+
+    problems = []
+    pairs = [("overall", current["overall"], baseline.get("overall", {}))]
+    pairs += [(k, v, baseline.get("by_intent_lang", {}).get(k, {})) for k, v in current["by_intent_lang"].items()]
+    for name, now, then in pairs:
+        before, after = then.get("p95_ms"), now.get("p95_ms")
+        if before and after and after > before * (1 + tolerance):
+            problems.append(f"{name}: p95 {before}ms -> {after}ms")
+    if "rps" in baseline.get("overall", {}) and current["overall"]["rps"] < baseline["overall"]["rps"] / (1 + tolerance):
+        problems.append(f"overall: rps {baseline['overall']['rps']} -> {current['overall']['rps']}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--translator-latency-ms", type=float, default=30.0)
+    parser.add_argument("--no-translation", dest="translator_latency_ms", action="store_const", const=None)
+    parser.add_argument("--db", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="per round trip, memory DB only")
+    parser.add_argument("--clients", type=int, default=5000, help="parties to seed, memory DB only")
+    parser.add_argument("--transport", choices=["asgi", "tcp"], default="asgi")
+    parser.add_argument("--workers", type=int, default=0, help="forked server processes (implies tcp)")
+    parser.add_argument("--long-chars", type=int, default=1000, help="adversarial input length; 0 to leave out")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here as well")
+    parser.add_argument("--compare", help="earlier JSON report to check p95/rps against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = run_workers(args) if args.workers else asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    problems = [f"{n} requests failed with {status}" for status, n in report["overall"]["errors"].items()]
+    for p in problems:
+        print(f"error: {p}", file=sys.stderr)
+    if args.compare and not problems:
+        with open(args.compare, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), tolerance=args.tolerance)
+        for p in problems:
+            print(f"regression: {p}", file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Chat queries generated from the classifier's own rules.
+
+Each pattern in `_INTENT_RULES` is walked as a parse tree and turned into a
+sentence it matches (picking branches and group alternatives at random,
+`.*` becoming a space). Id and name rules get ": <value>" from the dataset
+appended. A sample is kept only if `classify` maps the final text back to
+the rule it came from, so expectations stay true as the rules change. The
+language is taken from the script: Latin "en", Devanagari "hi", Telugu "te".
+
+On top of that: queries that match nothing ("unknown"), and long
+"adversarial" inputs that carry every anchor word in an order no pattern
+accepts, which is the worst case for the `.*` chains.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+from app.nlp import _INTENT_RULES, _sre_parse, classify, detect_script
+
+_LANG = {"latin": "en", "devanagari": "hi", "telugu": "te"}
+_WORD_CHARS = "abcdefghijklmnopqrstuvwxyz"
+
+UNKNOWN = [
+    ("en", "hello there"),
+    ("en", "what is the weather like today"),
+    ("en", "tell me a joke"),
+    ("en", "how do I reset my password"),
+    ("hi", "नमस्ते आप कैसे हैं"),
+    ("hi", "आज मौसम कैसा है"),
+    ("te", "నమస్కారం మీరు ఎలా ఉన్నారు"),
+    ("te", "ఈ రోజు వాతావరణం ఎలా ఉంది"),
+]
+
+# Every anchor word of the address-by-name rules, with "name" first so the
+# trailing `\bname\b` never matches after the earlier words.
+_ADVERSARIAL = {
+    "en": ("name", "show address client where does live "),
+    "hi": ("नाम", "पता क्लाइंट दिखाओ लोकेशन "),
+    "te": ("పేరు", "చిరునామా క్లయింట్ చూపించు ఎక్కడ "),
+}
+
+
+@dataclass(frozen=True)
+class Query:
+    intent: str  # expected intent, "unknown" or "adversarial"
+    lang: str
+    message: str
+
+
+def _emit(seq, rng: random.Random) -> str:
+    out: list[str] = []
+    for op, av in seq:
+        if op is _sre_parse.LITERAL:
+            out.append(chr(av))
+        elif op is _sre_parse.SUBPATTERN:
+            out.append(_emit(av[-1], rng))
+        elif op is _sre_parse.BRANCH:
+            out.append(_emit(rng.choice(av[1]), rng))
+        elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT):
+            lo, hi, sub = av
+            if sub and sub[0][0] is _sre_parse.ANY:
+                out.append(" ")  # `.*` between words
+                continue
+            out.append("".join(_emit(sub, rng) for _ in range(lo)))
+        elif op is _sre_parse.IN:
+            out.append(_one_of(av, rng))
+        elif op is _sre_parse.ANY:
+            out.append(" ")
+        # AT (\b, $), ASSERT_NOT and the like add no text.
+    return "".join(out)
+
+
+def _one_of(items, rng: random.Random) -> str:
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            return chr(av)
+        if op is _sre_parse.RANGE:
+            return chr(av[0])
+        if op is _sre_parse.CATEGORY:
+            return " " if av is _sre_parse.CATEGORY_SPACE else rng.choice(_WORD_CHARS)
+    return "x"
+
+
+def _sample(pattern, rng: random.Random) -> str:
+    text = _emit(_sre_parse.parse(pattern.pattern, pattern.flags), rng)
+    return " ".join(text.split())
+
+
+def rule_queries(*, names: list[str], ids: list[str], rng: random.Random, per_pattern: int = 2) -> list[Query]:
+    out: list[Query] = []
+    for rule in _INTENT_RULES:
+        values = ids if rule.name.endswith("_id") else names if rule.name.endswith("_name") else [None]
+        for pattern in rule.patterns:
+            for _ in range(per_pattern):
+                text = _sample(pattern, rng)
+                value = rng.choice(values)
+                if value is not None:
+                    text = f"{text}: {value}"
+                if classify(text).name != rule.name:
+                    continue
+                lang = _LANG.get(detect_script(text.split(":")[0]))
+                if lang is not None:
+                    out.append(Query(rule.name, lang, text))
+    return out
+
+
+def adversarial_queries(*, chars: int) -> list[Query]:
+    out = []
+    for lang, (head, filler) in _ADVERSARIAL.items():
+        body = filler * max(chars // len(filler), 1)
+        out.append(Query("adversarial", lang, f"{head} {body}".strip()))
+    return out
+
+
+def build_corpus(*, names: list[str], ids: list[str], seed: int = 0, long_chars: int = 2000) -> list[Query]:
+    """Every generated query once; callers sample from it."""
+
+    rng = random.Random(seed)
+    queries = rule_queries(names=names, ids=ids, rng=rng)
+    queries += [Query("unknown", lang, text) for lang, text in UNKNOWN]
+    if long_chars > 0:
+        queries += adversarial_queries(chars=long_chars)
+    return queries
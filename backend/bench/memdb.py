@@ -0,0 +1,246 @@
+"""In-memory stand-in for the Prisma client, for benchmarks without Postgres.
+
+Implements exactly what the app calls: `find_many`/`find_unique`/`count`/
+`create_many` on the three models (with the `where` shapes the app builds)
+and `query_raw` for the app's own SQL constants, matched by text. Every
+awaited call can sleep `latency` seconds to stand in for a network round
+trip, and `round_trips` counts them; `connect` can take `connect_latency`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import uuid
+from bisect import bisect_right
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict
+
+from app import addresses, grids, name_index, states
+
+
+class Row(BaseModel):
+    """Attribute access like a Prisma model; `state` is attached by StateCache."""
+
+    model_config = ConfigDict(extra="allow")
+
+
+def _uuid_key(v: str | None):
+    # Postgres orders uuid columns bytewise, which is the order of the hex text.
+    return uuid.UUID(v).hex if v else ""
+
+
+@lru_cache(maxsize=256)
+def _like_regex(pattern: str) -> re.Pattern:
+    out, chars = [], iter(pattern)
+    for ch in chars:
+        if ch == "\\":
+            out.append(re.escape(next(chars, "")))
+        elif ch == "%":
+            out.append(".*")
+        elif ch == "_":
+            out.append(".")
+        else:
+            out.append(re.escape(ch))
+    return re.compile("".join(out), re.IGNORECASE | re.DOTALL)
+
+
+def _ilike(pattern: str, value: str | None) -> bool:
+    return value is not None and _like_regex(pattern).fullmatch(value) is not None
+
+
+def _matches(row: Row, where: dict | None) -> bool:
+    if not where:
+        return True
+    for k, cond in where.items():
+        if k == "AND":
+            if not all(_matches(row, w) for w in cond):
+                return False
+            continue
+        if k == "OR":
+            if not any(_matches(row, w) for w in cond):
+                return False
+            continue
+        v = getattr(row, k, None)
+        if not isinstance(cond, dict):
+            if v != cond:
+                return False
+            continue
+        if "in" in cond and v not in cond["in"]:
+            return False
+        if "gt" in cond and not (v is not None and _uuid_key(v) > _uuid_key(cond["gt"])):
+            return False
+        if "contains" in cond:
+            needle, hay = cond["contains"], v or ""
+            if cond.get("mode") == "insensitive":
+                needle, hay = needle.lower(), hay.lower()
+            if needle not in hay:
+                return False
+    return True
+
+
+class _Table:
+    def __init__(self, db: MemoryDB, key: str):
+        self.db = db
+        self.key = key
+        self.rows: list[Row] = []
+        self.by_key: dict[str, Row] = {}
+        self._ordered: tuple[list[str], list[Row]] | None = None
+
+    def _add(self, data: dict) -> None:
+        row = Row(**data)
+        self.rows.append(row)
+        self.by_key[data[self.key]] = row
+        self._ordered = None
+
+    def ordered(self) -> tuple[list[str], list[Row]]:
+        """(sort keys, rows) in primary-key order, rebuilt after writes."""
+
+        if self._ordered is None:
+            rows = sorted(self.rows, key=lambda r: _uuid_key(getattr(r, self.key)))
+            self._ordered = ([_uuid_key(getattr(r, self.key)) for r in rows], rows)
+        return self._ordered
+
+    def after(self, key: str | None) -> list[Row]:
+        keys, rows = self.ordered()
+        return rows[bisect_right(keys, _uuid_key(key)) :] if key else rows
+
+    async def find_many(self, *, where=None, order=None, take=None, skip=0, **_):
+        await self.db._trip()
+        if order == {self.key: "asc"} and (not where or list(where) == [self.key] and "gt" in where[self.key]):
+            # Keyset pages: seek instead of scanning.
+            rows = self.after(where[self.key]["gt"] if where else None)
+            return rows[skip or 0 :][:take] if take is not None else rows[skip or 0 :]
+        rows = [r for r in self.rows if _matches(r, where)]
+        if order:
+            (col,) = order
+            rows.sort(key=lambda r: _uuid_key(getattr(r, col)) if col.endswith("ID") else getattr(r, col))
+        rows = rows[skip or 0 :]
+        return rows[:take] if take is not None else rows
+
+    async def find_unique(self, *, where, **_):
+        await self.db._trip()
+        return self.by_key.get(where.get(self.key))
+
+    async def count(self, **_):
+        await self.db._trip()
+        return len(self.rows)
+
+    async def create_many(self, *, data, skip_duplicates=False, **_):
+        await self.db._trip()
+        n = 0
+        for d in data:
+            if skip_duplicates and d[self.key] in self.by_key:
+                continue
+            self._add(d)
+            n += 1
+        return n
+
+
+class MemoryDB:
+    # What `query_raw(model=...)` builds full address rows as (see app.addresses).
+    address_model = Row
+
+    def __init__(self, *, latency: float = 0.0, connect_latency: float = 0.0):
+        self.latency = max(latency, 0.0)
+        self.connect_latency = max(connect_latency, 0.0)
+        self.round_trips = 0
+        self.opt_party = _Table(self, "PTY_ID")
+        self.opt_address = _Table(self, "Add_ID")
+        self.sys_state = _Table(self, "Stt_ID")
+        self._raw = self._raw_handlers()
+        self._by_party: dict[str, list[Row]] | None = None
+        self._address_count = -1
+
+    async def _trip(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def connect(self) -> None:
+        if self.connect_latency:
+            await asyncio.sleep(self.connect_latency)
+
+    async def disconnect(self) -> None:
+        pass
+
+    def is_connected(self) -> bool:
+        return True
+
+    async def query_raw(self, sql: str, *args, model=None):
+        await self._trip()
+        handler = self._raw.get(sql)
+        if handler is None:
+            raise NotImplementedError(f"MemoryDB has no handler for: {sql[:80]}")
+        rows = handler(*args)
+        return [model(**r) for r in rows] if model is not None else rows
+
+    # -- raw SQL, one handler per statement the app sends --
+
+    def _raw_handlers(self) -> dict:
+        out = {
+            states._FINGERPRINT_SQL: self._fingerprint,
+            name_index._LOAD_SQL: self._name_chunk,
+            grids._CLIENT_PAGE_SQL: self._client_page,
+            grids._CLIENTS_BY_IDS_SQL: self._clients_by_ids,
+            grids._CLIENTS_BY_NAME_SQL: self._clients_by_name,
+        }
+        for cols, project in (("a.*", self._address_full), (addresses._GRID_COLS, self._address_grid)):
+            out[addresses._BY_PARTIES_SQL.format(cols=cols)] = self._by_parties(project)
+            out[addresses._BY_NAME_SQL.format(cols=cols)] = self._by_name(project)
+        return out
+
+    def _fingerprint(self):
+        rows = self.sys_state.ordered()[1]
+        h = ",".join(f"{s.Stt_ID}|{s.Stt_Name or ''}|{s.Stt_Code or ''}" for s in rows)
+        return [{"n": len(rows), "h": str(hash(h))}]
+
+    def _name_chunk(self, after, limit):
+        rows = self.opt_party.after(after)[:limit]
+        return [{"id": p.PTY_ID, "first": p.PTY_FirstName, "last": p.PTY_LastName} for p in rows]
+
+    @staticmethod
+    def _client_cols(p: Row) -> dict:
+        return {c: getattr(p, c) for c in grids.GRID_COLUMNS["clients"]}
+
+    def _client_page(self, after, limit):
+        return [self._client_cols(p) for p in self.opt_party.after(after)[:limit]]
+
+    def _clients_by_ids(self, ids):
+        return [self._client_cols(p) for p in map(self.opt_party.by_key.get, ids.split(",")) if p is not None]
+
+    def _clients_by_name(self, pattern, limit):
+        rows = [p for p in self.opt_party.rows if _ilike(pattern, p.PTY_FirstName) or _ilike(pattern, p.PTY_LastName)]
+        return [self._client_cols(p) for p in rows[:limit]]
+
+    @staticmethod
+    def _address_full(a: Row) -> dict:
+        return a.model_dump(exclude={"state"})
+
+    @staticmethod
+    def _address_grid(a: Row) -> dict:
+        return {c: getattr(a, c) for c in ("Add_ID", "Add_Line1", "Add_City", "Add_Zip", "Add_State")}
+
+    def _addresses_of(self, party_ids: set[str], after, limit, project) -> list[dict]:
+        if self._by_party is None or self._address_count != len(self.opt_address.rows):
+            self._by_party = {}
+            for a in self.opt_address.rows:
+                self._by_party.setdefault(a.Add_PartyID, []).append(a)
+            self._address_count = len(self.opt_address.rows)
+        floor = _uuid_key(after)
+        rows = [a for pid in party_ids for a in self._by_party.get(pid, ()) if _uuid_key(a.Add_ID) > floor]
+        rows.sort(key=lambda a: _uuid_key(a.Add_ID))
+        return [project(a) for a in rows[:limit]]
+
+    def _by_parties(self, project):
+        return lambda ids, after, limit: self._addresses_of(set(ids.split(",")), after, limit, project)
+
+    def _by_name(self, project):
+        def run(pattern, after, limit):
+            parties = [
+                p for p in self.opt_party.ordered()[1] if _ilike(pattern, p.PTY_FirstName) or _ilike(pattern, p.PTY_LastName)
+            ][:20]
+            return self._addresses_of({p.PTY_ID for p in parties}, after, limit, project)
+
+        return run
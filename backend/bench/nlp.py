@@ -0,0 +1,165 @@
+"""Per-rule and per-pattern cost of `classify`, and which patterns scale badly.
+
+Two passes over the compiled rule program:
+
+- corpus: every pattern searched against every `bench.corpus` query (no
+  guards, so each pattern is charged for the whole corpus), plus how many
+  queries actually reach it through the guards;
+- scaling: each pattern against inputs built from its own required words in
+  an order it cannot accept, at growing lengths, until one search exceeds
+  `--budget-ms`. The growth exponent between the last two lengths is
+  reported, and patterns above `--max-exponent` are flagged.
+
+    python -m bench.nlp [--lengths 100,200,400,800,1600] [--budget-ms 50] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+
+from app.nlp import _RE_WORD, _fold, _norm, rule_engine
+
+from .corpus import build_corpus
+
+_NAMES = ["Sharma", "Rao", "Iyer"]
+_IDS = ["3f1c0a52-8d4e-4b7a-9a61-2d5e7c9b1f00", "42"]
+
+
+def _time(fn, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _words(cp) -> list[str]:
+    """One literal per mandatory part of the pattern, in pattern order."""
+
+    out = []
+    for g in cp.guards:
+        if g.tokens:
+            out.append(" ".join(sorted(g.tokens[0])))
+        elif g.substrings:
+            out.append(g.substrings[0])
+    return out
+
+
+def adversarial(cp, chars: int) -> str | None:
+    """Every required word, the last one first, repeated to `chars`.
+
+    Each `.*` then has many places to try and the final word is never found
+    after them: the worst case for the chains in `_INTENT_RULES`.
+    """
+
+    words = _words(cp)
+    if len(words) < 2:
+        return None
+    head, filler = words[-1], " ".join(words[:-1]) + " "
+    return f"{head} " + filler * max(chars // len(filler), 1)
+
+
+def corpus_costs(repeat: int) -> list[dict]:
+    queries = [_norm(q.message) for q in build_corpus(names=_NAMES, ids=_IDS, long_chars=0)]
+    folded = [(set(_RE_WORD.findall(_fold(m))), _fold(m)) for m in queries]
+    rows = []
+    for i, cp in enumerate(rule_engine().program):
+        seconds = _time(lambda: [cp.pattern.search(m) for m in queries], repeat)
+        reached = sum(all(g.passes(w, f) for g in cp.guards) for w, f in folded)
+        rows.append(
+            {
+                "index": i,
+                "rule": cp.rule.name,
+                "pattern": cp.pattern.pattern,
+                "wildcards": cp.wildcards,
+                "us_per_search": round(seconds / len(queries) * 1e6, 3),
+                "searched_after_guards": reached,
+            }
+        )
+    return rows
+
+
+def scaling(lengths: list[int], budget: float, repeat: int) -> list[dict]:
+    rows = []
+    for i, cp in enumerate(rule_engine().program):
+        points = []
+        for n in lengths:
+            text = adversarial(cp, n)
+            if text is None:
+                break
+            seconds = _time(lambda: cp.pattern.search(text), repeat)
+            points.append((len(text), seconds))
+            if seconds > budget:
+                break
+        exponent = None
+        usable = [(n, s) for n, s in points if s > 20e-6]
+        if len(usable) >= 2:
+            (n1, s1), (n2, s2) = usable[-2:]
+            exponent = round(math.log(s2 / s1) / math.log(n2 / n1), 2)
+        rows.append(
+            {
+                "index": i,
+                "rule": cp.rule.name,
+                "pattern": cp.pattern.pattern,
+                "wildcards": cp.wildcards,
+                "ms_at_length": {n: round(s * 1000, 3) for n, s in points},
+                "exponent": exponent,
+            }
+        )
+    return rows
+
+
+def run(lengths: list[int], budget_ms: float, max_exponent: float, repeat: int) -> dict:
+    costs = corpus_costs(repeat)
+    scale = scaling(lengths, budget_ms / 1000, repeat)
+    by_rule: dict[str, dict] = {}
+    for c in costs:
+        r = by_rule.setdefault(c["rule"], {"patterns": 0, "us_per_query": 0.0, "searched_after_guards": 0})
+        r["patterns"] += 1
+        r["us_per_query"] = round(r["us_per_query"] + c["us_per_search"], 3)
+        r["searched_after_guards"] += c["searched_after_guards"]
+    flagged = [s for s in scale if s["exponent"] is not None and s["exponent"] > max_exponent]
+    return {
+        "patterns": len(rule_engine().program),
+        "by_rule": by_rule,
+        "by_pattern": sorted(costs, key=lambda c: -c["us_per_search"]),
+        "scaling": sorted(scale, key=lambda s: -(s["exponent"] or 0)),
+        "super_linear": [{k: s[k] for k in ("index", "rule", "pattern", "exponent")} for s in flagged],
+    }
+
+
+def _print(report: dict, top: int) -> None:
+    print(f"{report['patterns']} patterns\n")
+    print(f"{'rule':<24} {'patterns':>8} {'us/query':>10} {'searched':>9}")
+    for name, r in report["by_rule"].items():
+        print(f"{name:<24} {r['patterns']:>8} {r['us_per_query']:>10} {r['searched_after_guards']:>9}")
+    print(f"\nslowest patterns on the corpus (us per search):")
+    for c in report["by_pattern"][:top]:
+        print(f"  {c['us_per_search']:>8}  [{c['index']:>3}] {c['rule']}: {c['pattern']}")
+    print(f"\nsuper-linear patterns ({len(report['super_linear'])}):")
+    for s in report["super_linear"]:
+        print(f"  n^{s['exponent']:<5} [{s['index']:>3}] {s['rule']}: {s['pattern']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", default="100,200,400,800,1600")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="stop growing a pattern's input past this")
+    parser.add_argument("--max-exponent", type=float, default=1.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    report = run([int(n) for n in args.lengths.split(",")], args.budget_ms, args.max_exponent, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print(report, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Per-request CPU and bytes on the wire for a 200-row /clients page.
+
+Compares FastAPI's default path (`jsonable_encoder` + `JSONResponse`) with
+`FastJSONResponse`, and identity vs gzip vs brotli encodings. No database
+needed: rows are Prisma-shaped models built from the seed generator.
+
+    python -m bench.responses [--rows 200] [--iterations 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.paging import encode_cursor
+from app.responses import FastJSONResponse, _brotli, compress
+from app.seed import _make_batch
+
+try:
+    from prisma.models import OPT_Party
+except Exception:  # client not generated here; same fields as schema.prisma
+
+    class OPT_Party(BaseModel):
+        PTY_ID: str
+        PTY_FirstName: str | None = None
+        PTY_LastName: str | None = None
+        PTY_Phone: str | None = None
+        PTY_SSN: str | None = None
+
+
+def _page(n: int) -> dict:
+    parties, _ = _make_batch(random.Random(0), n)
+    rows = [OPT_Party(**p) for p in parties]
+    return {"rows": rows, "next_cursor": encode_cursor(rows[-1].PTY_ID)}
+
+
+def _cpu_us(fn, iterations: int) -> float:
+    fn()
+    t0 = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return round((time.process_time() - t0) / iterations * 1e6, 1)
+
+
+def run(rows: int, iterations: int) -> dict:
+    page = _page(rows)
+    paths = {
+        "default": lambda: JSONResponse(jsonable_encoder(page)).body,
+        "orjson": lambda: FastJSONResponse(page).body,
+    }
+    encodings = ["gzip"] + (["br"] if _brotli() is not None else [])
+    out: dict = {"rows": rows, "iterations": iterations, "paths": {}}
+    for name, render in paths.items():
+        body = render()
+        entry = {"serialize_cpu_us": _cpu_us(render, iterations), "bytes": {"identity": len(body)}, "encode_cpu_us": {}}
+        for enc in encodings:
+            entry["bytes"][enc] = len(compress(body, enc))
+            entry["encode_cpu_us"][enc] = _cpu_us(lambda: compress(body, enc), iterations)
+        out["paths"][name] = entry
+    base, fast = out["paths"]["default"], out["paths"]["orjson"]
+    out["serialize_speedup"] = round(base["serialize_cpu_us"] / max(fast["serialize_cpu_us"], 1e-9), 2)
+    out["same_json"] = json.loads(paths["default"]()) == json.loads(paths["orjson"]())
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Cold start: import time, time to first response and to readiness.
+
+Every trial is a fresh `python` process serving `app.main:app` with uvicorn
+on a local port, so nothing is warm but the OS page cache. From the moment
+it is spawned, this process polls `/health` and records
+
+- import_ms: `import app.main` inside the child (its own clock);
+- first_response_ms: the first HTTP response of any kind;
+- first_query_ms: a `/chat/query` sent right after that, answered;
+- ready_ms: `/health` returning 200 (rules built, database connected).
+
+Modes are `blocking` (connect during startup, the default app) and `fast`
+(FAST_START_ENABLE=true). With `--db memory` the database is the in-memory
+stand-in with `--connect-ms` of connect latency; its seeding runs before the
+server starts and is not counted. `--rules-cache` selects a prebuilt rule
+analysis (warm), a fresh one per trial (cold) or none (off). An
+`-X importtime` pass lists the packages that cost the most to import.
+
+    python -m bench.startup [--modes blocking,fast] [--repeat 5] [--db memory|none]
+        [--connect-ms 500] [--rules-cache warm|cold|off] [--out bench-startup.json]
+        [--compare baseline.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parent.parent
+
+# Imports a request path may need but startup should not pay for.
+_HEAVY = ("prisma", "deep_translator", "requests", "bs4", "nltk", "httpx", "orjson", "brotli", "pyinstrument")
+
+_METRICS = ("import_ms", "first_response_ms", "first_query_ms", "ready_ms")
+
+
+def _child(args) -> None:
+    started = time.perf_counter()
+    from app.main import app
+
+    imported = time.perf_counter()
+    setup = 0.0
+    if args.db == "memory":
+        import app.db as app_db
+        from app.seed import seed_sample_data
+
+        from .memdb import MemoryDB
+
+        t = time.perf_counter()
+        db = MemoryDB(connect_latency=args.connect_ms / 1000)
+        app_db._client = lambda: db
+        asyncio.run(seed_sample_data(db, clients=args.clients, seed=0))
+        setup = time.perf_counter() - t
+    print(json.dumps({"import_ms": round((imported - started) * 1000, 1), "setup_ms": setup * 1000}), flush=True)
+
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on")
+
+
+def _env(args, mode: str, rules_cache: str) -> dict:
+    env = {k: v for k, v in os.environ.items() if k not in ("ARIA_WORKERS", "DATABASE_URL")}
+    env.update(
+        FAST_START_ENABLE="true" if mode == "fast" else "false",
+        RULES_CACHE_PATH=rules_cache,
+        TRANSLATION_API_ENABLE="false",
+        TRANSLATION_CACHE_PATH="",
+        PYTHONDONTWRITEBYTECODE="1",
+    )
+    if args.db == "memory":
+        env["DATABASE_URL"] = "memory://bench"
+    return env
+
+
+def _trial(args, mode: str, rules_cache: str) -> dict:
+    import httpx
+
+    from .chat_load import _free_port
+
+    port = _free_port()
+    cmd = [sys.executable, "-m", "bench.startup", "--child", "--port", str(port), "--db", args.db]
+    cmd += ["--connect-ms", str(args.connect_ms), "--clients", str(args.clients)]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=_BACKEND, env=_env(args, mode, rules_cache), stdout=subprocess.PIPE, text=True)
+    try:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"{mode}: server exited with {proc.wait()}")
+        info = json.loads(line)
+        # Seeding the stand-in database is bench setup, not startup.
+        offset = started + info["setup_ms"] / 1000
+
+        def ms(t: float) -> float:
+            return round((t - offset) * 1000, 1)
+
+        out = {"import_ms": info["import_ms"]}
+        deadline = started + args.timeout
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout) as client:
+            while True:
+                try:
+                    r = client.get("/health")
+                    break
+                except httpx.TransportError:
+                    if time.perf_counter() > deadline or proc.poll() is not None:
+                        raise RuntimeError(f"{mode}: no response within {args.timeout}s")
+                    time.sleep(0.002)
+            out["first_response_ms"] = ms(time.perf_counter())
+            q = client.post("/chat/query", json={"message": args.message, "lang": "en"})
+            out["first_query_ms"] = ms(time.perf_counter())
+            out["first_query_status"] = q.status_code
+            while r.status_code != 200:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"{mode}: not ready within {args.timeout}s: {r.text}")
+                time.sleep(0.002)
+                r = client.get("/health")
+            out["ready_ms"] = ms(time.perf_counter())
+        return out
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _summary(trials: list[dict]) -> dict:
+    out = {}
+    for key in _METRICS:
+        values = sorted(t[key] for t in trials)
+        out[key] = {"median": round(statistics.median(values), 1), "min": values[0], "max": values[-1]}
+    out["first_query_status"] = sorted({t["first_query_status"] for t in trials})
+    return out
+
+
+def import_profile(top: int) -> dict:
+    """Cumulative `-X importtime` of app.main's heaviest packages, and which heavy ones load at all."""
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=_BACKEND,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [p.strip() for p in line[len("import time:") :].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        name = parts[2]
+        if "." not in name or name.startswith("app."):
+            cumulative[name] = int(parts[1])
+    heaviest = sorted(cumulative.items(), key=lambda kv: -kv[1])[:top]
+    return {
+        "total_ms": round(cumulative.get("app.main", 0) / 1000, 1),
+        "heaviest_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+        "loaded": {name: name in cumulative for name in _HEAVY},
+    }
+
+
+def run(args) -> dict:
+    # Not at the top: the child must import nothing of the app before timing it.
+    from .chat_load import _git_head
+
+    tmp = tempfile.mkdtemp(prefix="aria-startup-")
+    warm = str(Path(tmp) / "rules.pickle")
+    if args.rules_cache == "warm":
+        subprocess.run(
+            [sys.executable, "-c", "from app.nlp import rule_engine; rule_engine()"],
+            cwd=_BACKEND,
+            env={**os.environ, "RULES_CACHE_PATH": warm},
+            check=True,
+        )
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    trials: dict[str, list[dict]] = {m: [] for m in modes}
+    for i in range(args.repeat):
+        # Interleaved, so drift on the box affects every mode alike.
+        for mode in modes:
+            rules = {"warm": warm, "cold": str(Path(tmp) / f"rules.{mode}.{i}.pickle"), "off": ""}[args.rules_cache]
+            trials[mode].append(_trial(args, mode, rules))
+
+    return {
+        "meta": {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": _git_head(),
+            "python": platform.python_version(),
+            "args": vars(args),
+        },
+        "modes": {m: _summary(t) for m, t in trials.items()},
+        "imports": import_profile(args.top),
+    }
+
+
+def compare(current: dict, baseline: dict, *, tolerance: float) -> list[str]:
+    """Median regressions beyond `tolerance` (0.2 = 20%) per mode and metric."""
+
+    problems = []
+    for mode, now in current["modes"].items():
+        then = baseline.get("modes", {}).get(mode, {})
+        for key in _METRICS:
+            before, after = then.get(key, {}).get("median"), now[key]["median"]
+            if before and after > before * (1 + tolerance):
+                problems.append(f"{mode}: {key} {before}ms -> {after}ms")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default="blocking,fast")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", choices=["memory", "none"], default="memory")
+    parser.add_argument("--connect-ms", type=float, default=500.0, help="connect latency of the memory DB")
+    parser.add_argument("--clients", type=int, default=1000, help="parties to seed, memory DB only")
+    parser.add_argument("--rules-cache", choices=["warm", "cold", "off"], default="warm")
+    parser.add_argument("--message", default="show all clients")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top", type=int, default=12, help="packages listed in the import profile")
+    parser.add_argument("--out", help="write the JSON report here as well")
+    parser.add_argument("--compare", help="earlier JSON report to check medians against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args)
+        return
+    report = run(args)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), tolerance=args.tolerance)
+        for p in problems:
+            print(f"regression: {p}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Classify logged chat messages offline and report intent coverage.
+
+Reads JSONL (a file or `-` for stdin), takes the message from `--field`
+(and the language from `--lang-field`, else from the script), classifies
+across a process pool with `classify_many` and writes one JSON line per
+message plus aggregate stats. No database is used; `--translate` sends
+non-Latin messages the rules miss through the configured translator and
+classifies them again, as `/chat/query` would.
+
+    python classify_cli.py chats.jsonl --out intents.jsonl --stats stats.json
+    python classify_cli.py ../requests.jsonl --field body --id-field request_id --no-output
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from app.nlp import classify, classify_many, detect_script
+from app.translate import translation_enabled, translate_many
+
+_SCRIPT_LANG = {"latin": "en", "devanagari": "hi", "telugu": "te"}
+
+
+@dataclass
+class _Record:
+    line: int
+    id: object
+    lang: str
+    message: str
+    too_long: bool = False
+
+
+def _records(stream, args, stats: dict):
+    for n, raw in enumerate(stream, 1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            obj = json.loads(raw)
+            message = obj[args.field]
+        except (ValueError, KeyError, TypeError):
+            stats["skipped"] += 1
+            continue
+        message = str(message or "").strip()
+        lang = obj.get(args.lang_field) if args.lang_field else None
+        lang = str(lang or _SCRIPT_LANG.get(detect_script(message), "other")).lower()
+        rec = _Record(n, obj.get(args.id_field) if args.id_field else None, lang, message)
+        rec.too_long = len(message) > args.max_chars
+        yield rec
+
+
+class _Stats:
+    def __init__(self):
+        self.by_lang: dict[str, dict[str, int]] = {}
+        self.counts = {"messages": 0, "skipped": 0, "too_long": 0, "translated": 0}
+
+    def add(self, lang: str, intent: str) -> None:
+        self.counts["messages"] += 1
+        per = self.by_lang.setdefault(lang, {})
+        per[intent] = per.get(intent, 0) + 1
+
+    def report(self, seconds: float) -> dict:
+        by_lang = {}
+        for lang, intents in sorted(self.by_lang.items()):
+            total = sum(intents.values())
+            missed = intents.get("unknown", 0) + intents.get("too_long", 0)
+            by_lang[lang] = {
+                "messages": total,
+                "coverage": round(1 - missed / total, 4) if total else 0.0,
+                "intents": dict(sorted(intents.items(), key=lambda kv: -kv[1])),
+            }
+        return {
+            **self.counts,
+            "seconds": round(seconds, 3),
+            "messages_per_second": round(self.counts["messages"] / max(seconds, 1e-9), 1),
+            "by_lang": by_lang,
+        }
+
+
+async def _translate_and_classify(recs: list[_Record]) -> list[tuple[_Record, str, str | None]]:
+    by_lang: dict[str, list[_Record]] = {}
+    for r in recs:
+        by_lang.setdefault(r.lang, []).append(r)
+    out = []
+    for lang, group in by_lang.items():
+        texts = await translate_many(texts=[r.message for r in group], source=lang, target="en")
+        for r, text in zip(group, texts):
+            intent = classify(text)
+            out.append((r, intent.name, intent.value))
+    return out
+
+
+def run(args) -> dict:
+    stats = _Stats()
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = None if args.no_output else (sys.stdout if args.out in (None, "-") else open(args.out, "w", encoding="utf-8"))
+    loop = asyncio.new_event_loop() if args.translate else None
+    retry: list[_Record] = []
+
+    def emit(rec: _Record, intent: str, value: str | None, route: str) -> None:
+        stats.add(rec.lang, intent)
+        if sink is not None:
+            row = {"line": rec.line, "lang": rec.lang, "intent": intent, "value": value, "route": route}
+            if args.id_field:
+                row["id"] = rec.id
+            sink.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def flush() -> None:
+        for rec, name, value in loop.run_until_complete(_translate_and_classify(retry)):
+            stats.counts["translated"] += 1
+            emit(rec, name, value, "translated")
+        retry.clear()
+
+    pending: deque[_Record] = deque()
+
+    def messages():
+        for rec in _records(source, args, stats.counts):
+            pending.append(rec)
+            # Over-long messages are not matched at all; see `--max-chars`.
+            yield "" if rec.too_long else rec.message
+
+    started = time.perf_counter()
+    try:
+        for intent in classify_many(messages(), processes=args.workers, batch_size=args.batch_size):
+            rec = pending.popleft()
+            if rec.too_long:
+                stats.counts["too_long"] += 1
+                emit(rec, "too_long", None, "skipped")
+            elif args.translate and intent.name == "unknown" and rec.lang not in ("en", "other"):
+                retry.append(rec)
+                if len(retry) >= args.translate_batch:
+                    flush()
+            else:
+                emit(rec, intent.name, intent.value, "direct")
+        if retry:
+            flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
+        if loop is not None:
+            loop.close()
+    return stats.report(time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Classify chat messages from a JSONL file")
+    parser.add_argument("input", help="JSONL file, or - for stdin")
+    parser.add_argument("--field", default="message", help="key holding the message text")
+    parser.add_argument("--lang-field", default="lang", help="key holding the UI language; script-based if missing")
+    parser.add_argument("--id-field", default=None, help="key copied to each output line as `id`")
+    parser.add_argument("--out", default=None, help="per-message JSONL (default stdout)")
+    parser.add_argument("--no-output", action="store_true", help="aggregate stats only")
+    parser.add_argument("--stats", default=None, help="write the stats JSON here (default stderr)")
+    parser.add_argument("--workers", type=int, default=None, help="classifier processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="messages per worker task")
+    parser.add_argument("--max-chars", type=int, default=1000, help="longer messages are counted as too_long")
+    parser.add_argument("--translate", action="store_true", help="retry unknown non-English messages via translation")
+    parser.add_argument("--translate-batch", type=int, default=500)
+    args = parser.parse_args()
+    if args.translate and not translation_enabled():
+        parser.error("--translate needs TRANSLATION_API_ENABLE=true (and a TRANSLATION_BACKEND)")
+
+    report = json.dumps(run(args), indent=2, ensure_ascii=False)
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
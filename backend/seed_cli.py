@@ -1,23 +1,49 @@
 """CLI helper to seed the database.
 
 This avoids PowerShell quoting issues when trying to run async code via `python -c`.
+
+    python seed_cli.py --clients 5000000 --batch-size 2000 --concurrency 4 --seed 42
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import sys
+import time
 
 from prisma import Prisma
 
 from app.seed import seed_sample_data
+from app.shared import bump_generation
+
+
+def _progress(total: int):
+    started = time.perf_counter()
+
+    def report(parties: int, addresses: int) -> None:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        sys.stderr.write(
+            f"\r{parties:,}/{total:,} parties ({100 * parties / max(total, 1):.1f}%), "
+            f"{addresses:,} addresses, {parties / elapsed:,.0f} parties/s"
+        )
+        sys.stderr.flush()
+
+    return report
 
 
-async def _run(clients: int) -> dict:
+async def _run(clients: int, batch_size: int, concurrency: int, seed: int | None, quiet: bool) -> dict:
     db = Prisma()
     await db.connect()
     try:
-        return await seed_sample_data(db, clients=clients)
+        return await seed_sample_data(
+            db,
+            clients=clients,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            seed=seed,
+            on_progress=None if quiet else _progress(clients),
+        )
     finally:
         await db.disconnect()
 
@@ -25,8 +51,22 @@ async def _run(clients: int) -> dict:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Seed sample data into the database")
     parser.add_argument("--clients", type=int, default=12)
+    parser.add_argument("--batch-size", type=int, default=2000, help="parties per create_many batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="batches inserted at once")
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed; same seed, same dataset")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
     args = parser.parse_args()
-    result = asyncio.run(_run(args.clients))
+    result = asyncio.run(_run(args.clients, args.batch_size, args.concurrency, args.seed, args.quiet))
+    if not result.get("skipped"):
+        # Servers on this box, one worker or several, drop their caches and
+        # rebuild the name index.
+        bump_generation()
+    if not args.quiet and not result.get("skipped"):
+        sys.stderr.write("\n")
+    seconds = result.get("seconds") or 0
+    if seconds:
+        result["parties_per_second"] = round(result["seeded"] / seconds, 1)
+        result["rows_per_second"] = round((result["seeded"] + result["addresses"]) / seconds, 1)
     print(result)
 
 
@@ -0,0 +1,228 @@
+"""Serve the API from several worker processes on one box.
+
+The app is imported once, here: the intent rules are compiled and every
+module is loaded before the workers are forked, so they start warm and
+share those pages copy-on-write. Nothing that holds a connection (Prisma,
+the SQLite caches, the classifier pool) exists before the fork; each
+worker opens its own on startup.
+
+Each worker is a uvicorn server on its own port (--port, --port + 1, ...).
+nginx spreads requests over them and keeps each conversation on one
+worker, where its session cache lives; `--upstream` prints the matching
+upstream block. Translations and the name index are shared through
+SHARED_STATE_DIR (see app/shared.py). Workers that exit are restarted.
+
+    python serve.py [--workers N] [--host 127.0.0.1] [--port 8000]
+    python serve.py --upstream [--workers N] > /etc/nginx/aria_upstream.conf
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import math
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+
+# Without a CPU quota to go by, at most this many workers: each one holds
+# its own caches, name index and classifier pool.
+_FALLBACK_WORKERS = 4
+
+
+def _cgroup_cpus() -> float | None:
+    """CPUs the container's CFS quota allows (cgroup v2, then v1), or None if unlimited."""
+
+    try:
+        quota, period = open("/sys/fs/cgroup/cpu.max").read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read())
+        period = int(open("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY, else the CPU quota (rounded up), else the CPUs, at most a few."""
+
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(int(os.environ["WEB_CONCURRENCY"]), 1)
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpus()
+    if quota is not None:
+        return max(min(math.ceil(quota), cpus), 1)
+    return max(min(cpus, _FALLBACK_WORKERS), 1)
+
+
+def upstream_conf(*, workers: int, host: str, port: int, keepalive: int) -> str:
+    """nginx upstream for the workers, sticky on `$aria_affinity` (see nginx.conf)."""
+
+    servers = "".join(f"  server {host}:{port + i};\n" for i in range(workers))
+    return (
+        f"# Generated by serve.py --upstream for {workers} worker(s).\n"
+        "upstream aria_backend {\n"
+        "  hash $aria_affinity consistent;\n"
+        f"{servers}"
+        # Idle connections kept per nginx worker; each uvicorn worker keeps
+        # them for longer (--keep-alive) so nginx never reuses a closed one.
+        f"  keepalive {keepalive * workers};\n"
+        "  keepalive_requests 10000;\n"
+        "  keepalive_timeout 60s;\n"
+        "}\n"
+    )
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Workers:
+    """Forked uvicorn workers, one listening socket each."""
+
+    def __init__(self, app, sockets: list[socket.socket], *, keep_alive: int, log_level: str):
+        self.app = app
+        self.sockets = sockets
+        self.keep_alive = keep_alive
+        self.log_level = log_level
+        self.pids: dict[int, int] = {}  # pid -> worker number
+        self.restarts = 0
+        self._stopping = False
+
+    @property
+    def ports(self) -> list[int]:
+        return [s.getsockname()[1] for s in self.sockets]
+
+    def _fork(self, n: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = n
+            return
+        code = 0
+        try:
+            self._serve(n)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # Never fall back into the parent's code.
+            os._exit(code)
+
+    def _serve(self, n: int) -> None:
+        import uvicorn
+
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.environ["ARIA_WORKER_ID"] = str(n)
+        config = uvicorn.Config(self.app, lifespan="on", timeout_keep_alive=self.keep_alive, log_level=self.log_level)
+        uvicorn.Server(config).run(sockets=[self.sockets[n]])
+
+    def start(self) -> Workers:
+        # Objects loaded so far stay out of the collector's way, so it does
+        # not touch (and copy) their pages in every worker.
+        gc.freeze()
+        for n in range(len(self.sockets)):
+            self._fork(n)
+        return self
+
+    def supervise(self) -> None:
+        """Restart workers that exit, until SIGTERM/SIGINT; then stop them all."""
+
+        def stop(signum, frame):
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        while not self._stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            n = self.pids.pop(pid, None)
+            if n is not None and not self._stopping:
+                print(f"serve: worker {n} (pid {pid}) exited with {status}; restarting", file=sys.stderr)
+                self.restarts += 1
+                time.sleep(1.0)
+                self._fork(n)
+        self.stop()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        self._stopping = True
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        while self.pids and time.monotonic() < deadline:
+            for pid in list(self.pids):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    self.pids.pop(pid)
+            time.sleep(0.05)
+        for pid in self.pids:
+            os.kill(pid, signal.SIGKILL)
+        self.pids.clear()
+
+
+def start_workers(app, *, workers: int, host: str, port: int, keep_alive: int = 75, log_level: str = "info") -> Workers:
+    """Bind `workers` ports from `port` on (port 0: any free ones) and fork a worker per port."""
+
+    sockets = [_bind(host, port + n if port else 0) for n in range(workers)]
+    return Workers(app, sockets, keep_alive=keep_alive, log_level=log_level).start()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API as several worker processes")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="default: WEB_CONCURRENCY, else the CPU quota or CPUs (at most 4)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="first worker's port")
+    parser.add_argument("--keep-alive", type=int, default=75, help="seconds; above nginx's upstream keepalive_timeout")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--upstream", action="store_true", help="print the nginx upstream block and exit")
+    parser.add_argument("--upstream-keepalive", type=int, default=16, help="idle nginx connections per worker")
+    args = parser.parse_args()
+    workers = max(args.workers, 1)
+
+    if args.upstream:
+        print(upstream_conf(workers=workers, host=args.host, port=args.port, keepalive=args.upstream_keepalive), end="")
+        return
+
+    os.environ["ARIA_WORKERS"] = str(workers)
+    from app.main import app
+    from app.nlp import rule_engine
+    from app.shared import bump_generation
+
+    rule_engine()
+    if workers > 1:
+        # A fresh start: snapshots left by an earlier run may predate writes
+        # made while it was down.
+        bump_generation()
+    start_workers(
+        app, workers=workers, host=args.host, port=args.port, keep_alive=args.keep_alive, log_level=args.log_level
+    ).supervise()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import `app` the way the scripts in backend/ do.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,163 @@
+"""`classify` keeps the answers of the original rule loop.
+
+`intents_baseline.jsonl` pins the (intent, value) that the rule-by-rule
+`classify` of the initial tree gave for about 500 messages: a sample of every
+pattern, alone, with a value after ": ", " - " or a space, and with a stray
+word inserted, plus messages that match nothing. New rules may claim messages
+that used to be "unknown", but none of these may change.
+
+The indexed engine is also checked against a plain first-match loop over the
+current rules, on messages sampled from each pattern's parse tree and a few
+seeded mutations of them (case, spacing, punctuation, extra and dropped
+words, shuffles).
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.nlp import _INTENT_RULES, Intent, _norm, classify
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+_BASELINE = Path(__file__).with_name("intents_baseline.jsonl")
+
+_VALUES = ["Sharma", "Rao", "Iyer", "शर्मा", "రావు", "42", "3f1c0a52-8d4e-4b7a-9a61-2d5e7c9b1f00", ""]
+_NOISE = ["please", "the", "client", "name", "address", "id", "show", "पता", "नाम", "చిరునామా", "పేరు", ":", "?"]
+_MISSES = ["hello there", "tell me a joke", "नमस्ते आप कैसे हैं", "నమస్కారం మీరు ఎలా ఉన్నారు", "", " ", ":", "client"]
+
+
+def _baseline() -> list[dict]:
+    with _BASELINE.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _naive(message: str) -> Intent:
+    """`classify` as it was before the engine: first matching pattern wins."""
+
+    raw = message or ""
+    m = _norm(raw)
+    for rule in _INTENT_RULES:
+        if any(p.search(m) for p in rule.patterns):
+            value = None
+            if rule.extractor is not None:
+                try:
+                    value = rule.extractor(raw)
+                except Exception:
+                    value = None
+            return Intent(rule.name, value)
+    return Intent("unknown")
+
+
+def _emit(seq, rng: random.Random) -> str:
+    """A string `seq` (a parsed pattern) matches, picking branches at random."""
+
+    out: list[str] = []
+    for op, av in seq:
+        if op is sre_parse.LITERAL:
+            out.append(chr(av))
+        elif op is sre_parse.SUBPATTERN:
+            out.append(_emit(av[-1], rng))
+        elif op is sre_parse.BRANCH:
+            out.append(_emit(rng.choice(av[1]), rng))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            lo, _, sub = av
+            if sub and sub[0][0] is sre_parse.ANY:
+                out.append(" ")
+            else:
+                out.append("".join(_emit(sub, rng) for _ in range(lo)))
+        elif op is sre_parse.IN:
+            out.append(_one_of(av, rng))
+        elif op is sre_parse.ANY:
+            out.append(" ")
+    return "".join(out)
+
+
+def _one_of(items, rng: random.Random) -> str:
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            return chr(av)
+        if op is sre_parse.RANGE:
+            return chr(av[0])
+        if op is sre_parse.CATEGORY:
+            return " " if av is sre_parse.CATEGORY_SPACE else rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "x"
+
+
+def _sample(pattern, rng: random.Random) -> str:
+    return " ".join(_emit(sre_parse.parse(pattern.pattern, pattern.flags), rng).split())
+
+
+def _mutations(text: str, rng: random.Random) -> list[str]:
+    words = text.split()
+    out = [text.upper(), text.title(), "  " + text.replace(" ", "   ") + "  ", text.replace(" ", ""), text + "?", text + "!!"]
+    if words:
+        out.append(" ".join(words[1:]))
+        out.append(" ".join(words[:-1]))
+        shuffled = words[:]
+        rng.shuffle(shuffled)
+        out.append(" ".join(shuffled))
+        i = rng.randrange(len(words) + 1)
+        out.append(" ".join(words[:i] + [rng.choice(_NOISE)] + words[i:]))
+        out.append(" ".join(w + rng.choice(["", "s", ",", "."]) for w in words))
+    return out
+
+
+def _corpus(seed: int) -> list[str]:
+    rng = random.Random(seed)
+    base = list(_MISSES)
+    for rule in _INTENT_RULES:
+        for pattern in rule.patterns:
+            for _ in range(3):
+                text = _sample(pattern, rng)
+                base.append(text)
+                base.append(f"{text}: {rng.choice(_VALUES)}")
+    return base + [m for text in base for m in _mutations(text, rng)]
+
+
+def test_baseline_intents_unchanged():
+    cases = _baseline()
+    assert len(cases) > 400
+    changed = [
+        (c["message"], (c["intent"], c["value"]), (got.name, got.value))
+        for c in cases
+        if ((got := classify(c["message"])).name, got.value) != (c["intent"], c["value"])
+    ]
+    assert not changed, changed[:10]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_engine_matches_rule_loop(seed):
+    mismatches = [(m, classify(m), _naive(m)) for m in _corpus(seed) if classify(m) != _naive(m)]
+    assert not mismatches, mismatches[:10]
+
+
+def test_corpus_reaches_every_rule():
+    hit = {classify(m).name for m in _corpus(0)}
+    assert {r.name for r in _INTENT_RULES} <= hit
+
+
+@pytest.mark.parametrize(
+    "message, intent",
+    [
+        ("addresses for these", "addresses_for_results"),
+        ("where do they live", "addresses_for_results"),
+        ("इनके पते", "addresses_for_results"),
+        ("వీరి చిరునామాలు", "addresses_for_results"),
+        ("next page", "next_page"),
+        ("show me more", "next_page"),
+        ("back", "previous_page"),
+        ("previous page", "previous_page"),
+        ("show next clients", "list_clients"),
+        ("show address for this client id 42", "address_by_client_id"),
+    ],
+)
+def test_follow_ups_only_where_no_explicit_rule_applies(message, intent):
+    assert classify(message).name == intent
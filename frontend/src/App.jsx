@@ -1,6 +1,6 @@
 import { useCallback, useEffect, useState } from 'react'
 import { useTranslation } from 'react-i18next'
-import { sendChatQuery } from './services/api'
+import { getClientById, sendChatQuery } from './services/api'
 import { useChatStore } from './store/chatStore'
 import GlobalLayout from './components/GlobalLayout'
 import ChatWindow from './components/ChatWindow'
@@ -102,6 +102,15 @@ export default function App() {
           },
         ]
       : [
+          ...(isClientList
+            ? [
+                {
+                  key: 'addressesForThese',
+                  label: t('actions.addressesForThese'),
+                  onClick: () => onSend(t('commands.addressesForThese')),
+                },
+              ]
+            : []),
           {
             key: 'back',
             label: t('actions.back'),
@@ -136,7 +145,14 @@ export default function App() {
     async (client) => {
       if (!client?.PTY_ID) return
       setIvrMode('list')
-      setRightPanel({ type: 'form', payload: { client }, title: 'Client Details' })
+      // Grid rows only carry the displayed columns; load the full record for the form.
+      let full = client
+      try {
+        full = await getClientById(client.PTY_ID)
+      } catch (e) {
+        void e
+      }
+      setRightPanel({ type: 'form', payload: { client: full }, title: 'Client Details' })
     },
     [setRightPanel],
   )
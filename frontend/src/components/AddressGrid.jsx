@@ -1,7 +1,9 @@
-import { useEffect, useRef } from 'react'
+import { useEffect, useMemo, useRef } from 'react'
+
+import { decodeGrid } from '../utils/grid'
 
 export default function AddressGrid({ rows }) {
-  const safe = Array.isArray(rows) ? rows : []
+  const safe = useMemo(() => decodeGrid(rows), [rows])
   const containerRef = useRef(null)
 
   useEffect(() => {
@@ -15,7 +17,8 @@ export default function AddressGrid({ rows }) {
   }, [safe.length])
 
   const displayState = (r) => {
-    const st = r?.state
+    // Columnar rows carry the state's name/code as top-level columns.
+    const st = r?.state || r
     if (st?.Stt_Name && st?.Stt_Code) return `${st.Stt_Name} (${st.Stt_Code})`
     if (st?.Stt_Name) return st.Stt_Name
     if (st?.Stt_Code) return st.Stt_Code
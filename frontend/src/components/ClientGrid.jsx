@@ -1,7 +1,9 @@
-import { useEffect, useRef } from 'react'
+import { useEffect, useMemo, useRef } from 'react'
+
+import { decodeGrid } from '../utils/grid'
 
 export default function ClientGrid({ rows, onSelect, pagination, headerLeft }) {
-  const safe = Array.isArray(rows) ? rows : []
+  const safe = useMemo(() => decodeGrid(rows), [rows])
   const page = pagination?.page ?? 1
   const pageSize = pagination?.pageSize ?? safe.length
   const canPrev = Boolean(pagination?.canPrev)
@@ -26,6 +26,7 @@ export const resources = {
 
       actions: {
         back: 'Back',
+        addressesForThese: 'Addresses for these',
         listClients: 'List Clients',
         getClientByName: 'Get Client (Name)',
         getClientById: 'Show Client (ID / UUID)',
@@ -41,6 +42,7 @@ export const resources = {
         clientByIdPrefix: 'Show client id: ',
         addressByClientIdPrefix: 'Get address for client id: ',
         addressByClientNamePrefix: 'Get address for client name: ',
+        addressesForThese: 'Addresses for these clients',
       },
       rightPanelTitle: 'Details',
       noStructuredData: 'No details to show',
@@ -77,6 +79,7 @@ export const resources = {
 
       actions: {
         back: 'वापस',
+        addressesForThese: 'इनके पते',
         listClients: 'ग्राहक सूची',
         getClientByName: 'ग्राहक (नाम) खोजें',
         getClientById: 'ग्राहक (आईडी / UUID)',
@@ -90,6 +93,7 @@ export const resources = {
         clientByIdPrefix: 'क्लाइंट आईडी: ',
         addressByClientIdPrefix: 'क्लाइंट आईडी के लिए पता: ',
         addressByClientNamePrefix: 'क्लाइंट नाम के लिए पता: ',
+        addressesForThese: 'इनके पते दिखाओ',
       },
       rightPanelTitle: 'विवरण',
       noStructuredData: 'दिखाने के लिए कोई विवरण नहीं',
@@ -126,6 +130,7 @@ export const resources = {
 
       actions: {
         back: 'వెనక్కి',
+        addressesForThese: 'వీరి చిరునామాలు',
         listClients: 'క్లయింట్లు జాబితా',
         getClientByName: 'క్లయింట్ (పేరు) వెతుకు',
         getClientById: 'క్లయింట్ (ఐడి / UUID)',
@@ -139,6 +144,7 @@ export const resources = {
         clientByIdPrefix: 'క్లయింట్ ఐడి: ',
         addressByClientIdPrefix: 'క్లయింట్ ఐడికి చిరునామా: ',
         addressByClientNamePrefix: 'క్లయింట్ పేరుకు చిరునామా: ',
+        addressesForThese: 'వీరి చిరునామాలు చూపించు',
       },
       rightPanelTitle: 'వివరాలు',
       noStructuredData: 'చూపించడానికి వివరాలు లేవు',
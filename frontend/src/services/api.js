@@ -14,17 +14,39 @@ export const api = axios.create({
   },
 })
 
+// One id per page load: the backend keeps this conversation's last grid so that
+// "addresses for these" and "next page" don't repeat the search.
+function newConversationId() {
+  if (typeof crypto !== 'undefined' && crypto.randomUUID) return crypto.randomUUID()
+  return `${Date.now()}-${Math.random().toString(16).slice(2)}`
+}
+
+api.defaults.headers.common['X-Aria-Conversation'] = newConversationId()
+
+// Per-request profiling: VITE_ARIA_PROFILE=1, or localStorage 'aria_profile' set to
+// '1' (or 'sample') in the browser console. The breakdown is logged, not shown.
+function profileMode() {
+  const saved = typeof window !== 'undefined' ? window.localStorage.getItem('aria_profile') : null
+  return saved || import.meta.env.VITE_ARIA_PROFILE || ''
+}
+
 export async function sendChatQuery(message, lang) {
+  const profile = profileMode()
   const res = await api.post(
     '/chat/query',
-    { message, lang },
+    // Columnar grids: column names once, only the columns the grids show.
+    { message, lang, grid_format: 'columnar' },
     {
       headers: {
         // Helps correlate backend logs with a specific UI call when debugging.
         'X-Aria-Client': 'frontend',
+        ...(profile ? { 'X-Aria-Profile': profile } : {}),
       },
     }
   )
+  if (res.data?.profile) {
+    console.debug('[aria] profile', message, res.headers['server-timing'], res.data.profile)
+  }
   return res.data
 }
 
@@ -33,6 +55,11 @@ export async function getClients(params) {
   return res.data
 }
 
+export async function getClientById(id) {
+  const res = await api.get(`/client/${encodeURIComponent(id)}`)
+  return res.data
+}
+
 export async function getClientByName(name) {
   const res = await api.get(`/client/name/${encodeURIComponent(name)}`)
   return res.data
@@ -18,3 +18,17 @@ export async function translateText({ text, from = 'en', to }) {
   const res = await api.post('/translate', { text: q, from, to })
   return res.data?.text ?? q
 }
+
+/**
+ * Translate many texts in one round trip via backend /translate/batch.
+ * Returns translations in the same order as `texts`.
+ */
+export async function translateTexts({ texts, from = 'en', to }) {
+  const qs = (Array.isArray(texts) ? texts : []).map((t) => String(t ?? '').trim())
+  if (!enabled) return qs
+  if (!to || to === from || !qs.length) return qs
+
+  const res = await api.post('/translate/batch', { texts: qs, from, to })
+  const out = res.data?.texts
+  return Array.isArray(out) && out.length === qs.length ? out : qs
+}
@@ -1,7 +1,8 @@
 import { create } from 'zustand'
 
 import { getClients } from '../services/api'
-import { translateText } from '../services/translate'
+import { translateTexts } from '../services/translate'
+import { gridRowCount } from '../utils/grid'
 
 function nowId() {
   return `${Date.now()}-${Math.random().toString(16).slice(2)}`
@@ -13,7 +14,8 @@ export const useChatStore = create((set, get) => ({
   panelHistory: { items: [{ type: 'empty', payload: null, title: null }], index: 0 },
   status: { sending: false, error: null },
   selectedClientId: null,
-  clientListPaging: { page: 1, pageSize: 10, hasNext: false },
+  // cursors[i] fetches page i + 1 (null = first page); filled in as pages load.
+  clientListPaging: { page: 1, pageSize: 10, hasNext: false, cursors: [null] },
   addMessage: (role, content, meta) =>
     set((s) => ({
       messages: [
@@ -54,18 +56,23 @@ export const useChatStore = create((set, get) => ({
   setSending: (sending) => set((s) => ({ status: { ...s.status, sending } })),
   setError: (error) => set((s) => ({ status: { ...s.status, error } })),
   setSelectedClientId: (id) => set({ selectedClientId: id }),
-  resetClientListPaging: () => set({ clientListPaging: { page: 1, pageSize: 10, hasNext: false } }),
+  resetClientListPaging: (paging) =>
+    set({ clientListPaging: { page: 1, pageSize: 10, hasNext: false, cursors: [null], ...(paging || {}) } }),
   fetchClientsPage: async (page = 1) => {
-    const pageSize = get().clientListPaging.pageSize || 10
-    const offset = Math.max(0, (page - 1) * pageSize)
+    const paging = get().clientListPaging
+    const pageSize = paging.pageSize || 10
+    // Pages are only reachable one step at a time, so the cursor is known;
+    // anything else starts over from the first page.
+    const known = page > 1 && page - 1 < (paging.cursors || []).length
+    const target = known ? page : 1
+    const cursors = known ? paging.cursors.slice(0, target) : [null]
 
-    const rows = await getClients({ limit: pageSize + 1, offset })
-    const safeRows = Array.isArray(rows) ? rows : []
-    const hasNext = safeRows.length > pageSize
+    const payload = await getClients({ limit: pageSize, cursor: cursors[target - 1] || '', format: 'columnar' })
+    const nextCursor = payload?.next_cursor || null
+    if (nextCursor) cursors.push(nextCursor)
 
-    const pageRows = hasNext ? safeRows.slice(0, pageSize) : safeRows
-    set({ clientListPaging: { page, pageSize, hasNext } })
-    get().setRightPanel({ type: 'grid', title: 'Clients', payload: { kind: 'clients', rows: pageRows } })
+    set({ clientListPaging: { page: target, pageSize, hasNext: Boolean(nextCursor), cursors } })
+    get().setRightPanel({ type: 'grid', title: 'Clients', payload })
   },
   hydrateFromResponse: (resp) => {
     if (!resp) return
@@ -78,9 +85,14 @@ export const useChatStore = create((set, get) => ({
       get().addMessage('assistant', reply, { original: reply, originalLang: uiLang })
     }
     if (type === 'grid' || type === 'form') {
-      // If it's a clients grid, reset paging (we'll let pagination controls refetch pages).
+      // If it's a clients grid, reset paging; a listing carries the cursor for its next page.
       if (type === 'grid' && payload?.kind === 'clients') {
-        get().resetClientListPaging()
+        const nextCursor = payload?.next_cursor || null
+        get().resetClientListPaging(
+          nextCursor
+            ? { pageSize: gridRowCount(payload), hasNext: true, cursors: [null, nextCursor] }
+            : undefined,
+        )
       }
       get().setRightPanel({ type, payload, title: resp.title || null })
     } else if (type === 'empty') {
@@ -89,21 +101,31 @@ export const useChatStore = create((set, get) => ({
   },
 
   // Translate already-rendered chat text when the user switches language.
-  // Uses backend /translate when enabled; otherwise it is a no-op.
+  // Uses backend /translate/batch when enabled (one request per source
+  // language); otherwise it is a no-op.
   translateAllMessages: async (targetLang, opts) => {
     const lang = String(targetLang || '').trim() || 'en'
     const translateUser = Boolean(opts?.translateUser)
     const msgs = get().messages
 
-    const translated = await Promise.all(
-      msgs.map(async (m) => {
-        const original = m?.meta?.original || m.content
-        const from = m?.meta?.originalLang || 'en'
-        // Keep user messages as-is unless you explicitly want them translated too.
-        // If you want both user+assistant translated, remove this guard.
-        const shouldTranslate = m.role === 'assistant' || translateUser
-        const text = shouldTranslate ? await translateText({ text: original, from, to: lang }) : m.content
-        return { ...m, content: text }
+    // Keep user messages as-is unless you explicitly want them translated too.
+    // If you want both user+assistant translated, remove this guard.
+    const bySource = new Map()
+    msgs.forEach((m, i) => {
+      if (m.role !== 'assistant' && !translateUser) return
+      const from = m?.meta?.originalLang || 'en'
+      if (!bySource.has(from)) bySource.set(from, [])
+      bySource.get(from).push(i)
+    })
+
+    const translated = msgs.slice()
+    await Promise.all(
+      [...bySource.entries()].map(async ([from, idxs]) => {
+        const texts = idxs.map((i) => msgs[i]?.meta?.original || msgs[i].content)
+        const out = await translateTexts({ texts, from, to: lang })
+        idxs.forEach((i, k) => {
+          translated[i] = { ...msgs[i], content: out[k] }
+        })
       }),
     )
 
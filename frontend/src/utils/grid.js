@@ -0,0 +1,21 @@
+// Grid payloads come either as an array of row objects or, when requested
+// with grid_format/format=columnar, as { columns: [...], values: [[...], ...] }
+// with only the columns the grid displays.
+export function decodeGrid(data) {
+  if (Array.isArray(data)) return data
+  if (data?.format !== 'columnar' || !Array.isArray(data?.columns)) return []
+  const cols = data.columns
+  return (data.values || []).map((vals) => {
+    const row = {}
+    cols.forEach((c, i) => {
+      row[c] = vals[i]
+    })
+    return row
+  })
+}
+
+export function gridRowCount(data) {
+  if (Array.isArray(data)) return data.length
+  if (Array.isArray(data?.values)) return data.values.length
+  return Array.isArray(data?.rows) ? data.rows.length : 0
+}